@@ -0,0 +1,64 @@
+"""add_cocktail_rating_and_favorite_stats
+
+Revision ID: 28aa178278dd
+Revises: 3c60abac42be
+Create Date: 2026-10-19 18:02:11.412087
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '28aa178278dd'
+down_revision: Union[str, None] = '3c60abac42be'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Wartości muszą odpowiadać settings.RATING_PRIOR_MEAN / RATING_PRIOR_WEIGHT
+RATING_PRIOR_MEAN = 3.0
+RATING_PRIOR_WEIGHT = 5
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('ratings_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('ratings_sum', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('bayesian_rating', sa.Float(), server_default=str(RATING_PRIOR_MEAN), nullable=False))
+        batch_op.add_column(sa.Column('favorites_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_cocktails_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cocktails_ratings_count'), ['ratings_count'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cocktails_bayesian_rating'), ['bayesian_rating'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cocktails_favorites_count'), ['favorites_count'], unique=False)
+
+    # Wypełnienie statystyk na podstawie istniejących ocen i ulubionych
+    op.execute(
+        """
+        UPDATE cocktails SET
+            ratings_count = (SELECT COUNT(*) FROM ratings WHERE ratings.cocktail_id = cocktails.id),
+            ratings_sum = (SELECT COALESCE(SUM(rating_value), 0) FROM ratings WHERE ratings.cocktail_id = cocktails.id),
+            favorites_count = (SELECT COUNT(*) FROM favorites WHERE favorites.cocktail_id = cocktails.id)
+        """
+    )
+    op.execute(
+        f"""
+        UPDATE cocktails SET
+            bayesian_rating = ({RATING_PRIOR_WEIGHT} * {RATING_PRIOR_MEAN} + ratings_sum) * 1.0 / ({RATING_PRIOR_WEIGHT} + ratings_count)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cocktails_favorites_count'))
+        batch_op.drop_index(batch_op.f('ix_cocktails_bayesian_rating'))
+        batch_op.drop_index(batch_op.f('ix_cocktails_ratings_count'))
+        batch_op.drop_index(batch_op.f('ix_cocktails_created_at'))
+        batch_op.drop_column('favorites_count')
+        batch_op.drop_column('bayesian_rating')
+        batch_op.drop_column('ratings_sum')
+        batch_op.drop_column('ratings_count')
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import auth, users, cocktails, ingredients, tags, ratings, favorites
+from app.api.api_v1.endpoints import auth, users, cocktails, ingredients, tags, ratings, favorites, suggest, reference_data, metrics, sync
 
 api_router = APIRouter()
 
@@ -10,4 +10,8 @@ api_router.include_router(cocktails.router, prefix="/cocktails", tags=["Cocktail
 api_router.include_router(ingredients.router, prefix="/ingredients", tags=["Ingredients"])
 api_router.include_router(tags.router, prefix="/tags", tags=["Tags"])
 api_router.include_router(ratings.router, prefix="/ratings", tags=["Ratings"])
-api_router.include_router(favorites.router, prefix="/favorites", tags=["Favorites"])
\ No newline at end of file
+api_router.include_router(favorites.router, prefix="/favorites", tags=["Favorites"])
+api_router.include_router(suggest.router, prefix="/suggest", tags=["Suggest"])
+api_router.include_router(reference_data.router, prefix="/reference-data", tags=["Reference data"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+api_router.include_router(sync.router, prefix="/sync", tags=["Sync"])
@@ -1,23 +1,63 @@
 # backend/app/api/api_v1/endpoints/cocktails.py
-from typing import List, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+from typing import AsyncIterator, List, Any, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app import crud, models, schemas
 from app.dependencies import get_db, get_current_active_user, require_current_active_user
+from app.reference_data import reference_data
+from app.core.config import settings
+from app.http_cache import cache_headers, cocktail_key, cocktail_ratings_key, COCKTAIL_LIST_KEY
+from app.db.session import SessionLocal
+from app.live_events import live_events
 from app.schemas.cocktail import (
     CocktailWithDetails, CocktailCreate, CocktailUpdate, 
-    Cocktail as CocktailSchema, PaginatedCocktailResponse
+    Cocktail as CocktailSchema, PaginatedCocktailResponse, CocktailView, CocktailSort,
+    CocktailSummary, CocktailCount, CocktailRatingStats
 )
 
 router = APIRouter()
 
+def _validate_reference_ids(db: Session, ingredients, tags) -> None:
+    """
+    Sprawdza istnienie składników i tagów w snapshocie danych słownikowych.
+    Przy braku ID snapshot jest odświeżany raz (mógł zostać utworzony w innym procesie).
+    """
+    snapshot = reference_data.get(db)
+    for attempt in range(2):
+        missing_ingredient = next(
+            (ing_data.ingredient_id for ing_data in ingredients or [] if ing_data.ingredient_id not in snapshot.ingredient_ids),
+            None
+        )
+        missing_tag = next(
+            (tag_data.tag_id for tag_data in tags or [] if tag_data.tag_id not in snapshot.tag_ids),
+            None
+        )
+        if missing_ingredient is None and missing_tag is None:
+            return
+        if attempt == 0:
+            snapshot = reference_data.refresh(db)
+
+    if missing_ingredient is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, 
+            detail=f"Składnik o ID {missing_ingredient} nie istnieje."
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, 
+        detail=f"Tag o ID {missing_tag} nie istnieje."
+    )
+
 @router.post("/", response_model=CocktailWithDetails, status_code=status.HTTP_201_CREATED)
 def create_cocktail(
     *,
     db: Session = Depends(get_db),
     cocktail_in: CocktailCreate,
+    response: Response,
     current_user: models.User = Depends(require_current_active_user)
 ):
     """
@@ -31,29 +71,25 @@ def create_cocktail(
         current_user: Zalogowany użytkownik (automatycznie przypisywany jako autor)
     
     Returns:
-        CocktailWithDetails: Utworzony koktajl z pełnymi detalami
+        CocktailWithDetails: Utworzony koktajl z pełnymi detalami.
+        Jeśli istnieją koktajle o niemal identycznym zestawie składników, ich ID
+        zwracane są w nagłówku X-Near-Duplicate-Recipes.
         
     Raises:
         400: Gdy składnik lub tag nie istnieje
         409: Gdy koktajl o podanej nazwie już istnieje
         500: Błąd wewnętrzny serwera
     """
-    # Walidacja istnienia składników
-    for ing_data in cocktail_in.ingredients:
-        if not crud.ingredient.get_ingredient(db, ing_data.ingredient_id):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                detail=f"Składnik o ID {ing_data.ingredient_id} nie istnieje."
-            )
-    
-    # Walidacja istnienia tagów
-    if cocktail_in.tags:
-        for tag_data in cocktail_in.tags:
-            if not crud.tag.get_tag(db, tag_data.tag_id):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST, 
-                    detail=f"Tag o ID {tag_data.tag_id} nie istnieje."
-                )
+    # Walidacja istnienia składników i tagów (snapshot danych słownikowych zamiast zapytań per ID)
+    _validate_reference_ids(db, cocktail_in.ingredients, cocktail_in.tags)
+
+    near_duplicates = crud.cocktail.find_near_duplicate_recipes(
+        db,
+        [ing_data.ingredient_id for ing_data in cocktail_in.ingredients],
+        viewer_id=current_user.id
+    )
+    if near_duplicates:
+        response.headers["X-Near-Duplicate-Recipes"] = ",".join(str(cocktail_id) for cocktail_id in near_duplicates)
 
     try:
         created_cocktail_details = crud.cocktail.create_cocktail(
@@ -89,6 +125,8 @@ def create_cocktail(
 
 @router.get("/", response_model=PaginatedCocktailResponse)
 def read_cocktails(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     name: Optional[str] = Query(None, description="Nazwa koktajlu (częściowe dopasowanie)"),
     ingredient_ids: Optional[List[int]] = Query(None, description="Lista ID składników (koktajl musi zawierać wszystkie)"),
@@ -96,6 +134,9 @@ def read_cocktails(
     min_avg_rating: Optional[float] = Query(None, ge=1, le=5, description="Minimalna średnia ocena koktajlu (1-5)"),
     page: int = Query(1, ge=1, description="Numer strony"),
     size: int = Query(12, ge=1, le=100, description="Liczba elementów na stronie"),
+    view: CocktailView = Query(CocktailView.FULL, description="Reprezentacja elementów: full (pełne detale) lub summary (dane dla karty koktajlu)"),
+    sort: CocktailSort = Query(CocktailSort.NEWEST, description="Sortowanie: newest, top_rated, most_rated, most_favorited"),
+    count: CocktailCount = Query(CocktailCount.EXACT, description="Liczenie total: exact, cached (zapamiętane per filtry) lub estimated (do limitu, np. 1000+)"),
     current_user: Optional[models.User] = Depends(get_current_active_user)
 ):
     """
@@ -111,6 +152,10 @@ def read_cocktails(
         min_avg_rating: Minimalna średnia ocena koktajlu (1-5) - wyświetla tylko koktajle z oceną równą lub wyższą
         page: Numer strony (domyślnie 1)
         size: Liczba koktajli na stronie (domyślnie 12, maksymalnie 100)
+        view: full - CocktailWithDetails; summary - CocktailSummary (bez instrukcji, opisu, autora i składników)
+        sort: newest (domyślnie), top_rated (średnia bayesowska), most_rated (liczba ocen), most_favorited (liczba ulubionych)
+        count: exact (domyślnie) - dokładny COUNT; cached - dokładna liczba zapamiętana per zestaw filtrów
+               do najbliższego zapisu koktajlu; estimated - liczenie do limitu, total_capped=true oznacza "total+"
         current_user: Zalogowany użytkownik (opcjonalny)
     
     Returns:
@@ -131,7 +176,7 @@ def read_cocktails(
         print(f"Ingredient IDs: {ingredient_ids}")
         print(f"Tag IDs: {tag_ids}")
         print(f"Min Avg Rating: {min_avg_rating}")
-        print(f"Page: {page}, Size: {size}")
+        print(f"Page: {page}, Size: {size}, Sort: {sort.value}")
         print(f"User ID (from current_user): {user_id}")
         
         result = crud.cocktail.get_cocktails(
@@ -142,9 +187,16 @@ def read_cocktails(
             min_avg_rating=min_avg_rating,
             page=page,
             size=size,
-            user_id=user_id
+            user_id=user_id,
+            view=view,
+            sort=sort,
+            count=count
         )
         
+        # Anonimowe odpowiedzi mogą być cache'owane przez proxy; purge po kluczach koktajli ze strony
+        response.headers.update(cache_headers(
+            request, "cocktails.list", [COCKTAIL_LIST_KEY, *(cocktail_key(item.id) for item in result["items"])]
+        ))
         return PaginatedCocktailResponse(**result)
         
     except Exception as e:
@@ -154,9 +206,130 @@ def read_cocktails(
             detail="Wystąpił błąd podczas pobierania koktajli."
         )
 
+@router.get("/trending", response_model=List[Union[CocktailWithDetails, CocktailSummary]])
+def read_trending_cocktails(
+    db: Session = Depends(get_db),
+    limit: int = Query(12, ge=1, le=100, description="Liczba koktajli do zwrócenia"),
+    view: CocktailView = Query(CocktailView.FULL, description="Reprezentacja elementów: full lub summary"),
+):
+    """
+    Pobiera publiczne koktajle zyskujące ostatnio na popularności.
+
+    Ranking opiera się na ocenach i dodaniach do ulubionych wygaszanych wykładniczo
+    w czasie (okres połowicznego zaniku TRENDING_HALF_LIFE_HOURS).
+    
+    Args:
+        limit: Liczba koktajli do zwrócenia (domyślnie 12, maksymalnie 100)
+        view: full - CocktailWithDetails; summary - CocktailSummary
+    
+    Returns:
+        Lista koktajli posortowana malejąco według wyniku "trending"
+    """
+    return crud.cocktail.get_trending_cocktails(db, limit=limit, view=view)
+
+# Bez buforowania odpowiedzi przez przeglądarkę i reverse proxy (nginx: X-Accel-Buffering)
+_EVENT_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def _read_stats_frame(cocktail_id: int) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        rows = crud.cocktail.get_stats_rows(db, [cocktail_id])
+    finally:
+        db.close()
+    return live_events.format_event(crud.cocktail.stats_from_row(rows[0])) if rows else None
+
+async def _event_stream(
+    request: Request, cocktail_id: Optional[int], user_id: Optional[int] = None, with_initial: bool = False
+) -> AsyncIterator[str]:
+    # Rejestracja dopiero przy starcie strumienia - generator, którego Starlette nie zacznie
+    # iterować (klient rozłączył się wcześniej), nie zostawia subskrybenta w szynie
+    subscriber = live_events.subscribe(cocktail_id, user_id)
+    if subscriber is None:
+        # Limit zajęty w międzyczasie (sprawdzany w endpoincie) - EventSource połączy się ponownie
+        return
+    try:
+        if with_initial:
+            # Stan odczytany po rejestracji - zmiana sprzed niej nie zostanie pominięta
+            initial = await run_in_threadpool(_read_stats_frame, cocktail_id)
+            if initial:
+                yield initial
+        while True:
+            try:
+                frame = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.LIVE_EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Komentarz SSE - utrzymuje połączenie, EventSource go ignoruje
+                yield ": ping\n\n"
+                continue
+            yield frame
+    finally:
+        live_events.unsubscribe(subscriber)
+
+def _check_capacity() -> None:
+    if not live_events.has_capacity():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Zbyt wiele otwartych strumieni zdarzeń. Spróbuj ponownie później."
+        )
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_cocktails_events(request: Request):
+    """
+    Strumień Server-Sent Events zmian liczników ocen i ulubionych wszystkich publicznych koktajli.
+
+    Każde zdarzenie "stats" zawiera {id, average_rating, ratings_count, favorites_count};
+    zmiany jednego koktajlu w obrębie LIVE_EVENTS_COALESCE_INTERVAL_MS dają jedno zdarzenie.
+    """
+    _check_capacity()
+    return StreamingResponse(
+        _event_stream(request, None), media_type="text/event-stream", headers=_EVENT_STREAM_HEADERS
+    )
+
+@router.get("/{cocktail_id}/events", response_class=StreamingResponse)
+async def stream_cocktail_events(
+    cocktail_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(get_current_active_user)
+):
+    """
+    Strumień Server-Sent Events liczników ocen i ulubionych koktajlu (zamiast odpytywania szczegółów).
+
+    Pierwsze zdarzenie "stats" to aktualny stan, kolejne wysyłane są po zmianach - najwyżej
+    jedno na LIVE_EVENTS_COALESCE_INTERVAL_MS. Co LIVE_EVENTS_HEARTBEAT_SECONDS bez zmian
+    wysyłany jest komentarz podtrzymujący połączenie.
+
+    Raises:
+        404: Koktajl nie znaleziony
+        403: Brak uprawnień do wyświetlenia prywatnego koktajlu
+        503: Osiągnięto limit otwartych strumieni (LIVE_EVENTS_MAX_SUBSCRIBERS)
+    """
+    rows = await run_in_threadpool(crud.cocktail.get_stats_rows, db, [cocktail_id])
+    # Połączenie wraca do puli od razu, a nie po zamknięciu strumienia
+    db.close()
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Koktajl nie znaleziony."
+        )
+    row = rows[0]
+    viewer_id = current_user.id if current_user else None
+    if not row.is_public and row.user_id != viewer_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Brak uprawnień do wyświetlenia tego koktajlu."
+        )
+    _check_capacity()
+    return StreamingResponse(
+        _event_stream(request, cocktail_id, viewer_id, with_initial=True),
+        media_type="text/event-stream", headers=_EVENT_STREAM_HEADERS
+    )
+
 @router.get("/{cocktail_id}", response_model=CocktailWithDetails)
 def read_cocktail(
     cocktail_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: Optional[models.User] = Depends(get_current_active_user)
 ):
@@ -177,22 +350,138 @@ def read_cocktail(
         404: Koktajl nie znaleziony
         403: Brak uprawnień do wyświetlenia prywatnego koktajlu
     """
-    cocktail_details = crud.cocktail.get_cocktail(db, cocktail_id=cocktail_id)
-    if cocktail_details is None:
+    # Zalogowany widzi w licznikach własne oceny i ulubione czekające w buforze write-behind;
+    # po takim zapisie odczyt nie dołącza do trwającego zapytania sprzed commit (fresh)
+    flushed = current_user is not None and crud.write_behind.flush_for_user(db, current_user.id)
+    # Cały payload CocktailWithDetails budowany w bazie jednym zapytaniem (JSON bez walidacji Pydantic)
+    cocktail_json = crud.cocktail.get_cocktail_json(db, cocktail_id=cocktail_id, fresh=flushed)
+    if cocktail_json is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Koktajl nie znaleziony."
         )
+    is_public, author_id, payload = cocktail_json
     
     # Sprawdzenie uprawnień dla prywatnych koktajli
-    if not cocktail_details.is_public:
-        if not current_user or cocktail_details.user_id != current_user.id:
+    if not is_public:
+        if not current_user or author_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, 
                 detail="Brak uprawnień do wyświetlenia tego koktajlu."
             )
             
-    return cocktail_details
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers=cache_headers(request, "cocktails.detail", [cocktail_key(cocktail_id)])
+    )
+
+@router.get("/{cocktail_id}/similar", response_model=List[Union[CocktailWithDetails, CocktailSummary]])
+def read_similar_cocktails(
+    cocktail_id: int,
+    db: Session = Depends(get_db),
+    limit: int = Query(10, ge=1, le=50, description="Liczba koktajli do zwrócenia"),
+    view: CocktailView = Query(CocktailView.FULL, description="Reprezentacja elementów: full lub summary"),
+    current_user: Optional[models.User] = Depends(get_current_active_user)
+):
+    """
+    Pobiera koktajle podobne do podanego (lubiane i oceniane przez tych samych użytkowników).
+
+    Podobieństwa są prekomputowane okresowo (patrz app/recommender.py),
+    więc endpoint wykonuje tylko odczyt z tabeli cocktail_similarities.
+    
+    Raises:
+        404: Koktajl nie znaleziony
+        403: Brak uprawnień do wyświetlenia prywatnego koktajlu
+    """
+    cocktail_orm = db.query(models.Cocktail).get(cocktail_id)
+    if not cocktail_orm:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, 
+            detail="Koktajl nie znaleziony."
+        )
+    viewer_id = current_user.id if current_user else None
+    if not cocktail_orm.is_public and cocktail_orm.user_id != viewer_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, 
+            detail="Brak uprawnień do wyświetlenia tego koktajlu."
+        )
+    return crud.cocktail.get_similar_cocktails(
+        db, cocktail_id=cocktail_id, limit=limit, view=view, viewer_id=viewer_id
+    )
+
+@router.get("/{cocktail_id}/similar-recipes", response_model=List[Union[CocktailWithDetails, CocktailSummary]])
+def read_similar_recipes(
+    cocktail_id: int,
+    db: Session = Depends(get_db),
+    min_similarity: Optional[float] = Query(None, gt=0, le=1, description="Minimalne podobieństwo Jaccarda zestawów składników (0-1]"),
+    limit: int = Query(10, ge=1, le=50, description="Liczba koktajli do zwrócenia"),
+    view: CocktailView = Query(CocktailView.FULL, description="Reprezentacja elementów: full lub summary"),
+    current_user: Optional[models.User] = Depends(get_current_active_user)
+):
+    """
+    Pobiera koktajle o podobnym zestawie składników.
+
+    W przeciwieństwie do /similar nie wymaga historii ocen - podobieństwo wynika z samej
+    receptury (indeks MinHash/LSH, patrz app/minhash.py).
+    
+    Raises:
+        404: Koktajl nie znaleziony
+        403: Brak uprawnień do wyświetlenia prywatnego koktajlu
+    """
+    cocktail_orm = db.query(models.Cocktail).get(cocktail_id)
+    if not cocktail_orm:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, 
+            detail="Koktajl nie znaleziony."
+        )
+    viewer_id = current_user.id if current_user else None
+    if not cocktail_orm.is_public and cocktail_orm.user_id != viewer_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, 
+            detail="Brak uprawnień do wyświetlenia tego koktajlu."
+        )
+    return crud.cocktail.get_similar_recipes(
+        db,
+        cocktail_id=cocktail_id,
+        min_similarity=min_similarity,
+        limit=limit,
+        view=view,
+        viewer_id=viewer_id
+    )
+
+@router.get("/{cocktail_id}/rating-stats", response_model=CocktailRatingStats)
+def read_cocktail_rating_stats(
+    cocktail_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(get_current_active_user)
+):
+    """
+    Pobiera rozkład ocen koktajlu (liczba ocen 1-5 gwiazdek), średnią i liczbę ocen.
+
+    Liczniki utrzymywane są przyrostowo przy zapisie ocen, więc odczyt to jeden wiersz
+    tabeli cocktails - bez przeglądania ocen.
+
+    Raises:
+        404: Koktajl nie znaleziony
+        403: Brak uprawnień do wyświetlenia prywatnego koktajlu
+    """
+    rating_stats = crud.cocktail.get_rating_stats(db, cocktail_id=cocktail_id)
+    if rating_stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Koktajl nie znaleziony."
+        )
+    is_public, author_id, stats = rating_stats
+    if not is_public and (not current_user or author_id != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Brak uprawnień do wyświetlenia tego koktajlu."
+        )
+    response.headers.update(cache_headers(request, "cocktails.rating_stats", [cocktail_ratings_key(cocktail_id)]))
+    return stats
 
 @router.put("/{cocktail_id}", response_model=CocktailWithDetails)
 def update_cocktail(
@@ -237,23 +526,8 @@ def update_cocktail(
             detail="Brak uprawnień do edycji tego koktajlu."
         )
 
-    # Walidacja składników (jeśli są aktualizowane)
-    if cocktail_in.ingredients is not None:
-        for ing_data in cocktail_in.ingredients:
-            if not crud.ingredient.get_ingredient(db, ing_data.ingredient_id):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST, 
-                    detail=f"Składnik o ID {ing_data.ingredient_id} nie istnieje."
-                )
-    
-    # Walidacja tagów (jeśli są aktualizowane)
-    if cocktail_in.tags is not None:
-        for tag_data in cocktail_in.tags:
-            if not crud.tag.get_tag(db, tag_data.tag_id):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST, 
-                    detail=f"Tag o ID {tag_data.tag_id} nie istnieje."
-                )
+    # Walidacja składników i tagów (jeśli są aktualizowane)
+    _validate_reference_ids(db, cocktail_in.ingredients, cocktail_in.tags)
     
     try:
         updated_cocktail_details = crud.cocktail.update_cocktail(
@@ -1,12 +1,14 @@
 # app/api/v1/favorites.py - Dodanie nowego endpointu sprawdzania statusu
-from typing import List, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Any, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app import crud, models, schemas
-from app.dependencies import get_db, get_current_active_user
-from app.schemas.cocktail import CocktailWithDetails
+from app.core.config import settings
+from app.dependencies import get_db, get_current_active_user, require_current_active_user
+from app.schemas.cocktail import CocktailWithDetails, CocktailSummary, CocktailView
 
 router = APIRouter()
 
@@ -15,7 +17,12 @@ class FavoriteStatusResponse(BaseModel):
     is_favorite: bool
     cocktail_id: int
 
-@router.post("/", response_model=schemas.Favorite, status_code=status.HTTP_201_CREATED)
+# Odpowiedź 202 w trybie write-behind (WRITE_BEHIND_ENABLED)
+_QUEUED_RESPONSES = {
+    status.HTTP_202_ACCEPTED: {"model": schemas.FavoriteQueued, "description": "Tryb write-behind: zmiana przyjęta do zapisu"}
+}
+
+@router.post("/", response_model=schemas.Favorite, status_code=status.HTTP_201_CREATED, responses=_QUEUED_RESPONSES)
 def add_cocktail_to_favorites(
     *,
     db: Session = Depends(get_db),
@@ -30,14 +37,20 @@ def add_cocktail_to_favorites(
     # if cocktail_to_favorite_orm.user_id == current_user.id:
     #     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nie możesz dodać własnego koktajlu do ulubionych.")
 
-    existing_favorite = crud.favorite.get_favorite(db, user_id=current_user.id, cocktail_id=favorite_in.cocktail_id)
-    if existing_favorite:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Koktajl jest już w ulubionych.")
+    if settings.WRITE_BEHIND_ENABLED:
+        if not crud.write_behind.enqueue_favorite(db, user_id=current_user.id, cocktail_id=favorite_in.cocktail_id, is_favorite=True):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Koktajl jest już w ulubionych.")
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=schemas.FavoriteQueued(is_favorite=True, cocktail_id=favorite_in.cocktail_id).model_dump()
+        )
 
     favorite = crud.favorite.create_favorite(db=db, favorite_in=favorite_in, user_id=current_user.id)
+    if favorite is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Koktajl jest już w ulubionych.")
     return favorite
 
-@router.delete("/{cocktail_id}", response_model=schemas.Favorite)
+@router.delete("/{cocktail_id}", response_model=schemas.Favorite, responses=_QUEUED_RESPONSES)
 def remove_cocktail_from_favorites(
     *,
     db: Session = Depends(get_db),
@@ -48,6 +61,14 @@ def remove_cocktail_from_favorites(
     if not cocktail_to_check_orm:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Koktajl (do usunięcia z ulubionych) nie znaleziony.")
 
+    if settings.WRITE_BEHIND_ENABLED:
+        if not crud.write_behind.enqueue_favorite(db, user_id=current_user.id, cocktail_id=cocktail_id, is_favorite=False):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Koktajl nie znaleziony w ulubionych tego użytkownika.")
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=schemas.FavoriteQueued(is_favorite=False, cocktail_id=cocktail_id).model_dump()
+        )
+
     deleted_favorite = crud.favorite.delete_favorite(db=db, user_id=current_user.id, cocktail_id=cocktail_id)
     if not deleted_favorite:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Koktajl nie znaleziony w ulubionych tego użytkownika.")
@@ -60,28 +81,22 @@ def read_my_favorites(
     skip: int = 0,
     limit: int = 100
 ):
+    crud.write_behind.flush_for_user(db, current_user.id)
     favorites = crud.favorite.get_user_favorites(db, user_id=current_user.id, skip=skip, limit=limit)
     return favorites
 
-@router.get("/my-favorites/cocktails", response_model=List[CocktailWithDetails])
+@router.get("/my-favorites/cocktails", response_model=List[Union[CocktailWithDetails, CocktailSummary]])
 def read_my_favorite_cocktails_details(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    view: CocktailView = Query(CocktailView.FULL, description="Reprezentacja elementów: full lub summary")
 ):
-    user_favorites_orm = crud.favorite.get_user_favorites(db, user_id=current_user.id, skip=skip, limit=limit)
-        
-    detailed_cocktails: List[CocktailWithDetails] = []
-    if not user_favorites_orm:
-        return []
-            
-    for fav_orm in user_favorites_orm:
-        cocktail_details = crud.cocktail.get_cocktail(db, fav_orm.cocktail_id)
-        if cocktail_details:
-            detailed_cocktails.append(cocktail_details)
-                 
-    return detailed_cocktails
+    crud.write_behind.flush_for_user(db, current_user.id)
+    return crud.cocktail.get_favorite_cocktails(
+        db, user_id=current_user.id, skip=skip, limit=limit, view=view
+    )
 
 # NOWY ENDPOINT - Sprawdzanie statusu ulubionego koktajlu
 @router.get("/cocktail/{cocktail_id}/status", response_model=FavoriteStatusResponse)
@@ -99,10 +114,28 @@ def check_cocktail_favorite_status(
     if not cocktail_orm:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Koktajl nie znaleziony.")
     
-    # Sprawdź, czy koktajl jest w ulubionych użytkownika
-    existing_favorite = crud.favorite.get_favorite(db, user_id=current_user.id, cocktail_id=cocktail_id)
-    
+    # Sprawdź, czy koktajl jest w ulubionych użytkownika (z uwzględnieniem oczekujących zapisów write-behind)
     return FavoriteStatusResponse(
-        is_favorite=existing_favorite is not None,
+        is_favorite=crud.write_behind.is_favorite(db, user_id=current_user.id, cocktail_id=cocktail_id),
         cocktail_id=cocktail_id
-    )
\ No newline at end of file
+    )
+
+@router.post("/cocktail/{cocktail_id}/toggle", response_model=FavoriteStatusResponse)
+def toggle_cocktail_favorite(
+    *,
+    db: Session = Depends(get_db),
+    cocktail_id: int,
+    current_user: models.User = Depends(require_current_active_user)
+):
+    """
+    Dodaje koktajl do ulubionych albo go z nich usuwa (jedno żądanie, jedna transakcja).
+    Zwraca stan po operacji.
+    """
+    if db.get(models.Cocktail, cocktail_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Koktajl nie znaleziony.")
+
+    if settings.WRITE_BEHIND_ENABLED:
+        is_favorite = crud.write_behind.toggle_favorite(db, user_id=current_user.id, cocktail_id=cocktail_id)
+    else:
+        is_favorite, _ = crud.favorite.toggle_favorite(db, user_id=current_user.id, cocktail_id=cocktail_id)
+    return FavoriteStatusResponse(is_favorite=is_favorite, cocktail_id=cocktail_id)
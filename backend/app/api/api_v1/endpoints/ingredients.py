@@ -1,9 +1,10 @@
 from typing import List, Any, Optional # Dodano Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.dependencies import get_db, get_current_active_user
+from app.http_cache import cache_headers, INGREDIENT_LIST_KEY
 
 router = APIRouter()
 
@@ -24,10 +25,16 @@ def create_ingredient(
 
 @router.get("/", response_model=List[schemas.Ingredient])
 def read_ingredients(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    search: Optional[str] = Query(None, description="Wyszukiwanie po nazwie (bez polskich znaków, z tolerancją literówek)"),
 ):
+    response.headers.update(cache_headers(request, "ingredients.list", [INGREDIENT_LIST_KEY]))
+    if search:
+        return crud.ingredient.search_ingredients(db, query=search, limit=limit)
     ingredients = crud.ingredient.get_ingredients(db, skip=skip, limit=limit)
     return ingredients
 
@@ -0,0 +1,32 @@
+from typing import Dict
+from fastapi import APIRouter
+
+from app.core.metrics import metrics
+from app.listing_cache import listing_cache
+from app.live_events import live_events
+from app.profile_cache import profile_cache
+
+router = APIRouter()
+
+@router.get("/", response_model=Dict[str, float])
+def read_metrics():
+    """
+    Liczniki procesu (app/core/metrics.py), np. ponowienia transakcji zapisu (db.write.*),
+    trafienia w cache skompilowanych instrukcji SQL (db.compile_cache.*, z udziałem hit_ratio),
+    pobrania połączeń z puli (db.pool.*, checked_out - aktualnie wypożyczone), cache stron
+    listy koktajli (listing_cache.*, z hit_ratio i entries), strumieni SSE (live_events.*, z subscribers)
+    oraz cache profili użytkowników (profile_cache.*, z entries).
+    Wartości dotyczą bieżącego workera i zerują się przy restarcie.
+    """
+    snapshot = metrics.snapshot()
+    compiled = snapshot.get("db.compile_cache.hit", 0) + snapshot.get("db.compile_cache.miss", 0)
+    if compiled:
+        snapshot["db.compile_cache.hit_ratio"] = snapshot.get("db.compile_cache.hit", 0) / compiled
+    snapshot["db.pool.checked_out"] = snapshot.get("db.pool.checkouts", 0) - snapshot.get("db.pool.checkins", 0)
+    looked_up = snapshot.get("listing_cache.hits", 0) + snapshot.get("listing_cache.misses", 0)
+    if looked_up:
+        snapshot["listing_cache.hit_ratio"] = snapshot.get("listing_cache.hits", 0) / looked_up
+    snapshot["listing_cache.entries"] = len(listing_cache)
+    snapshot["live_events.subscribers"] = len(live_events)
+    snapshot["profile_cache.entries"] = len(profile_cache)
+    return snapshot
@@ -1,14 +1,22 @@
 #backend\app\api\api_v1\endpoints\ratings.py
-from typing import List, Any, Optional # Dodano Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Any, Optional, Union # Dodano Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
+from app.core.config import settings
 from app.dependencies import get_db, get_current_active_user
+from app.http_cache import cache_headers, cocktail_ratings_key, user_key
 
 router = APIRouter()
 
-@router.post("/", response_model=schemas.Rating, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=schemas.Rating,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.RatingQueued, "description": "Tryb write-behind: ocena przyjęta do zapisu"}}
+)
 def create_rating(
     *,
     db: Session = Depends(get_db),
@@ -27,24 +35,59 @@ def create_rating(
         )
 
     try:
+        if settings.WRITE_BEHIND_ENABLED:
+            # Potwierdzenie po zapisie do logu write-behind - wiersz powstanie przy najbliższym flushu
+            event = crud.write_behind.enqueue_rating(db, rating_in=rating_in, user_id=current_user.id)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=schemas.RatingQueued(seq=event["seq"], cocktail_id=rating_in.cocktail_id).model_dump()
+            )
         rating_orm = crud.rating.create_rating(db=db, rating_in=rating_in, user_id=current_user.id)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) # np. "Użytkownik już ocenił ten koktajl."
     return rating_orm
 
-@router.get("/cocktail/{cocktail_id}", response_model=List[schemas.Rating])
+@router.get("/cocktail/{cocktail_id}", response_model=List[Union[schemas.RatingWithUser, schemas.Rating]])
 def read_ratings_for_cocktail(
     cocktail_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 10,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    before_id: Optional[int] = Query(None, ge=1, description="Kursor: id ostatniej oceny z poprzedniej strony (zamiast skip)"),
+    has_comment: Optional[bool] = Query(None, description="true - tylko oceny z komentarzem, false - tylko bez komentarza"),
+    expand: Optional[List[schemas.RatingExpand]] = Query(None, description="user - osadza profil autora (id, username, avatar_url) w każdej ocenie"),
+    current_user: Optional[models.User] = Depends(get_current_active_user),
 ):
+    """
+    Oceny koktajlu od najnowszych. Kolejne strony najlepiej pobierać kursorem before_id
+    (id ostatniej oceny z poprzedniej strony) - w przeciwieństwie do skip jego koszt nie
+    rośnie z numerem strony, a nowe oceny nie przesuwają wyników między stronami.
+
+    Z expand=user każda ocena zawiera pole user (null dla usuniętych kont), więc klient
+    nie musi pobierać GET /users/{id} dla każdego autora.
+    """
+    if current_user:
+        # Zalogowany widzi własne oceny czekające w buforze write-behind
+        crud.write_behind.flush_for_user(db, current_user.id)
     cocktail_to_check_orm = db.query(models.Cocktail).get(cocktail_id) # <<<--- POPRAWKA
     if not cocktail_to_check_orm:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Koktajl nie znaleziony.")
 
-    ratings_orm_list = crud.rating.get_ratings_for_cocktail(db, cocktail_id=cocktail_id, skip=skip, limit=limit)
-    return ratings_orm_list
+    ratings_orm_list = crud.rating.get_ratings_for_cocktail(
+        db, cocktail_id=cocktail_id, skip=skip, limit=limit, before_id=before_id, has_comment=has_comment
+    )
+    expand_user = bool(expand) and schemas.RatingExpand.USER in expand
+    keys = [cocktail_ratings_key(cocktail_id)]
+    if expand_user:
+        # Osadzone profile - zmiana profilu lub usunięcie konta autora czyści też tę odpowiedź
+        keys.extend(user_key(user_id) for user_id in sorted({db_rating.user_id for db_rating in ratings_orm_list}))
+    response.headers.update(cache_headers(request, "ratings.for_cocktail", keys))
+    if expand_user:
+        return crud.rating.with_users(db, ratings_orm_list)
+    # Gotowe instancje Rating - Union w response_model dopasowuje je bez odczytu relacji user
+    return [schemas.Rating.model_validate(db_rating) for db_rating in ratings_orm_list]
 
 @router.put("/{rating_id}", response_model=schemas.Rating)
 def update_my_rating(
@@ -93,6 +136,7 @@ def get_rating_for_user_and_cocktail_query( # Inna nazwa funkcji
     # current_user: models.User = Depends(get_current_active_user) # Opcjonalnie do autoryzacji
 ):
     print(f"--- DEBUG [ratings.py /user-cocktail-rating/] --- Sprawdzam ocenę dla user_id: {user_id}, cocktail_id: {cocktail_id}")
+    crud.write_behind.flush_for_user(db, user_id)
     # Potrzebujesz funkcji CRUD
     rating = crud.rating.get_rating_by_user_and_cocktail(db, user_id=user_id, cocktail_id=cocktail_id)
     if not rating:
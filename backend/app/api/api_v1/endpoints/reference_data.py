@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.dependencies import get_db
+from app.reference_data import reference_data
+
+router = APIRouter()
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Czy Accept-Encoding dopuszcza gzip (z uwzględnieniem wag q, np. "gzip;q=0" odrzuca)."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights.get("gzip", weights.get("x-gzip", weights.get("*", 0.0))) > 0
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Porównanie If-None-Match (lista ETagów lub "*") z ETagiem wybranej reprezentacji."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+@router.get(
+    "/",
+    summary="Pobierz wszystkie tagi i składniki w jednej odpowiedzi",
+    responses={
+        200: {"description": '{"version": str, "tags": [{"id", "name"}], "ingredients": [{"id", "name"}]}'},
+        304: {"description": "Dane nie zmieniły się od wersji wskazanej w If-None-Match"},
+    },
+)
+def read_reference_data(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    Zwraca wszystkie tagi i składniki (bez paginacji) jako gotowy, wcześniej
+    zserializowany snapshot. Odpowiedź zawiera ETag i X-Reference-Data-Version;
+    klient może wysłać If-None-Match i otrzymać 304 bez treści. Wersja skompresowana
+    gzipem ma własny ETag (z sufiksem -gzip) - bajty obu reprezentacji się różnią.
+    """
+    snapshot = reference_data.get(db)
+    use_gzip = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    etag = snapshot.etag[:-1] + '-gzip"' if use_gzip else snapshot.etag
+    headers = {
+        "ETag": etag,
+        "X-Reference-Data-Version": str(snapshot.version),
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
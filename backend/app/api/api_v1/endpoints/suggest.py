@@ -0,0 +1,27 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.dependencies import get_db
+from app.schemas.suggest import Suggestion, SuggestKind
+
+router = APIRouter()
+
+@router.get("/", response_model=List[Suggestion])
+def read_suggestions(
+    db: Session = Depends(get_db),
+    prefix: str = Query(..., min_length=1, max_length=100, description="Początek nazwy (bez znaczenia wielkość liter i polskie znaki)"),
+    kind: Optional[List[SuggestKind]] = Query(None, description="Rodzaje podpowiedzi: ingredient, tag, cocktail (domyślnie wszystkie)"),
+    limit: int = Query(10, ge=1, le=50, description="Maksymalna liczba podpowiedzi"),
+):
+    """
+    Podpowiedzi (autocomplete) nazw składników, tagów i publicznych koktajli.
+
+    Dopasowanie działa od początku nazwy lub od początku dowolnego słowa
+    ("limo" -> "Sok z limonki"), bez rozróżniania wielkości liter i polskich znaków
+    ("zubr" -> "Żubrówka"). Wyniki sortowane są według popularności.
+    Indeks trzymany jest w pamięci procesu (app/suggest.py).
+    """
+    kinds = [k.value for k in kind] if kind else None
+    return crud.suggest.suggest(db, prefix=prefix, kinds=kinds, limit=limit)
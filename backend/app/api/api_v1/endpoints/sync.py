@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.dependencies import get_db
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.SyncResponse)
+def read_changes(
+    db: Session = Depends(get_db),
+    since: int = Query(0, ge=0, description="next_since z poprzedniej odpowiedzi (0 - pełna synchronizacja)"),
+    limit: int = Query(1000, ge=1, le=5000, description="Maksymalna liczba wpisów dziennika zmian w odpowiedzi"),
+):
+    """
+    Zmiany publicznego katalogu (koktajle, liczniki ocen i ulubionych, tagi, składniki) od numeru since.
+
+    Każda zmieniona encja występuje raz, w aktualnym stanie; usunięte (oraz koktajle, które
+    przestały być publiczne) są w deleted. Klient zapisuje next_since i przy has_more=true
+    od razu pobiera kolejną porcję. since=0 zwraca cały katalog.
+    """
+    changes = crud.sync.get_changes(db, since=since, limit=limit)
+    if changes.next_since == since and since > crud.change_log.get_last_seq(db):
+        # Np. replika zbudowana z innej bazy - klient musi zacząć od początku
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Nieznany numer since. Wykonaj pełną synchronizację (since=0)."
+        )
+    return changes
@@ -1,9 +1,10 @@
 from typing import List, Any, Optional # Dodano Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.dependencies import get_db, get_current_active_user
+from app.http_cache import cache_headers, TAG_LIST_KEY
 
 router = APIRouter()
 
@@ -24,11 +25,14 @@ def create_tag(
 
 @router.get("/", response_model=List[schemas.Tag])
 def read_tags(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
 ):
     tags = crud.tag.get_tags(db, skip=skip, limit=limit)
+    response.headers.update(cache_headers(request, "tags.list", [TAG_LIST_KEY]))
     return tags
 
 @router.get("/{tag_id}", response_model=schemas.Tag)
@@ -1,15 +1,17 @@
 # app/api/api_v1/endpoints/users.py
 
-from typing import List, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Any, Optional, Union
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app import crud, models, schemas
-from app.dependencies import get_db, get_current_active_user
+from app import crud, models, schemas, background
+from app.dependencies import get_db, get_current_active_user, require_current_active_user
+from app.http_cache import cache_headers, cocktail_key, user_cocktails_key, user_key
 
 # Dodaj te importy jeśli ich nie ma:
-from app.schemas.cocktail import CocktailWithDetails
+from app.schemas.cocktail import CocktailWithDetails, CocktailSummary, CocktailView
 
 router = APIRouter()
 
@@ -21,6 +23,27 @@ def read_current_user(
     print(f"--- DEBUG [users.py /me] --- Endpoint /me trafiony dla użytkownika: {current_user.username if current_user else 'None'}")
     return current_user
 
+# --- Endpoint rekomendacji dla zalogowanego użytkownika ---
+@router.get(
+    "/me/recommendations",
+    response_model=List[Union[CocktailWithDetails, CocktailSummary]],
+    summary="Pobierz rekomendowane koktajle dla zalogowanego użytkownika"
+)
+def read_my_recommendations(
+    db: Session = Depends(get_db),
+    limit: int = Query(12, ge=1, le=50, description="Liczba koktajli do zwrócenia"),
+    view: CocktailView = Query(CocktailView.FULL, description="Reprezentacja elementów: full lub summary"),
+    current_user: models.User = Depends(require_current_active_user)
+):
+    """
+    Pobiera koktajle podobne do ulubionych i wysoko ocenionych przez użytkownika.
+    Użytkownicy bez historii otrzymują ranking "trending".
+    """
+    crud.write_behind.flush_for_user(db, current_user.id)
+    return crud.cocktail.get_recommended_cocktails(
+        db, user_id=current_user.id, limit=limit, view=view
+    )
+
 # --- Endpoint listy użytkowników ---
 @router.get("/", response_model=List[schemas.User])
 def read_users(
@@ -46,14 +69,17 @@ def read_user_by_id_endpoint(
 # --- FIXED ENDPOINT: Pobieranie koktajli użytkownika ---
 @router.get(
     "/{user_id}/cocktails",
-    response_model=List[schemas.CocktailWithDetails],
+    response_model=List[Union[CocktailWithDetails, CocktailSummary]],
     summary="Pobierz koktajle stworzone przez użytkownika"
 )
 def read_user_cocktails(
     user_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = Query(0, ge=0, description="Liczba rekordów do pominięcia (paginacja)"),
     limit: int = Query(10, ge=1, le=100, description="Maksymalna liczba rekordów do zwrócenia (paginacja)"),
+    view: CocktailView = Query(CocktailView.FULL, description="Reprezentacja elementów: full lub summary"),
     current_user: Optional[models.User] = Depends(get_current_active_user)  # Dodane dla uprawnień
 ):
     """
@@ -82,10 +108,14 @@ def read_user_cocktails(
             user_id=user_id,
             skip=skip,
             limit=limit,
-            include_private=show_private
+            include_private=show_private,
+            view=view
         )
         
         print(f"--- DEBUG [users.py /users/{{user_id}}/cocktails] --- Znaleziono {len(result)} koktajli dla użytkownika o ID {user_id}.")
+        response.headers.update(cache_headers(
+            request, "users.cocktails", [user_cocktails_key(user_id), *(cocktail_key(item.id) for item in result)]
+        ))
         return result
         
     except Exception as e:
@@ -97,6 +127,45 @@ def read_user_cocktails(
             detail="Wystąpił błąd podczas pobierania koktajli użytkownika."
         )
 
+# --- Endpoint profilu użytkownika ---
+@router.get(
+    "/{user_id}/profile",
+    response_model=schemas.UserProfile,
+    summary="Pobierz profil użytkownika ze statystykami i pierwszą stroną koktajli"
+)
+def read_user_profile(
+    user_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    cocktails_limit: int = Query(10, ge=1, le=100, description="Liczba koktajli użytkownika w odpowiedzi"),
+    view: CocktailView = Query(CocktailView.FULL, description="Reprezentacja koktajli: full lub summary"),
+    current_user: Optional[models.User] = Depends(get_current_active_user)
+):
+    """
+    Dane użytkownika, statystyki (koktajle, wystawione oceny i ulubione, średnia ocen
+    otrzymanych) i najnowsze koktajle w jednej odpowiedzi. Statystyki pochodzą z tabeli
+    user_stats utrzymywanej przy zapisach - bez zliczania ocen i ulubionych przy odczycie.
+    Właściciel profilu widzi też swoje prywatne koktajle.
+    """
+    db_user = crud.user.get_user(db, user_id=user_id)
+    if db_user is None or db_user.deleted_at is not None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Użytkownik nie znaleziony.")
+
+    include_private = current_user is not None and current_user.id == user_id
+    if include_private:
+        # Własny profil uwzględnia oceny i ulubione czekające w buforze write-behind
+        crud.write_behind.flush_for_user(db, user_id)
+    stats = crud.user_stats.get_profile_stats(db, user_id=user_id, include_private=include_private)
+    cocktails = crud.cocktail.get_cocktails_by_user(
+        db=db, user_id=user_id, skip=0, limit=cocktails_limit, include_private=include_private, view=view
+    )
+    response.headers.update(cache_headers(
+        request, "users.profile",
+        [user_key(user_id), user_cocktails_key(user_id), *(cocktail_key(item.id) for item in cocktails)]
+    ))
+    return schemas.UserProfile(user=db_user, stats=stats, cocktails=cocktails)
+
 # --- Endpoint aktualizacji danych zalogowanego użytkownika ---
 @router.put("/me", response_model=schemas.User)
 def update_user_me(
@@ -127,4 +196,21 @@ def update_user_me(
         print(f"Błąd podczas aktualizacji użytkownika: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Wystąpił błąd serwera podczas aktualizacji użytkownika.")
         
-    return user
\ No newline at end of file
+    return user
+
+# --- Endpoint usunięcia konta zalogowanego użytkownika ---
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+def delete_user_me(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_current_active_user),
+):
+    """
+    Usuwa konto wraz z koktajlami, ocenami i ulubionymi.
+    204 - usunięte od razu; 202 - konto zablokowane, historia usuwana w tle.
+    """
+    user_id = current_user.id
+    if crud.user.delete_user(db, db_user=current_user):
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    background_tasks.add_task(background.purge_user, user_id)
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"status": "scheduled", "user_id": user_id})
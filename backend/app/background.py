@@ -0,0 +1,198 @@
+# app/background.py
+import asyncio
+import time
+from typing import List
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.crud.crud_trending import trending as crud_trending
+from app.crud.crud_recommendation import recommendation as crud_recommendation
+from app.crud.crud_recipe_index import recipe_index_crud
+from app.crud.crud_suggest import suggest as crud_suggest
+from app.crud.crud_search import search as crud_search
+from app.crud.crud_user import user as crud_user
+from app.crud.crud_write_behind import write_behind as crud_write_behind
+from app.crud.crud_cocktail import cocktail as crud_cocktail
+from app.crud.crud_change_log import change_log as crud_change_log
+from app.live_events import live_events
+from app.write_behind import write_behind_buffer
+
+def load_recipe_index() -> None:
+    db = SessionLocal()
+    try:
+        recipe_index_crud.load(db)
+    except Exception as e:
+        db.rollback()
+        print(f"Błąd podczas ładowania indeksu LSH receptur: {type(e).__name__} - {e}")
+    finally:
+        db.close()
+
+def load_suggest_index() -> None:
+    db = SessionLocal()
+    try:
+        crud_suggest.load(db)
+    except Exception as e:
+        print(f"Błąd podczas ładowania indeksu podpowiedzi: {type(e).__name__} - {e}")
+    finally:
+        db.close()
+
+async def suggest_reload_loop() -> None:
+    """Okresowo przeładowuje indeks podpowiedzi - popularność zmienia się przy każdej ocenie i ulubionym."""
+    while True:
+        await asyncio.sleep(settings.SUGGEST_RELOAD_INTERVAL_SECONDS)
+        await asyncio.to_thread(load_suggest_index)
+
+def load_search_index() -> None:
+    db = SessionLocal()
+    try:
+        crud_search.load(db)
+    except Exception as e:
+        print(f"Błąd podczas ładowania indeksu trigramów wyszukiwania: {type(e).__name__} - {e}")
+    finally:
+        db.close()
+
+def renormalize_trending() -> None:
+    db = SessionLocal()
+    try:
+        crud_trending.renormalize(db)
+        metrics.incr("background.trending_renormalized")
+    except Exception as e:
+        db.rollback()
+        print(f"Błąd podczas przeskalowania wyników trending: {type(e).__name__} - {e}")
+    finally:
+        db.close()
+
+async def trending_renormalize_loop() -> None:
+    """Okresowo przeskalowuje wyniki trending, aby nie rosły wykładniczo z czasem."""
+    while True:
+        await asyncio.sleep(settings.TRENDING_RENORMALIZE_INTERVAL_SECONDS)
+        await asyncio.to_thread(renormalize_trending)
+
+def rebuild_recommendations() -> float:
+    """Przebudowuje rekomendacje, jeśli są nieaktualne. Zwraca liczbę sekund do kolejnej próby."""
+    interval = settings.RECOMMENDER_REBUILD_INTERVAL_SECONDS
+    db = SessionLocal()
+    try:
+        # Przy kilku workerach (i restartach) przebudowuje tylko ten, który zastał tabelę nieaktualną
+        rows = crud_recommendation.rebuild(db, max_age=interval)
+        if rows is None:
+            metrics.incr("background.recommendations_rebuild_skipped")
+        else:
+            metrics.incr("background.recommendations_rebuilt")
+            metrics.incr("background.recommendation_pairs_written", rows)
+        last_rebuilt = crud_recommendation.last_rebuilt(db)
+    except Exception as e:
+        db.rollback()
+        print(f"Błąd podczas przebudowy rekomendacji: {type(e).__name__} - {e}")
+        return interval
+    finally:
+        db.close()
+    if last_rebuilt is None:
+        return interval
+    # Kolejna próba, gdy tabela przekroczy wiek interval (przebudowa innego workera przesuwa termin)
+    return min(interval, max(interval - (time.time() - last_rebuilt), 1.0))
+
+async def recommendations_rebuild_loop() -> None:
+    """
+    Okresowo przebudowuje tabelę podobnych koktajli. Przy starcie przebudowa tylko wtedy,
+    gdy tabela jest starsza niż RECOMMENDER_REBUILD_INTERVAL_SECONDS (lub pusta).
+    """
+    while True:
+        delay = await asyncio.to_thread(rebuild_recommendations)
+        await asyncio.sleep(delay)
+
+def flush_write_behind() -> None:
+    db = SessionLocal()
+    try:
+        crud_write_behind.flush(db)
+    except Exception as e:
+        db.rollback()
+        # Zdarzenia zostają w logu i buforze - kolejna próba przy następnym przebiegu
+        print(f"Błąd podczas zapisu zdarzeń write-behind: {type(e).__name__} - {e}")
+    finally:
+        db.close()
+
+def open_write_behind() -> None:
+    pending = write_behind_buffer.open()
+    if pending:
+        metrics.incr("write_behind.recovered_events", pending)
+        flush_write_behind()
+
+async def write_behind_flush_loop() -> None:
+    """Co WRITE_BEHIND_FLUSH_INTERVAL_MS zapisuje partię oczekujących ocen i ulubionych."""
+    try:
+        while True:
+            await asyncio.sleep(settings.WRITE_BEHIND_FLUSH_INTERVAL_MS / 1000)
+            if write_behind_buffer.pending_count():
+                await asyncio.to_thread(flush_write_behind)
+    finally:
+        # Przy zamknięciu aplikacji zapisujemy to, co zostało (reszta i tak jest w logu)
+        await asyncio.to_thread(flush_write_behind)
+        write_behind_buffer.close()
+
+def purge_user(user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        crud_user.purge_user(db, user_id)
+        metrics.incr("background.users_purged")
+    except Exception as e:
+        db.rollback()
+        # Konto zostaje oznaczone (deleted_at) - dokończy je kolejny przebieg purge_deleted_users
+        print(f"Błąd podczas usuwania konta użytkownika {user_id}: {type(e).__name__} - {e}")
+    finally:
+        db.close()
+
+def purge_deleted_users() -> None:
+    db = SessionLocal()
+    try:
+        user_ids = crud_user.get_users_pending_purge(db)
+    finally:
+        db.close()
+    for user_id in user_ids:
+        purge_user(user_id)
+
+async def user_purge_loop() -> None:
+    """Dokańcza usuwanie kont oznaczonych do usunięcia (np. przerwane restartem)."""
+    while True:
+        await asyncio.to_thread(purge_deleted_users)
+        await asyncio.sleep(settings.USER_PURGE_SWEEP_INTERVAL_SECONDS)
+
+def compact_change_log() -> None:
+    db = SessionLocal()
+    try:
+        removed = crud_change_log.compact(db, settings.CHANGE_LOG_COMPACT_BATCH_SIZE)
+        metrics.incr("background.change_log_compacted")
+        metrics.incr("background.change_log_entries_removed", removed)
+    except Exception as e:
+        db.rollback()
+        print(f"Błąd podczas kompaktowania dziennika zmian: {type(e).__name__} - {e}")
+    finally:
+        db.close()
+
+async def change_log_compact_loop() -> None:
+    """Okresowo usuwa z dziennika zmian wpisy zastąpione późniejszymi zmianami tych samych encji."""
+    while True:
+        await asyncio.sleep(settings.CHANGE_LOG_COMPACT_INTERVAL_SECONDS)
+        await asyncio.to_thread(compact_change_log)
+
+def load_live_event_stats(cocktail_ids: List[int]) -> list:
+    db = SessionLocal()
+    try:
+        return crud_cocktail.get_stats_rows(db, cocktail_ids)
+    finally:
+        db.close()
+
+async def live_events_loop() -> None:
+    """Co LIVE_EVENTS_COALESCE_INTERVAL_MS rozsyła aktualne liczniki koktajli zmienionych w tym okresie."""
+    while True:
+        await asyncio.sleep(settings.LIVE_EVENTS_COALESCE_INTERVAL_MS / 1000)
+        cocktail_ids = live_events.take_pending()
+        if not cocktail_ids:
+            continue
+        try:
+            rows = await asyncio.to_thread(load_live_event_stats, cocktail_ids)
+        except Exception as e:
+            print(f"Błąd podczas odczytu liczników dla zdarzeń na żywo: {type(e).__name__} - {e}")
+            continue
+        live_events.broadcast(rows)
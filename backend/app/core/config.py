@@ -20,6 +20,97 @@ class Settings(BaseSettings):
     HOST: str = "127.0.0.1"
     PORT: int = 8000
 
+    # Ranking "top rated" - średnia bayesowska: (WAGA * ŚREDNIA_A_PRIORI + suma ocen) / (WAGA + liczba ocen)
+    RATING_PRIOR_MEAN: float = 3.0
+    RATING_PRIOR_WEIGHT: int = 5
+
+    # Ranking "trending" - wykładnicze wygaszanie aktywności (ocen i ulubionych)
+    TRENDING_HALF_LIFE_HOURS: float = 48.0
+    TRENDING_RATING_WEIGHT: float = 1.0
+    TRENDING_FAVORITE_WEIGHT: float = 2.0
+    TRENDING_RENORMALIZE_INTERVAL_SECONDS: int = 3600
+    # Wyniki poniżej tego progu (po przeskalowaniu) są zerowane
+    TRENDING_MIN_SCORE: float = 0.001
+
+    # Rekomendacje item-to-item (app/recommender.py)
+    RECOMMENDER_TOP_K: int = 20
+    RECOMMENDER_FAVORITE_WEIGHT: float = 1.0
+    RECOMMENDER_RATING_WEIGHT: float = 1.0
+    RECOMMENDER_REBUILD_INTERVAL_SECONDS: int = 6 * 3600
+
+    # Podobne receptury - MinHash/LSH po składnikach (app/minhash.py)
+    MINHASH_NUM_PERM: int = 64
+    MINHASH_BANDS: int = 32
+    SIMILAR_RECIPE_MIN_JACCARD: float = 0.5
+    # Próg, od którego nowa receptura oznaczana jest jako prawie duplikat
+    NEAR_DUPLICATE_RECIPE_JACCARD: float = 0.9
+
+    # Przeładowanie indeksu podpowiedzi z bazy (app/suggest.py) - odświeża popularność
+    SUGGEST_RELOAD_INTERVAL_SECONDS: int = 300
+
+    # Snapshot tagów i składników (app/reference_data.py) - maksymalny wiek przed ponownym odczytem z bazy
+    REFERENCE_DATA_TTL_SECONDS: int = 60
+
+    # Współdzielony cache stron publicznej listy koktajli (app/listing_cache.py); 0 wyłącza cache
+    LISTING_CACHE_TTL_SECONDS: int = 15
+    LISTING_CACHE_MAX_ENTRIES: int = 2000
+    # Liczby wyników per zestaw filtrów (count=cached) i limit liczenia dla count=estimated
+    LISTING_COUNT_CACHE_TTL_SECONDS: int = 300
+    LISTING_COUNT_ESTIMATE_CAP: int = 1000
+    # Powyżej tylu pasujących prywatnych koktajli użytkownika lista liczona jest bezpośrednio, bez cache
+    LISTING_PRIVATE_OVERLAY_MAX: int = 50
+
+    # Łączenie równoczesnych identycznych odczytów koktajli w workerze (app/single_flight.py)
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS: float = 10.0
+
+    # Nagłówki cache dla reverse proxy i purge po Surrogate-Key (app/http_cache.py)
+    HTTP_CACHE_ENABLED: bool = True
+    # Adres, na który wysyłane jest żądanie PURGE z nagłówkiem Surrogate-Key (brak - tylko subskrybenci w procesie)
+    HTTP_CACHE_PURGE_URL: Optional[str] = None
+    HTTP_CACHE_PURGE_TIMEOUT_SECONDS: float = 2.0
+
+    # Cache skróconych profili użytkowników osadzanych w listach (app/profile_cache.py); 0 wyłącza cache
+    USER_PROFILE_CACHE_TTL_SECONDS: int = 300
+    USER_PROFILE_CACHE_MAX_ENTRIES: int = 5000
+
+    # Strumienie SSE liczników ocen i ulubionych (app/live_events.py) - zmiany jednego koktajlu
+    # w obrębie okresu łączone są w jedno zdarzenie
+    LIVE_EVENTS_COALESCE_INTERVAL_MS: int = 1000
+    LIVE_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    LIVE_EVENTS_QUEUE_SIZE: int = 100
+    LIVE_EVENTS_MAX_SUBSCRIBERS: int = 1000
+
+    # Wyszukiwanie odporne na literówki (app/trigram.py) - minimalny odsetek trigramów zapytania w nazwie
+    SEARCH_FUZZY_MIN_SIMILARITY: float = 0.5
+
+    # Rozmiar cache skompilowanych instrukcji SQL silnika (domyślnie w SQLAlchemy 500) - każda kombinacja
+    # filtrów/sortowania/widoku listy koktajli to osobny wpis; trafienia widać w db.compile_cache.* (GET /metrics/)
+    SQL_COMPILED_CACHE_SIZE: int = 1200
+
+    # Transakcje zapisu (app/db/transaction.py) - ponawianie przy SQLITE_BUSY / błędach serializacji
+    SQLITE_BUSY_TIMEOUT_SECONDS: float = 5.0
+    DB_WRITE_MAX_ATTEMPTS: int = 5
+    DB_WRITE_BACKOFF_BASE_SECONDS: float = 0.02
+    DB_WRITE_BACKOFF_MAX_SECONDS: float = 0.5
+
+    # Tryb write-behind (app/write_behind.py) - oceny i ulubione potwierdzane po zapisie do logu,
+    # zapisywane do bazy partiami przez zadanie w tle
+    WRITE_BEHIND_ENABLED: bool = False
+    WRITE_BEHIND_LOG_PATH: str = "./write_behind.log"
+    WRITE_BEHIND_FLUSH_INTERVAL_MS: int = 200
+    WRITE_BEHIND_MAX_BATCH: int = 5000
+    WRITE_BEHIND_FSYNC: bool = True
+
+    # Kompaktowanie dziennika zmian GET /sync (CRUDChangeLog.compact) - co ile i po ile numerów seq na transakcję
+    CHANGE_LOG_COMPACT_INTERVAL_SECONDS: int = 3600
+    CHANGE_LOG_COMPACT_BATCH_SIZE: int = 5000
+
+    # Usuwanie kont (CRUDUser.delete_user) - powyżej limitu wierszy historii usuwanie odbywa się w tle, partiami
+    USER_PURGE_SYNC_LIMIT: int = 1000
+    USER_PURGE_BATCH_SIZE: int = 500
+    USER_PURGE_SWEEP_INTERVAL_SECONDS: int = 600
+
     # CORS
     BACKEND_CORS_ORIGINS: list[AnyHttpUrl] = ["http://localhost:3000"] # Frontend URL
 
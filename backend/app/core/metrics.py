@@ -0,0 +1,31 @@
+# app/core/metrics.py
+"""
+Proste liczniki w pamięci procesu (bez zewnętrznych zależności).
+
+Wartości są per-worker i zerują się przy restarcie; GET /metrics/ zwraca ich migawkę.
+"""
+import threading
+from typing import Dict
+
+class Metrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+metrics = Metrics()
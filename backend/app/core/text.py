@@ -0,0 +1,14 @@
+import unicodedata
+
+# Litery, których NFKD nie rozkłada na literę bazową + znak diakrytyczny
+_EXTRA_FOLDS = str.maketrans({"ł": "l", "Ł": "L", "ß": "ss", "ø": "o", "Ø": "O", "đ": "d", "Đ": "D"})
+
+def fold_text(text: str) -> str:
+    """
+    Normalizuje tekst do porównań: usuwa znaki diakrytyczne (w tym polskie
+    ą, ć, ę, ł, ń, ó, ś, ź, ż), zamienia na małe litery i scala białe znaki.
+    "Żubrówka  z SOKIEM" -> "zubrowka z sokiem"
+    """
+    decomposed = unicodedata.normalize("NFKD", text.translate(_EXTRA_FOLDS))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
@@ -4,6 +4,15 @@ from .crud_ingredient import ingredient
 from .crud_tag import tag
 from .crud_rating import rating
 from .crud_favorite import favorite
+from .crud_trending import trending
+from .crud_recommendation import recommendation
+from .crud_recipe_index import recipe_index_crud as recipe_index
+from .crud_suggest import suggest
+from .crud_search import search
+from .crud_write_behind import write_behind
+from .crud_change_log import change_log
+from .crud_sync import sync
+from .crud_user_stats import user_stats
 
 # Jeśli używasz `from app import crud` do importowania,
 # możesz chcieć zaimportować wszystkie obiekty CRUD tutaj, np.
@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import insert, select, delete, exists, func, bindparam, and_, or_, Integer
+from sqlalchemy.orm import Session, aliased
+
+from app.models.change_log import ChangeLogEntry
+from app.db.statement_cache import statements
+from app.db.transaction import run_write_transaction
+
+# Rodzaje encji w dzienniku zmian
+COCKTAIL = "cocktail"
+COCKTAIL_STATS = "cocktail_stats"  # liczniki ocen i ulubionych (bez zmiany samego koktajlu)
+TAG = "tag"
+INGREDIENT = "ingredient"
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+class CRUDChangeLog:
+    """
+    Dziennik zmian katalogu dla synchronizacji przyrostowej klientów (GET /sync).
+
+    record() nie robi commit - wywoływany jest w transakcji zapisu zmiany, więc wpis
+    pojawia się w dzienniku wtedy i tylko wtedy, gdy zmiana została zatwierdzona.
+    Numer seq rośnie monotonicznie; na SQLite zapisy są szeregowane, więc wpisy stają się
+    widoczne w kolejności seq (na bazach z równoległymi zapisami klient powinien cofać
+    since o kilka sekund ruchu lub baza musi nadawać seq przy commit).
+
+    compact() usuwa wpisy zastąpione późniejszymi, więc dziennik nie rośnie z każdą oceną
+    czy ulubionym - jego rozmiar zależy od liczby encji, a nie liczby zmian.
+    """
+
+    def record(self, db: Session, entity: str, entity_ids: Iterable[int], op: str = UPSERT) -> None:
+        rows = [{"entity": entity, "entity_id": entity_id, "op": op} for entity_id in entity_ids]
+        if rows:
+            db.execute(insert(ChangeLogEntry), rows)
+
+    def get_since(self, db: Session, since: int, limit: int) -> Tuple[Dict[Tuple[str, int], str], int, bool]:
+        """
+        Zwraca zmiany o seq > since (najwyżej limit wpisów) złączone per encja - liczy się
+        ostatnia operacja - oraz seq ostatniego odczytanego wpisu i informację, czy są kolejne.
+        """
+        stmt = statements.get("change_log.since", lambda: (
+            select(ChangeLogEntry.seq, ChangeLogEntry.entity, ChangeLogEntry.entity_id, ChangeLogEntry.op)
+            .where(ChangeLogEntry.seq > bindparam("since", type_=Integer))
+            .order_by(ChangeLogEntry.seq)
+            .limit(bindparam("limit", type_=Integer))
+        ))
+        rows = db.execute(stmt, {"since": since, "limit": limit}).all()
+        changes: Dict[Tuple[str, int], str] = {}
+        for row in rows:
+            changes[(row.entity, row.entity_id)] = row.op
+        last_seq = rows[-1].seq if rows else since
+        return changes, last_seq, len(rows) == limit
+
+    def get_last_seq(self, db: Session) -> int:
+        return db.scalar(select(func.max(ChangeLogEntry.seq))) or 0
+
+    def _compact_statement(self):
+        # Wpis jest zbędny, jeśli ta sama encja ma wpis o większym seq: każdy klient, który
+        # odczytałby stary wpis (since < seq), odczyta też nowszy. Liczniki koktajlu zastępuje
+        # także późniejszy pełny wpis koktajlu (zawiera liczniki) lub jego usunięcie.
+        later = aliased(ChangeLogEntry)
+        superseded = exists().where(
+            later.entity_id == ChangeLogEntry.entity_id,
+            later.seq > ChangeLogEntry.seq,
+            or_(
+                later.entity == ChangeLogEntry.entity,
+                and_(ChangeLogEntry.entity == COCKTAIL_STATS, later.entity == COCKTAIL)
+            )
+        )
+        return (
+            delete(ChangeLogEntry)
+            .where(
+                ChangeLogEntry.seq >= bindparam("from_seq", type_=Integer),
+                ChangeLogEntry.seq < bindparam("to_seq", type_=Integer),
+                superseded
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def compact(self, db: Session, batch_size: int) -> int:
+        """
+        Usuwa wpisy zastąpione późniejszymi wpisami tej samej encji. Wynik GET /sync dla
+        dowolnego since (także 0 - pełnej synchronizacji) się nie zmienia. Przetwarza zakresy
+        batch_size numerów seq, każdy w osobnej krótkiej transakcji; zwraca liczbę usuniętych wpisów.
+        """
+        stmt = statements.get("change_log.compact", self._compact_statement)
+        last_seq = self.get_last_seq(db)
+        first_seq = db.scalar(select(func.min(ChangeLogEntry.seq))) or 0
+        removed = 0
+        for from_seq in range(first_seq, last_seq + 1, batch_size):
+            params = {"from_seq": from_seq, "to_seq": min(from_seq + batch_size, last_seq + 1)}
+            removed += run_write_transaction(
+                db, lambda: db.execute(stmt, params).rowcount, name="change_log.compact"
+            )
+        return removed
+
+change_log = CRUDChangeLog()
@@ -1,6 +1,7 @@
-from typing import Optional, List, Union, Dict, Any
-from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import select, delete, and_, distinct, func, case, text
+from typing import Optional, List, Union, Dict, Any, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, update, and_, or_, distinct, func, case, text, literal, bindparam, Integer, Float
+import json
 import math
 
 # Importy modeli
@@ -9,101 +10,633 @@ from app.models.ingredient import Ingredient
 from app.models.tag import Tag
 from app.models.user import User
 from app.models.rating import Rating
+from app.models.favorite import Favorite
+from app.models.recommendation import CocktailSimilarity
 from app import models
+from app.core.config import settings
+from app.minhash import recipe_index
+from app.suggest import suggest_index
+from app.crud.crud_recipe_index import recipe_index_crud
+from app.crud.crud_change_log import change_log, COCKTAIL, COCKTAIL_STATS, DELETE
+from app.crud.crud_user_stats import user_stats
+from app.db.transaction import run_write_transaction
+from app.db.statement_cache import statements
+from app.listing_cache import listing_cache, ListingPage
+from app.single_flight import cocktail_reads
+from app.http_cache import purge_keys, cocktail_key, cocktail_ratings_key, user_cocktails_key, COCKTAIL_LIST_KEY
+from app.core.metrics import metrics
+from app.crud.crud_search import search as search_crud
+from app.core.text import fold_text
+from app.trigram import cocktail_name_index
 
 # Importy schematów
 from app.schemas.cocktail import (
     CocktailCreate, CocktailUpdate, CocktailIngredientData,
-    CocktailWithDetails, IngredientInCocktailDetail, UnitEnum 
+    CocktailWithDetails, CocktailSummary, CocktailView, CocktailSort, CocktailCount, CocktailStats,
+    CocktailRatingStats, IngredientInCocktailDetail, UnitEnum
 )
 from app.schemas.user import User as UserSchema
 from app.schemas.tag import Tag as TagSchema
 from app import schemas
 
+def average_rating_value(avg_rating: Optional[Any]) -> Optional[float]:
+    """Średnia z kolumny avg_rating (już zaokrąglona w SQL) jako float - bez ponownego round()."""
+    return float(avg_rating) if avg_rating is not None else None
+
 class CRUDCocktail:
 
-    def _build_cocktail_with_details(self, db: Session, cocktail_orm: Cocktail, avg_rating=None, ratings_count=None) -> Optional[CocktailWithDetails]:
-        if not cocktail_orm:
-            return None
+    # Kolumny potrzebne do widoku "summary" - bez instrukcji, opisu i autora
+    _summary_columns = (
+        Cocktail.id,
+        Cocktail.name,
+        Cocktail.image_url,
+        Cocktail.is_public,
+        Cocktail.user_id,
+        Cocktail.created_at,
+        Cocktail.favorites_count,
+    )
+
+    # Kolejność dla każdej opcji sortowania - wszystkie kolumny są indeksowane,
+    # a id (rowid) rozstrzyga remisy, więc sortowanie to zwykły skan indeksu
+    _sort_orders = {
+        CocktailSort.NEWEST: (Cocktail.created_at.desc(), Cocktail.id.desc()),
+        CocktailSort.TOP_RATED: (Cocktail.bayesian_rating.desc(), Cocktail.id.desc()),
+        CocktailSort.MOST_RATED: (Cocktail.ratings_count.desc(), Cocktail.id.desc()),
+        CocktailSort.MOST_FAVORITED: (Cocktail.favorites_count.desc(), Cocktail.id.desc()),
+    }
+
+    # Kolumny widoku "full" - koktajl i autor w jednym płaskim wierszu Core, bez obiektów ORM
+    # (brak instrumentacji atrybutów, mapy tożsamości i loaderów relacji)
+    _full_columns = (
+        Cocktail.id,
+        Cocktail.name,
+        Cocktail.description,
+        Cocktail.instructions,
+        Cocktail.image_url,
+        Cocktail.is_public,
+        Cocktail.user_id,
+        Cocktail.created_at,
+        Cocktail.updated_at,
+        Cocktail.favorites_count,
+        User.username.label('author_username'),
+        User.email.label('author_email'),
+        User.bio.label('author_bio'),
+        User.avatar_url.label('author_avatar_url'),
+        User.created_at.label('author_created_at'),
+        User.updated_at.label('author_updated_at'),
+    )
+
+    # Liczniki rozkładu ocen per liczba gwiazdek (utrzymywane przez update_rating_stats)
+    _star_columns = {
+        1: Cocktail.ratings_1,
+        2: Cocktail.ratings_2,
+        3: Cocktail.ratings_3,
+        4: Cocktail.ratings_4,
+        5: Cocktail.ratings_5,
+    }
+
+    # Średnia ocena wyliczana z przechowywanych liczników (NULL dla koktajli bez ocen),
+    # zaokrąglona do setnych połówkami w górę w arytmetyce całkowitej: floor((200*sum + count) / (2*count))
+    # to liczba setnych. Ta sama wartość trafia do list, szczegółów (JSON z bazy), statystyk i /sync,
+    # niezależnie od dialektu i od round() Pythona (25/8 -> 3.13, 107/40 -> 2.68 wszędzie)
+    _average_rating_expr = case(
+        (Cocktail.ratings_count > 0,
+         ((Cocktail.ratings_sum * 200 + Cocktail.ratings_count) // (Cocktail.ratings_count * 2)) / 100.0),
+        else_=None
+    )
+
+    def _listing_query(self, view: CocktailView = CocktailView.FULL):
+        """
+        Bazowe zapytanie listy koktajli ze średnią oceną i liczbą ocen.
+
+        Statystyki ocen czytane są z kolumn utrzymywanych przyrostowo, więc zapytanie
+        nie wymaga złączenia z tabelą ratings ani GROUP BY.
+        Zwraca same kolumny (wiersze Core), a nie encje ORM. Dla widoku SUMMARY wybiera tylko
+        kolumny potrzebne na kartę koktajlu, dla FULL dołącza kolumny autora; składniki i tagi
+        doczytywane są jednym zapytaniem dla całej strony.
+
+        Wywołujący budują z niego instrukcje z bindparam() i trzymają je w app/db/statement_cache.py,
+        więc zapytanie tworzone jest raz na kształt, a nie przy każdym żądaniu.
+        """
+        rating_columns = (
+            self._average_rating_expr.label('avg_rating'),
+            Cocktail.ratings_count.label('ratings_count')
+        )
+        if view == CocktailView.SUMMARY:
+            return select(*self._summary_columns, *rating_columns)
+        return (
+            select(*self._full_columns, *rating_columns)
+            .join(User, User.id == Cocktail.user_id)
+        )
+
+    def _page(self, stmt):
+        """LIMIT/OFFSET jako parametry :limit i :offset (jedna instrukcja dla wszystkich stron)."""
+        return stmt.offset(bindparam("offset", type_=Integer)).limit(bindparam("limit", type_=Integer))
+
+    def _visible_to(self, stmt, with_viewer: bool):
+        """Publiczne koktajle oraz (dla with_viewer) prywatne koktajle użytkownika :viewer_id."""
+        if with_viewer:
+            return stmt.where((Cocktail.is_public == True) | (Cocktail.user_id == bindparam("viewer_id")))
+        return stmt.where(Cocktail.is_public == True)
 
-        ingredients_details = []
-        stmt_ing = (
+    def _get_tags_for_cocktails(self, db: Session, cocktail_ids: List[int]) -> Dict[int, List[TagSchema]]:
+        """Pobiera tagi dla wielu koktajli jednym zapytaniem."""
+        tags_by_cocktail: Dict[int, List[TagSchema]] = {cocktail_id: [] for cocktail_id in cocktail_ids}
+        if not cocktail_ids:
+            return tags_by_cocktail
+
+        stmt = statements.get("cocktail.tags_for_ids", lambda: (
+            select(cocktail_tag_association.c.cocktail_id, Tag.id, Tag.name)
+            .join(Tag, Tag.id == cocktail_tag_association.c.tag_id)
+            .where(cocktail_tag_association.c.cocktail_id.in_(bindparam("cocktail_ids", expanding=True)))
+        ))
+        for row in db.execute(stmt, {"cocktail_ids": cocktail_ids}).all():
+            tags_by_cocktail[row.cocktail_id].append(TagSchema(id=row.id, name=row.name))
+        return tags_by_cocktail
+
+    def _get_ingredients_for_cocktails(
+        self, db: Session, cocktail_ids: List[int]
+    ) -> Dict[int, List[IngredientInCocktailDetail]]:
+        """Pobiera składniki (z ilością i jednostką) dla wielu koktajli jednym zapytaniem."""
+        ingredients_by_cocktail: Dict[int, List[IngredientInCocktailDetail]] = {
+            cocktail_id: [] for cocktail_id in cocktail_ids
+        }
+        if not cocktail_ids:
+            return ingredients_by_cocktail
+
+        stmt = statements.get("cocktail.ingredients_for_ids", lambda: (
             select(
+                cocktail_ingredient_association.c.cocktail_id,
                 Ingredient.id,
                 Ingredient.name,
                 cocktail_ingredient_association.c.amount,
                 cocktail_ingredient_association.c.unit
             )
             .join_from(cocktail_ingredient_association, Ingredient, cocktail_ingredient_association.c.ingredient_id == Ingredient.id)
-            .where(cocktail_ingredient_association.c.cocktail_id == cocktail_orm.id)
-        )
-        
-        for row in db.execute(stmt_ing).all():
+            .where(cocktail_ingredient_association.c.cocktail_id.in_(bindparam("cocktail_ids", expanding=True)))
+        ))
+        for row in db.execute(stmt, {"cocktail_ids": cocktail_ids}).all():
             try:
                 unit_enum_value = UnitEnum(row.unit)
             except ValueError:
                 unit_enum_value = UnitEnum.OTHER
-                print(f"WARNING: Invalid unit '{row.unit}' found in DB for cocktail ID {cocktail_orm.id}, ingredient ID {row.id}. Defaulting to '{UnitEnum.OTHER.value}'.")
+                print(f"WARNING: Invalid unit '{row.unit}' found in DB for cocktail ID {row.cocktail_id}, ingredient ID {row.id}. Defaulting to '{UnitEnum.OTHER.value}'.")
 
-            ingredients_details.append(IngredientInCocktailDetail(
-                id=row.id, 
-                name=row.name, 
+            ingredients_by_cocktail[row.cocktail_id].append(IngredientInCocktailDetail(
+                id=row.id,
+                name=row.name,
                 amount=row.amount,
                 unit=unit_enum_value
             ))
+        return ingredients_by_cocktail
 
-        if not cocktail_orm.author:
-            db.refresh(cocktail_orm, ['author'])
-        if not hasattr(cocktail_orm, 'tags') or not cocktail_orm.tags:
-            pass
-
-        tags_pydantic = [TagSchema.model_validate(tag_orm) for tag_orm in cocktail_orm.tags]
-        author_pydantic = UserSchema.model_validate(cocktail_orm.author)
-
-        return CocktailWithDetails(
-            id=cocktail_orm.id,
-            name=cocktail_orm.name,
-            description=cocktail_orm.description,
-            instructions=cocktail_orm.instructions,
-            image_url=str(cocktail_orm.image_url) if cocktail_orm.image_url else None,
-            is_public=cocktail_orm.is_public,
-            user_id=cocktail_orm.user_id,
-            created_at=cocktail_orm.created_at,
-            updated_at=cocktail_orm.updated_at,
-            author=author_pydantic,
-            ingredients=ingredients_details,
-            tags=tags_pydantic,
-            # NOWE POLA - średnia ocena i liczba ocen
-            average_rating=round(float(avg_rating), 2) if avg_rating is not None else None,
-            ratings_count=int(ratings_count) if ratings_count is not None else 0
-        )
+    def _build_cocktail_summaries(self, db: Session, rows) -> List[CocktailSummary]:
+        tags_by_cocktail = self._get_tags_for_cocktails(db, [row.id for row in rows])
+        return [
+            CocktailSummary(
+                id=row.id,
+                name=row.name,
+                image_url=row.image_url,
+                is_public=row.is_public if row.is_public is not None else True,
+                user_id=row.user_id,
+                created_at=row.created_at,
+                tags=tags_by_cocktail[row.id],
+                average_rating=average_rating_value(row.avg_rating),
+                ratings_count=int(row.ratings_count) if row.ratings_count is not None else 0,
+                favorites_count=row.favorites_count or 0
+            )
+            for row in rows
+        ]
+
+    def _build_cocktail_details(self, db: Session, rows) -> List[CocktailWithDetails]:
+        """Buduje CocktailWithDetails z wierszy _listing_query(FULL) - 2 dodatkowe zapytania na stronę."""
+        cocktail_ids = [row.id for row in rows]
+        ingredients_by_cocktail = self._get_ingredients_for_cocktails(db, cocktail_ids)
+        tags_by_cocktail = self._get_tags_for_cocktails(db, cocktail_ids)
+        return [
+            CocktailWithDetails(
+                id=row.id,
+                name=row.name,
+                description=row.description,
+                instructions=row.instructions,
+                image_url=str(row.image_url) if row.image_url else None,
+                is_public=row.is_public,
+                user_id=row.user_id,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                author=UserSchema(
+                    id=row.user_id,
+                    username=row.author_username,
+                    email=row.author_email,
+                    bio=row.author_bio,
+                    avatar_url=row.author_avatar_url,
+                    created_at=row.author_created_at,
+                    updated_at=row.author_updated_at
+                ),
+                ingredients=ingredients_by_cocktail[row.id],
+                tags=tags_by_cocktail[row.id],
+                average_rating=average_rating_value(row.avg_rating),
+                ratings_count=int(row.ratings_count) if row.ratings_count is not None else 0,
+                favorites_count=row.favorites_count or 0
+            )
+            for row in rows
+        ]
+
+    def _build_listing_items(
+        self, db: Session, results, view: CocktailView = CocktailView.FULL
+    ) -> List[Union[CocktailWithDetails, CocktailSummary]]:
+        if view == CocktailView.SUMMARY:
+            return self._build_cocktail_summaries(db, results)
+        return self._build_cocktail_details(db, results)
 
     def get_cocktail(self, db: Session, cocktail_id: int) -> Optional[CocktailWithDetails]:
-        # Zapytanie z obliczeniem średniej oceny i liczby ocen dla pojedynczego koktajlu
-        stmt = (
-            select(
-                Cocktail,
-                func.avg(Rating.rating_value).label('avg_rating'),
-                func.count(Rating.id).label('ratings_count')
+        # Równoczesne odczyty tego samego koktajlu w workerze czekają na jedno zapytanie (app/single_flight.py)
+        return cocktail_reads.do(("get", cocktail_id), lambda: self._get_cocktail(db, cocktail_id))
+
+    def _get_cocktail(self, db: Session, cocktail_id: int) -> Optional[CocktailWithDetails]:
+        # Zapytanie ze średnią oceną i liczbą ocen dla pojedynczego koktajlu
+        stmt = statements.get(
+            "cocktail.get", lambda: self._listing_query().where(Cocktail.id == bindparam("cocktail_id"))
+        )
+        
+        items = self._build_cocktail_details(db, db.execute(stmt, {"cocktail_id": cocktail_id}).all())
+        return items[0] if items else None
+
+    def _detail_json_statement(self, dialect_name: str):
+        """
+        Jedno zapytanie zwracające (is_public, user_id, payload), gdzie payload to gotowy JSON
+        CocktailWithDetails (te same pola i kolejność co serializacja Pydantic).
+        ID koktajlu przekazywane jako parametr :cocktail_id - zapytanie budowane jest raz na dialekt.
+
+        SQLite: json_object / json_group_array; wyniki podzapytań trzeba owinąć json(),
+        bo inaczej zostałyby wstawione jako tekst. PostgreSQL: json_build_object / json_agg.
+        """
+        if dialect_name == "postgresql":
+            json_object, json_array_agg = func.json_build_object, func.json_agg
+            as_json = lambda expr: expr
+            as_datetime = lambda column: column
+            as_bool = lambda column: func.coalesce(column, True)
+        else:
+            json_object, json_array_agg = func.json_object, func.json_group_array
+            as_json = func.json
+            # SQLite przechowuje "YYYY-MM-DD HH:MM:SS[.ffffff]" - Pydantic zwraca ISO z "T"
+            as_datetime = lambda column: func.replace(column, " ", "T")
+            as_bool = lambda column: case((column == False, func.json("false")), else_=func.json("true"))
+
+        ingredients = (
+            select(json_array_agg(json_object(
+                "id", Ingredient.id,
+                "name", Ingredient.name,
+                "amount", cocktail_ingredient_association.c.amount,
+                "unit", case(
+                    (cocktail_ingredient_association.c.unit.in_([unit.value for unit in UnitEnum]),
+                     cocktail_ingredient_association.c.unit),
+                    else_=UnitEnum.OTHER.value
+                ),
+            )))
+            .select_from(cocktail_ingredient_association)
+            .join(Ingredient, Ingredient.id == cocktail_ingredient_association.c.ingredient_id)
+            .where(cocktail_ingredient_association.c.cocktail_id == Cocktail.id)
+            .scalar_subquery()
+        )
+        tags = (
+            select(json_array_agg(json_object("name", Tag.name, "id", Tag.id)))
+            .select_from(cocktail_tag_association)
+            .join(Tag, Tag.id == cocktail_tag_association.c.tag_id)
+            .where(cocktail_tag_association.c.cocktail_id == Cocktail.id)
+            .scalar_subquery()
+        )
+        author = json_object(
+            "username", User.username,
+            "email", User.email,
+            "bio", User.bio,
+            "avatar_url", User.avatar_url,
+            "id", User.id,
+            "created_at", as_datetime(User.created_at),
+            "updated_at", as_datetime(User.updated_at),
+        )
+        payload = json_object(
+            "name", Cocktail.name,
+            "description", Cocktail.description,
+            "instructions", Cocktail.instructions,
+            "image_url", Cocktail.image_url,
+            "is_public", as_bool(Cocktail.is_public),
+            "id", Cocktail.id,
+            "user_id", Cocktail.user_id,
+            "created_at", as_datetime(Cocktail.created_at),
+            "updated_at", as_datetime(Cocktail.updated_at),
+            "author", author,
+            "ingredients", func.coalesce(as_json(ingredients), as_json(literal("[]"))),
+            "tags", func.coalesce(as_json(tags), as_json(literal("[]"))),
+            "average_rating", self._average_rating_expr,
+            "ratings_count", Cocktail.ratings_count,
+            "favorites_count", Cocktail.favorites_count,
+        )
+        return (
+            select(Cocktail.is_public, Cocktail.user_id, payload.label("payload"))
+            .join(User, User.id == Cocktail.user_id)
+            .where(Cocktail.id == bindparam("cocktail_id"))
+        )
+
+    def get_cocktail_json(self, db: Session, cocktail_id: int, fresh: bool = False) -> Optional[Tuple[bool, int, str]]:
+        """
+        Szczegóły koktajlu jednym zapytaniem, jako gotowy JSON (bez ORM i Pydantic).
+        Zwraca (is_public, user_id, payload) albo None. Równoczesne odczyty łączone jak w get_cocktail;
+        fresh=True pomija łączenie (odczyt musi widzieć zapis zatwierdzony przed chwilą).
+        """
+        if fresh:
+            return self._get_cocktail_json(db, cocktail_id)
+        return cocktail_reads.do(("json", cocktail_id), lambda: self._get_cocktail_json(db, cocktail_id))
+
+    def _get_cocktail_json(self, db: Session, cocktail_id: int) -> Optional[Tuple[bool, int, str]]:
+        dialect_name = db.get_bind().dialect.name
+        stmt = statements.get(("cocktail.detail_json", dialect_name), lambda: self._detail_json_statement(dialect_name))
+        row = db.execute(stmt, {"cocktail_id": cocktail_id}).first()
+        if row is None:
+            return None
+        payload = row.payload
+        if not isinstance(payload, str):
+            # PostgreSQL (psycopg) deserializuje json - wracamy do tekstu
+            payload = json.dumps(payload, separators=(",", ":"))
+        return row.is_public is not False, row.user_id, payload
+
+    def _listing_filters(
+        self,
+        stmt,
+        visibility: str,
+        by_name: bool,
+        with_fuzzy_ids: bool,
+        by_ingredients: bool,
+        by_tags: bool,
+        by_min_rating: bool
+    ):
+        """
+        Warunki WHERE get_cocktails (dla listy i zapytania COUNT) z bindparam() zamiast wartości.
+
+        visibility: "public" - tylko publiczne, "viewer" - publiczne i prywatne użytkownika :viewer_id,
+        "private" - tylko prywatne użytkownika :viewer_id (indeks po user_id, zwykle pusty wynik).
+
+        Parametry: :viewer_id, :name_pattern (LIKE, escape "/"), :fuzzy_ids, :ingredient_ids
+        i :ingredients_count, :tag_ids i :tags_count, :min_avg_rating.
+        """
+        # Filtr publiczności
+        if visibility == "private":
+            stmt = stmt.where(Cocktail.user_id == bindparam("viewer_id"), Cocktail.is_public.isnot(True))
+        else:
+            stmt = self._visible_to(stmt, visibility == "viewer")
+        
+        if by_name:
+            # LIKE '%fragment%' nie korzysta z indeksu ix_cocktails_search_key (wiodący %) - to skan
+            # search_key wierszy spełniających pozostałe warunki. Zostaje w SQL, bo indeks trigramów
+            # jest w pamięci procesu i nie widzi koktajli dodanych przez inne workery
+            name_condition = Cocktail.search_key.like(bindparam("name_pattern"), escape="/")
+            if with_fuzzy_ids:
+                name_condition = or_(name_condition, Cocktail.id.in_(bindparam("fuzzy_ids", expanding=True)))
+            stmt = stmt.where(name_condition)
+        
+        # Filtrowanie po składnikach - koktajl musi zawierać WSZYSTKIE podane składniki
+        if by_ingredients:
+            ingredient_subquery = (
+                select(cocktail_ingredient_association.c.cocktail_id)
+                .where(cocktail_ingredient_association.c.ingredient_id.in_(bindparam("ingredient_ids", expanding=True)))
+                .group_by(cocktail_ingredient_association.c.cocktail_id)
+                .having(
+                    func.count(distinct(cocktail_ingredient_association.c.ingredient_id))
+                    == bindparam("ingredients_count", type_=Integer)
+                )
             )
-            .outerjoin(Rating, Cocktail.id == Rating.cocktail_id)
-            .options(
-                joinedload(Cocktail.author),
-                selectinload(Cocktail.tags)
+            stmt = stmt.where(Cocktail.id.in_(ingredient_subquery))
+        
+        # Filtrowanie po tagach - koktajl musi zawierać WSZYSTKIE podane tagi
+        if by_tags:
+            tag_subquery = (
+                select(cocktail_tag_association.c.cocktail_id)
+                .where(cocktail_tag_association.c.tag_id.in_(bindparam("tag_ids", expanding=True)))
+                .group_by(cocktail_tag_association.c.cocktail_id)
+                .having(func.count(distinct(cocktail_tag_association.c.tag_id)) == bindparam("tags_count", type_=Integer))
             )
-            .where(Cocktail.id == cocktail_id)
-            .group_by(Cocktail.id)
-        )
+            stmt = stmt.where(Cocktail.id.in_(tag_subquery))
         
-        result = db.execute(stmt).first()
-        if not result:
+        # FILTROWANIE PO MINIMALNEJ ŚREDNIEJ OCENIE
+        if by_min_rating:
+            # suma >= min * liczba ocen (koktajle bez ocen nie spełniają warunku)
+            stmt = stmt.where(
+                Cocktail.ratings_count > 0,
+                Cocktail.ratings_sum >= bindparam("min_avg_rating", type_=Float) * Cocktail.ratings_count
+            )
+        return stmt
+
+    def _list_statement(self, view: CocktailView, sort: CocktailSort, visibility: str, filters_shape: Tuple[bool, ...]):
+        """Strona listy z filtrami i sortowaniem; kolumna sort_value to wartość pierwszego klucza sortowania."""
+        return statements.get(
+            ("cocktail.list", view, sort, visibility, *filters_shape),
+            lambda: self._page(
+                self._listing_filters(self._listing_query(view), visibility, *filters_shape)
+                .add_columns(self._sort_orders[sort][0].element.label("sort_value"))
+                .order_by(*self._sort_orders[sort])
+            )
+        )
+
+    def _count_listing(self, db: Session, visibility: str, filters_shape: Tuple[bool, ...], params: Dict[str, Any]) -> int:
+        count_query = statements.get(
+            ("cocktail.list_count", visibility, *filters_shape),
+            lambda: self._listing_filters(select(func.count(Cocktail.id)), visibility, *filters_shape)
+        )
+        return db.execute(count_query, params).scalar()
+
+    def _listing_total(
+        self,
+        db: Session,
+        visibility: str,
+        filters_shape: Tuple[bool, ...],
+        params: Dict[str, Any],
+        count_mode: CocktailCount,
+        signature: Tuple
+    ) -> Tuple[int, bool]:
+        """
+        Liczba wyników listy wg count_mode i czy jest obcięta do limitu (total_capped).
+
+        EXACT - COUNT przy każdym wywołaniu. CACHED - dokładny COUNT zapamiętany w listing_cache per
+        (widoczność, użytkownik, znormalizowane filtry), wspólny dla wszystkich stron, sortowań i widoków.
+        ESTIMATED - COUNT najwyżej LISTING_COUNT_ESTIMATE_CAP + 1 pasujących wierszy (koszt niezależny
+        od wielkości katalogu); powyżej limitu zwraca (limit, True). Też zapamiętywany.
+        """
+        if count_mode == CocktailCount.EXACT:
+            return self._count_listing(db, visibility, filters_shape, params), False
+
+        key = (count_mode, visibility, params["viewer_id"] if visibility != "public" else None, signature)
+        cached = listing_cache.get_count(key)
+        if cached is not None:
+            return cached
+        version = listing_cache.version
+        if count_mode == CocktailCount.CACHED:
+            total = (self._count_listing(db, visibility, filters_shape, params), False)
+        else:
+            cap = settings.LISTING_COUNT_ESTIMATE_CAP
+            capped_count_query = statements.get(
+                ("cocktail.list_count_capped", visibility, *filters_shape),
+                lambda: select(func.count()).select_from(
+                    self._listing_filters(select(Cocktail.id), visibility, *filters_shape)
+                    .limit(bindparam("count_limit", type_=Integer))
+                    .subquery()
+                )
+            )
+            counted = db.execute(capped_count_query, {**params, "count_limit": cap + 1}).scalar()
+            total = (cap, True) if counted > cap else (counted, False)
+        listing_cache.put_count(key, version, total)
+        return total
+
+    def _public_listing_page(
+        self,
+        db: Session,
+        view: CocktailView,
+        sort: CocktailSort,
+        filters_shape: Tuple[bool, ...],
+        params: Dict[str, Any],
+        cache_key: Tuple,
+        page: int,
+        size: int,
+        with_total: bool = True
+    ) -> ListingPage:
+        """
+        Strona publicznych koktajli - z cache albo z bazy. Przy with_total strona wczytywana z bazy
+        ma też dokładną liczbę wszystkich publicznych wyników (ListingPage.total).
+        Równoczesne chybienia tej samej strony czekają na jedno obliczenie (app/single_flight.py).
+        """
+        key = (*cache_key, page)
+        listing_page = listing_cache.get(key)
+        if listing_page is not None:
+            return listing_page
+        return cocktail_reads.do(
+            ("public_page", key),
+            lambda: self._load_public_listing_page(db, view, sort, filters_shape, params, key, page, size, with_total)
+        )
+
+    def _load_public_listing_page(
+        self,
+        db: Session,
+        view: CocktailView,
+        sort: CocktailSort,
+        filters_shape: Tuple[bool, ...],
+        params: Dict[str, Any],
+        key: Tuple,
+        page: int,
+        size: int,
+        with_total: bool
+    ) -> ListingPage:
+        version = listing_cache.version
+        total_count = self._count_listing(db, "public", filters_shape, params) if with_total else None
+        rows = db.execute(
+            self._list_statement(view, sort, "public", filters_shape),
+            {**params, "offset": (page - 1) * size, "limit": size}
+        ).all()
+        items = self._build_listing_items(db, rows, view)
+        listing_page = ListingPage(total_count, [((row.sort_value, row.id), item) for row, item in zip(rows, items)])
+        listing_cache.put(key, version, listing_page)
+        return listing_page
+
+    def _private_listing_rows(
+        self,
+        db: Session,
+        view: CocktailView,
+        sort: CocktailSort,
+        filters_shape: Tuple[bool, ...],
+        params: Dict[str, Any]
+    ) -> Optional[List[Any]]:
+        """
+        Wszystkie pasujące prywatne koktajle użytkownika :viewer_id, posortowane (zwykle żadnych).
+        None, jeśli jest ich więcej niż LISTING_PRIVATE_OVERLAY_MAX.
+        """
+        rows = db.execute(
+            self._list_statement(view, sort, "private", filters_shape),
+            {**params, "offset": 0, "limit": settings.LISTING_PRIVATE_OVERLAY_MAX + 1}
+        ).all()
+        if len(rows) > settings.LISTING_PRIVATE_OVERLAY_MAX:
             return None
-            
-        cocktail_orm = result[0]
-        avg_rating = result[1]
-        ratings_count = result[2]
+        return rows
+
+    def _direct_listing(
+        self,
+        db: Session,
+        view: CocktailView,
+        sort: CocktailSort,
+        filters_shape: Tuple[bool, ...],
+        params: Dict[str, Any],
+        page: int,
+        size: int,
+        count_mode: CocktailCount,
+        signature: Tuple
+    ) -> Tuple[int, bool, List[Union[CocktailWithDetails, CocktailSummary]]]:
+        total_count, total_capped = self._listing_total(db, "viewer", filters_shape, params, count_mode, signature)
+        rows = db.execute(
+            self._list_statement(view, sort, "viewer", filters_shape),
+            {**params, "offset": (page - 1) * size, "limit": size}
+        ).all()
+        return total_count, total_capped, self._build_listing_items(db, rows, view)
+
+    def _merge_private_rows(
+        self,
+        db: Session,
+        view: CocktailView,
+        sort: CocktailSort,
+        filters_shape: Tuple[bool, ...],
+        params: Dict[str, Any],
+        page: int,
+        size: int,
+        public_page: ListingPage,
+        private_rows: List[Any]
+    ) -> List[Union[CocktailWithDetails, CocktailSummary]]:
+        """
+        Strona listy "publiczne LUB moje" złożona ze stron publicznych i prywatnych wierszy.
+
+        Publiczny koktajl o indeksie i ma na wspólnej liście pozycję i + (liczba prywatnych przed nim),
+        czyli najwyżej i + P (P = liczba prywatnych). Na stronę [skip, skip + size) trafiają więc tylko
+        publiczne o indeksach [skip - P, skip + size) - bieżąca strona z cache i wiersze przed nią,
+        wczytane jednym zapytaniem OFFSET/LIMIT - a pozycje wyznacza scalenie obu list po kluczu
+        sortowania. Prywatne sortujące się przed tym oknem mają pozycję mniejszą niż skip i są pomijane.
+        """
+        skip = (page - 1) * size
+        window_start = max(0, skip - len(private_rows))
+        # Elementy okna: (klucz sortowania, potrzebuje budowy, wiersz lub gotowy element) - wiersze
+        # sprzed bieżącej strony budowane są tylko wtedy, gdy trafią na stronę
+        window = []
+        if window_start < skip:
+            rows = db.execute(
+                self._list_statement(view, sort, "public", filters_shape),
+                {**params, "offset": window_start, "limit": skip - window_start}
+            ).all()
+            window.extend(((row.sort_value, row.id), True, row) for row in rows)
+        window.extend((sort_key, False, item) for sort_key, item in public_page.entries)
         
-        return self._build_cocktail_with_details(db, cocktail_orm, avg_rating, ratings_count)
+        pending = [((row.sort_value, row.id), True, row) for row in private_rows]
+        if not window:
+            # Wszystkie publiczne są przed oknem - prywatne idą po nich
+            position = public_page.total
+            if position is None:
+                position = self._count_listing(db, "public", filters_shape, params)
+        elif window_start > 0:
+            skipped = sum(1 for sort_key, _, _ in pending if sort_key > window[0][0])
+            pending = pending[skipped:]
+            position = window_start + skipped
+        else:
+            position = 0
+        
+        # Sortowanie malejące po (wartość, id) - jak ORDER BY ... DESC, id DESC
+        page_entries = []
+        i = j = 0
+        while position < skip + size and (i < len(window) or j < len(pending)):
+            if j < len(pending) and (i == len(window) or pending[j][0] > window[i][0]):
+                entry = pending[j]
+                j += 1
+            else:
+                entry = window[i]
+                i += 1
+            if position >= skip:
+                page_entries.append(entry[1:])
+            position += 1
+        
+        built_items = iter(self._build_listing_items(db, [row for needs_build, row in page_entries if needs_build], view))
+        return [next(built_items) if needs_build else item for needs_build, item in page_entries]
 
     def get_cocktails(
         self, 
@@ -114,133 +647,119 @@ class CRUDCocktail:
         min_avg_rating: Optional[float] = None,  # NOWY PARAMETR
         page: int = 1,
         size: int = 12,
-        user_id: Optional[int] = None
+        user_id: Optional[int] = None,
+        view: CocktailView = CocktailView.FULL,
+        sort: CocktailSort = CocktailSort.NEWEST,
+        count: CocktailCount = CocktailCount.EXACT
     ) -> Dict[str, Any]:
         """
         Pobiera koktajle z filtrowaniem i paginacją.
         
         Args:
             db: Sesja bazy danych
-            name: Nazwa koktajlu (częściowe dopasowanie, nieczułe na wielkość liter)
+            name: Nazwa koktajlu (częściowe dopasowanie, nieczułe na wielkość liter i polskie znaki,
+                  z tolerancją literówek przez indeks trigramów)
             ingredient_ids: Lista ID składników (koktajl musi zawierać WSZYSTKIE)
             tag_ids: Lista ID tagów (koktajl musi zawierać WSZYSTKIE)
             min_avg_rating: Minimalna średnia ocena koktajlu (1-5)
             page: Numer strony (zaczyna od 1)
             size: Liczba elementów na stronie
-            user_id: ID użytkownika (opcjonalne filtrowanie po prywatnych koktajlach)
+            user_id: ID zalogowanego użytkownika - jego prywatne koktajle dokładane są do wspólnej
+                     (cache'owanej) strony publicznych
+            view: FULL (CocktailWithDetails) lub SUMMARY (CocktailSummary)
+            sort: Kolejność wyników (newest, top_rated, most_rated, most_favorited)
+            count: Sposób liczenia total - exact, cached (per zestaw filtrów) lub estimated (do limitu)
             
         Returns:
-            Dict zawierający items, total, page, size, pages
+            Dict zawierający items, total, page, size, pages, count_mode i total_capped
         """
         
-        # Bazowe zapytanie z obliczeniem średniej oceny i liczby ocen
-        base_query = (
-            select(
-                Cocktail,
-                func.avg(Rating.rating_value).label('avg_rating'),
-                func.count(Rating.id).label('ratings_count')
-            )
-            .outerjoin(Rating, Cocktail.id == Rating.cocktail_id)
-            .options(
-                joinedload(Cocktail.author),
-                selectinload(Cocktail.tags)
-            )
-        )
-        
-        # Lista warunków WHERE
-        where_conditions = []
-        
-        # Filtr publiczności - jeśli nie ma user_id, pokaż tylko publiczne
-        if user_id is None:
-            where_conditions.append(Cocktail.is_public == True)
-        else:
-            # Jeśli jest user_id, pokaż publiczne + prywatne tego użytkownika
-            where_conditions.append(
-                (Cocktail.is_public == True) | (Cocktail.user_id == user_id)
-            )
-        
-        # Filtrowanie po nazwie
-        if name and name.strip():
-            where_conditions.append(
-                Cocktail.name.ilike(f"%{name.strip()}%")
-            )
-        
-        # Filtrowanie po składnikach - koktajl musi zawierać WSZYSTKIE podane składniki
-        if ingredient_ids and len(ingredient_ids) > 0:
-            ingredient_subquery = (
-                select(cocktail_ingredient_association.c.cocktail_id)
-                .where(cocktail_ingredient_association.c.ingredient_id.in_(ingredient_ids))
-                .group_by(cocktail_ingredient_association.c.cocktail_id)
-                .having(func.count(distinct(cocktail_ingredient_association.c.ingredient_id)) == len(ingredient_ids))
-            )
-            where_conditions.append(Cocktail.id.in_(ingredient_subquery))
-        
-        # Filtrowanie po tagach - koktajl musi zawierać WSZYSTKIE podane tagi
-        if tag_ids and len(tag_ids) > 0:
-            tag_subquery = (
-                select(cocktail_tag_association.c.cocktail_id)
-                .where(cocktail_tag_association.c.tag_id.in_(tag_ids))
-                .group_by(cocktail_tag_association.c.cocktail_id)
-                .having(func.count(distinct(cocktail_tag_association.c.tag_id)) == len(tag_ids))
-            )
-            where_conditions.append(Cocktail.id.in_(tag_subquery))
-        
-        # Zastosuj warunki WHERE
-        if where_conditions:
-            base_query = base_query.where(and_(*where_conditions))
-        
-        # Grupowanie po ID koktajlu
-        base_query = base_query.group_by(Cocktail.id)
-        
-        # FILTROWANIE PO MINIMALNEJ ŚREDNIEJ OCENIE
-        if min_avg_rating is not None and min_avg_rating > 0:
-            # Użyj HAVING do filtrowania po obliczonej średniej ocenie
-            # COALESCE zapewnia, że koktajle bez ocen będą miały średnią 0
-            base_query = base_query.having(
-                func.coalesce(func.avg(Rating.rating_value), 0.0) >= min_avg_rating
-            )
+        # Filtrowanie po nazwie - fragment znormalizowanej nazwy albo dopasowanie trigramowe (literówki).
+        # Wszystkie dopasowania trigramowe (bez limitu) - lista jest filtrem, więc obcięcie
+        # zaniżyłoby total i przesunęło strony
+        folded_name = fold_text(name) if name else ""
+        fuzzy_ids = []
+        if folded_name:
+            search_crud.ensure_loaded(db)
+            fuzzy_ids = [
+                cocktail_id
+                for cocktail_id, _ in cocktail_name_index.search(
+                    folded_name, settings.SEARCH_FUZZY_MIN_SIMILARITY, limit=None
+                )
+            ]
         
-        # Oblicz całkowitą liczbę wyników (przed paginacją)
-        # Potrzebujemy osobnego zapytania do liczenia, bo GROUP BY komplikuje count()
-        count_query = select(func.count()).select_from(
-            base_query.subquery()
+        # Kształt zapytania zależy tylko od tego, które filtry są użyte - wartości (także listy IN
+        # dowolnej długości) idą jako parametry, więc instrukcja jest budowana raz na kształt
+        filters_shape = (
+            bool(folded_name),
+            bool(fuzzy_ids),
+            bool(ingredient_ids),
+            bool(tag_ids),
+            min_avg_rating is not None and min_avg_rating > 0,
         )
-        total_count = db.execute(count_query).scalar()
-        
-        # Oblicz liczbę stron
-        total_pages = math.ceil(total_count / size) if total_count > 0 else 1
-        
-        # Zastosuj paginację i sortowanie
-        skip = (page - 1) * size
-        final_query = (
-            base_query
-            .order_by(Cocktail.created_at.desc())
-            .offset(skip)
-            .limit(size)
+        params = {
+            "viewer_id": user_id,
+            "name_pattern": "%" + folded_name.replace("/", "//").replace("%", "/%").replace("_", "/_") + "%",
+            "fuzzy_ids": fuzzy_ids,
+            "ingredient_ids": ingredient_ids or [],
+            "ingredients_count": len(ingredient_ids or []),
+            "tag_ids": tag_ids or [],
+            "tags_count": len(tag_ids or []),
+            "min_avg_rating": min_avg_rating,
+        }
+        # Strony listy publicznej są wspólne dla wszystkich (app/listing_cache.py) - warunek
+        # "publiczne LUB moje" rozbity jest na stronę publiczną i prywatne koktajle użytkownika
+        signature = (
+            folded_name,
+            tuple(sorted(ingredient_ids or [])),
+            tuple(sorted(tag_ids or [])),
+            min_avg_rating if filters_shape[4] else None,
         )
+        cache_key = (view, sort, size, *signature)
         
-        # Wykonaj zapytanie
-        results = db.execute(final_query).all()
+        private_rows = []
+        if user_id is not None:
+            private_rows = self._private_listing_rows(db, view, sort, filters_shape, params)
         
-        # Przekształć na CocktailWithDetails
-        cocktail_details_list = []
-        for result in results:
-            cocktail_orm = result[0]
-            avg_rating = result[1]
-            ratings_count = result[2]
-            
-            cocktail_detail = self._build_cocktail_with_details(
-                db, cocktail_orm, avg_rating, ratings_count
+        if private_rows is None:
+            # Dużo prywatnych koktajli - jedno zapytanie "publiczne LUB moje", bez cache
+            metrics.incr("listing.private_overlay.direct")
+            total_count, total_capped, cocktail_details_list = self._direct_listing(
+                db, view, sort, filters_shape, params, page, size, count, signature
             )
-            if cocktail_detail:
-                cocktail_details_list.append(cocktail_detail)
+        else:
+            public_page = self._public_listing_page(
+                db, view, sort, filters_shape, params, cache_key, page, size, with_total=count == CocktailCount.EXACT
+            )
+            if count == CocktailCount.EXACT:
+                public_total, total_capped = public_page.total, False
+                if public_total is None:
+                    # Strona z cache wczytana bez liczby (inny tryb count) - liczymy osobno, bez
+                    # zmiany współdzielonego wpisu cache (czytają go równolegle inne żądania)
+                    public_total = self._count_listing(db, "public", filters_shape, params)
+            else:
+                public_total, total_capped = self._listing_total(db, "public", filters_shape, params, count, signature)
+            total_count = public_total + len(private_rows)
+            if private_rows:
+                metrics.incr("listing.private_overlay.merged")
+                cocktail_details_list = self._merge_private_rows(
+                    db, view, sort, filters_shape, params, page, size, public_page, private_rows
+                )
+            else:
+                cocktail_details_list = [item for _, item in public_page.entries]
+        
+        # Oblicz liczbę stron (nieznana, gdy total jest tylko dolnym ograniczeniem)
+        if total_capped:
+            total_pages = None
+        else:
+            total_pages = math.ceil(total_count / size) if total_count > 0 else 1
             
         print(f"--- CRUD get_cocktails RECEIVED ---")
         print(f"Name: {name}")
         print(f"Ingredient IDs: {ingredient_ids}")
         print(f"Tag IDs: {tag_ids}")
         print(f"Min Avg Rating: {min_avg_rating}")  # NOWY LOG
-        print(f"Page: {page}, Size: {size}")
+        print(f"Page: {page}, Size: {size}, Sort: {sort.value}")
         print(f"User ID: {user_id}")
         print(f"Total results: {total_count}")
         
@@ -249,7 +768,9 @@ class CRUDCocktail:
             "total": total_count,
             "page": page,
             "size": size,
-            "pages": total_pages
+            "pages": total_pages,
+            "count_mode": count,
+            "total_capped": total_capped
         }
 
     def get_cocktails_by_user(
@@ -258,8 +779,9 @@ class CRUDCocktail:
         user_id: int, 
         skip: int = 0, 
         limit: int = 10,
-        include_private: bool = False
-    ) -> List[CocktailWithDetails]:
+        include_private: bool = False,
+        view: CocktailView = CocktailView.FULL
+    ) -> List[Union[CocktailWithDetails, CocktailSummary]]:
         """
         Pobiera koktajle stworzone przez konkretnego użytkownika.
         
@@ -269,92 +791,357 @@ class CRUDCocktail:
             skip: Liczba rekordów do pominięcia (paginacja)
             limit: Maksymalna liczba rekordów do zwrócenia
             include_private: Czy uwzględnić prywatne koktajle (True jeśli to właściciel profilu)
+            view: FULL (CocktailWithDetails) lub SUMMARY (CocktailSummary)
         
         Returns:
-            Lista koktajli z pełnymi detalami (CocktailWithDetails)
+            Lista koktajli z pełnymi detalami (CocktailWithDetails) lub w wersji skróconej (CocktailSummary)
         """
         
-        # Bazowe zapytanie z obliczeniem średniej oceny i liczby ocen
-        base_query = (
+        def build():
+            # Bazowe zapytanie z obliczeniem średniej oceny i liczby ocen
+            base_query = self._listing_query(view).where(Cocktail.user_id == bindparam("user_id"))
+            
+            # Jeśli nie uwzględniamy prywatnych, filtruj tylko publiczne
+            if not include_private:
+                base_query = base_query.where(Cocktail.is_public == True)
+            
+            # Paginacja i sortowanie
+            return self._page(base_query.order_by(*self._sort_orders[CocktailSort.NEWEST]))
+        
+        final_query = statements.get(("cocktail.by_user", view, bool(include_private)), build)
+        
+        # Wykonaj zapytanie
+        results = db.execute(final_query, {"user_id": user_id, "offset": skip, "limit": limit}).all()
+        
+        # Przekształć na CocktailWithDetails / CocktailSummary
+        return self._build_listing_items(db, results, view)
+
+    def get_favorite_cocktails(
+        self,
+        db: Session,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        view: CocktailView = CocktailView.FULL
+    ) -> List[Union[CocktailWithDetails, CocktailSummary]]:
+        """
+        Pobiera ulubione koktajle użytkownika jednym zapytaniem (zamiast get_cocktail dla każdego ulubionego).
+
+        Args:
+            db: Sesja bazy danych
+            user_id: ID użytkownika, którego ulubione chcemy pobrać
+            skip: Liczba rekordów do pominięcia (paginacja)
+            limit: Maksymalna liczba rekordów do zwrócenia
+            view: FULL (CocktailWithDetails) lub SUMMARY (CocktailSummary)
+
+        Returns:
+            Lista ulubionych koktajli w kolejności dodawania do ulubionych
+        """
+        final_query = statements.get(("cocktail.favorites", view), lambda: self._page(
+            self._listing_query(view)
+            .join(Favorite, and_(Favorite.cocktail_id == Cocktail.id, Favorite.user_id == bindparam("user_id")))
+            .order_by(Favorite.id)
+        ))
+        results = db.execute(final_query, {"user_id": user_id, "offset": skip, "limit": limit}).all()
+        return self._build_listing_items(db, results, view)
+
+    def get_trending_cocktails(
+        self,
+        db: Session,
+        limit: int = 12,
+        view: CocktailView = CocktailView.FULL
+    ) -> List[Union[CocktailWithDetails, CocktailSummary]]:
+        """
+        Pobiera publiczne koktajle o najwyższym wyniku "trending" (skan indeksu ix_cocktails_trending_score).
+        Wynik utrzymywany jest przyrostowo przez CRUDTrending.
+        """
+        final_query = statements.get(("cocktail.trending", view), lambda: (
+            self._listing_query(view)
+            .where(Cocktail.is_public == True, Cocktail.trending_score > 0)
+            .order_by(Cocktail.trending_score.desc(), Cocktail.id.desc())
+            .limit(bindparam("limit", type_=Integer))
+        ))
+        results = db.execute(final_query, {"limit": limit}).all()
+        return self._build_listing_items(db, results, view)
+
+    def get_similar_cocktails(
+        self,
+        db: Session,
+        cocktail_id: int,
+        limit: int = 10,
+        view: CocktailView = CocktailView.FULL,
+        viewer_id: Optional[int] = None
+    ) -> List[Union[CocktailWithDetails, CocktailSummary]]:
+        """
+        Pobiera koktajle podobne do podanego z prekomputowanej tabeli cocktail_similarities.
+        Zwraca publiczne koktajle oraz prywatne koktajle oglądającego.
+        """
+        final_query = statements.get(("cocktail.similar", view, viewer_id is not None), lambda: (
+            self._visible_to(self._listing_query(view), viewer_id is not None)
+            .join(CocktailSimilarity, CocktailSimilarity.similar_cocktail_id == Cocktail.id)
+            .where(CocktailSimilarity.cocktail_id == bindparam("cocktail_id"))
+            .order_by(CocktailSimilarity.score.desc(), Cocktail.id.desc())
+            .limit(bindparam("limit", type_=Integer))
+        ))
+        results = db.execute(
+            final_query, {"cocktail_id": cocktail_id, "viewer_id": viewer_id, "limit": limit}
+        ).all()
+        return self._build_listing_items(db, results, view)
+
+    def _recommended_query(self, view: CocktailView):
+        """Zapytanie get_recommended_cocktails z parametrami :user_id i :limit."""
+        user_id = bindparam("user_id")
+        seeds = (
+            select(Favorite.cocktail_id).where(Favorite.user_id == user_id)
+            .union(select(Rating.cocktail_id).where(Rating.user_id == user_id, Rating.rating_value >= 4))
+        )
+        seen = (
+            select(Favorite.cocktail_id).where(Favorite.user_id == user_id)
+            .union(select(Rating.cocktail_id).where(Rating.user_id == user_id))
+        )
+        scores = (
             select(
-                Cocktail,
-                func.avg(Rating.rating_value).label('avg_rating'),
-                func.count(Rating.id).label('ratings_count')
+                CocktailSimilarity.similar_cocktail_id.label('cocktail_id'),
+                func.sum(CocktailSimilarity.score).label('score')
             )
-            .outerjoin(Rating, Cocktail.id == Rating.cocktail_id)
-            .options(
-                joinedload(Cocktail.author),
-                selectinload(Cocktail.tags)
+            .where(
+                CocktailSimilarity.cocktail_id.in_(seeds),
+                CocktailSimilarity.similar_cocktail_id.not_in(seen)
             )
-            .where(Cocktail.user_id == user_id)
+            .group_by(CocktailSimilarity.similar_cocktail_id)
+            .subquery()
         )
-        
-        # Jeśli nie uwzględniamy prywatnych, filtruj tylko publiczne
-        if not include_private:
-            base_query = base_query.where(Cocktail.is_public == True)
-        
-        # Grupowanie po ID koktajlu
-        base_query = base_query.group_by(Cocktail.id)
-        
-        # Paginacja i sortowanie
-        final_query = (
-            base_query
-            .order_by(Cocktail.created_at.desc())
-            .offset(skip)
-            .limit(limit)
+        return (
+            self._listing_query(view)
+            .join(scores, scores.c.cocktail_id == Cocktail.id)
+            .where(Cocktail.is_public == True, Cocktail.user_id != user_id)
+            .order_by(scores.c.score.desc(), Cocktail.id.desc())
+            .limit(bindparam("limit", type_=Integer))
         )
-        
-        # Wykonaj zapytanie
-        results = db.execute(final_query).all()
-        
-        # Przekształć na CocktailWithDetails
-        cocktail_details_list = []
-        for result in results:
-            cocktail_orm = result[0]
-            avg_rating = result[1]
-            ratings_count = result[2]
-            
-            cocktail_detail = self._build_cocktail_with_details(
-                db, cocktail_orm, avg_rating, ratings_count
+
+    def get_recommended_cocktails(
+        self,
+        db: Session,
+        user_id: int,
+        limit: int = 12,
+        view: CocktailView = CocktailView.FULL
+    ) -> List[Union[CocktailWithDetails, CocktailSummary]]:
+        """
+        Rekomendacje dla użytkownika: suma podobieństw sąsiadów jego ulubionych
+        i wysoko ocenionych (>= 4) koktajli, z pominięciem koktajli już ocenionych,
+        ulubionych lub własnych. Użytkownicy bez historii dostają ranking "trending".
+        """
+        final_query = statements.get(("cocktail.recommended", view), lambda: self._recommended_query(view))
+        results = db.execute(final_query, {"user_id": user_id, "limit": limit}).all()
+        if not results:
+            return self.get_trending_cocktails(db, limit=limit, view=view)
+        return self._build_listing_items(db, results, view)
+
+    def get_similar_recipes(
+        self,
+        db: Session,
+        cocktail_id: int,
+        min_similarity: Optional[float] = None,
+        limit: int = 10,
+        view: CocktailView = CocktailView.FULL,
+        viewer_id: Optional[int] = None
+    ) -> List[Union[CocktailWithDetails, CocktailSummary]]:
+        """
+        Pobiera koktajle o podobnym zestawie składników (Jaccard >= min_similarity),
+        wyszukiwane przez indeks MinHash/LSH, malejąco według podobieństwa.
+        """
+        ingredient_ids = db.execute(
+            select(cocktail_ingredient_association.c.ingredient_id)
+            .where(cocktail_ingredient_association.c.cocktail_id == cocktail_id)
+        ).scalars().all()
+        matches = recipe_index_crud.find_similar(
+            db,
+            ingredient_ids,
+            min_similarity if min_similarity is not None else settings.SIMILAR_RECIPE_MIN_JACCARD,
+            exclude_id=cocktail_id
+        )
+        return self._get_visible_by_ids(db, [match_id for match_id, _ in matches], limit, view, viewer_id)
+
+    def find_near_duplicate_recipes(
+        self, db: Session, ingredient_ids: List[int], viewer_id: Optional[int] = None, exclude_id: Optional[int] = None
+    ) -> List[int]:
+        """Zwraca ID widocznych koktajli o niemal identycznym zestawie składników."""
+        matches = recipe_index_crud.find_similar(
+            db, ingredient_ids, settings.NEAR_DUPLICATE_RECIPE_JACCARD, exclude_id=exclude_id
+        )
+        items = self._get_visible_by_ids(
+            db, [match_id for match_id, _ in matches], 10, CocktailView.SUMMARY, viewer_id
+        )
+        return [item.id for item in items]
+
+    def _get_visible_by_ids(
+        self,
+        db: Session,
+        cocktail_ids: List[int],
+        limit: int,
+        view: CocktailView,
+        viewer_id: Optional[int] = None
+    ) -> List[Union[CocktailWithDetails, CocktailSummary]]:
+        """Pobiera widoczne koktajle o podanych ID, zachowując kolejność listy."""
+        cocktail_ids = cocktail_ids[:500]
+        if not cocktail_ids:
+            return []
+        stmt = statements.get(("cocktail.visible_by_ids", view, viewer_id is not None), lambda: (
+            self._visible_to(self._listing_query(view), viewer_id is not None)
+            .where(Cocktail.id.in_(bindparam("cocktail_ids", expanding=True)))
+        ))
+        results = db.execute(stmt, {"cocktail_ids": cocktail_ids, "viewer_id": viewer_id}).all()
+        position = {cocktail_id: index for index, cocktail_id in enumerate(cocktail_ids)}
+        results = sorted(results, key=lambda row: position[row.id])
+        return self._build_listing_items(db, results[:limit], view)
+
+    def get_stats_rows(self, db: Session, cocktail_ids: List[int]):
+        """Liczniki ocen i ulubionych wielu koktajli (wiersze Core z is_public i user_id do sprawdzenia widoczności)."""
+        if not cocktail_ids:
+            return []
+        stmt = statements.get("cocktail.stats_for_ids", lambda: (
+            select(
+                Cocktail.id,
+                Cocktail.user_id,
+                Cocktail.is_public,
+                self._average_rating_expr.label("avg_rating"),
+                Cocktail.ratings_count,
+                Cocktail.favorites_count
             )
-            if cocktail_detail:
-                cocktail_details_list.append(cocktail_detail)
-        
-        return cocktail_details_list
+            .where(Cocktail.id.in_(bindparam("cocktail_ids", expanding=True)))
+            .order_by(Cocktail.id)
+        ))
+        return db.execute(stmt, {"cocktail_ids": cocktail_ids}).all()
+
+    def stats_from_row(self, row) -> CocktailStats:
+        return CocktailStats(
+            id=row.id,
+            average_rating=average_rating_value(row.avg_rating),
+            ratings_count=row.ratings_count or 0,
+            favorites_count=row.favorites_count or 0
+        )
+
+    def get_rating_stats(self, db: Session, cocktail_id: int) -> Optional[Tuple[bool, int, CocktailRatingStats]]:
+        """Rozkład ocen z liczników koktajlu: (is_public, user_id autora, statystyki) lub None."""
+        stmt = statements.get("cocktail.rating_stats", lambda: (
+            select(
+                Cocktail.is_public,
+                Cocktail.user_id,
+                self._average_rating_expr.label("avg_rating"),
+                Cocktail.ratings_count,
+                *self._star_columns.values()
+            )
+            .where(Cocktail.id == bindparam("cocktail_id"))
+        ))
+        row = db.execute(stmt, {"cocktail_id": cocktail_id}).first()
+        if row is None:
+            return None
+        stats = CocktailRatingStats(
+            cocktail_id=cocktail_id,
+            average_rating=average_rating_value(row.avg_rating),
+            ratings_count=row.ratings_count or 0,
+            distribution={stars: getattr(row, column.key) or 0 for stars, column in self._star_columns.items()}
+        )
+        return row.is_public is not False, row.user_id, stats
+
+    def update_rating_stats(self, db: Session, cocktail_id: int, star_deltas: Dict[int, int]) -> None:
+        """
+        Przyrostowo aktualizuje rozkład ocen (ratings_1..ratings_5), liczbę i sumę ocen oraz
+        średnią bayesowską koktajlu. star_deltas to zmiana liczby ocen per liczba gwiazdek,
+        np. zmiana oceny z 2 na 5 to {2: -1, 5: 1}.
+
+        Instrukcje UPDATE (bez commit) - wywoływane w tej samej transakcji co zapis oceny.
+        Otrzymane oceny autora (user_stats) zmieniają się razem z licznikami koktajlu.
+        """
+        star_deltas = {stars: delta for stars, delta in star_deltas.items() if delta}
+        if not star_deltas:
+            return
+        count_delta = sum(star_deltas.values())
+        sum_delta = sum(stars * delta for stars, delta in star_deltas.items())
+        prior_weight = settings.RATING_PRIOR_WEIGHT
+        prior_total = settings.RATING_PRIOR_WEIGHT * settings.RATING_PRIOR_MEAN
+        db.execute(
+            update(Cocktail)
+            .where(Cocktail.id == cocktail_id)
+            .values(
+                **{self._star_columns[stars].key: self._star_columns[stars] + delta for stars, delta in star_deltas.items()},
+                ratings_count=Cocktail.ratings_count + count_delta,
+                ratings_sum=Cocktail.ratings_sum + sum_delta,
+                bayesian_rating=(prior_total + Cocktail.ratings_sum + sum_delta)
+                    / (prior_weight + Cocktail.ratings_count + count_delta),
+                updated_at=Cocktail.updated_at  # statystyki nie są edycją koktajlu
+            )
+            .execution_options(synchronize_session=False)
+        )
+        user_stats.record_received(db, cocktail_id, count_delta, sum_delta)
+        change_log.record(db, COCKTAIL_STATS, [cocktail_id])
+
+    def update_favorites_count(self, db: Session, cocktail_id: int, delta: int) -> None:
+        """Przyrostowo aktualizuje licznik ulubionych koktajlu (bez commit)."""
+        db.execute(
+            update(Cocktail)
+            .where(Cocktail.id == cocktail_id)
+            .values(
+                favorites_count=Cocktail.favorites_count + delta,
+                updated_at=Cocktail.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        change_log.record(db, COCKTAIL_STATS, [cocktail_id])
+
+    def _update_suggest_index(self, cocktail_orm: Cocktail) -> None:
+        """Podpowiedzi obejmują tylko publiczne koktajle."""
+        if cocktail_orm.is_public:
+            suggest_index.upsert(
+                "cocktail", cocktail_orm.id, cocktail_orm.name,
+                (cocktail_orm.favorites_count or 0) + (cocktail_orm.ratings_count or 0)
+            )
+        else:
+            suggest_index.remove("cocktail", cocktail_orm.id)
 
     def create_cocktail(self, db: Session, cocktail_in: CocktailCreate, user_id: int) -> CocktailWithDetails:
         db_cocktail_data = cocktail_in.model_dump(exclude={"ingredients", "tags"})
         if cocktail_in.image_url:
             db_cocktail_data['image_url'] = str(cocktail_in.image_url)
 
-        db_cocktail_orm = Cocktail(**db_cocktail_data, user_id=user_id)
-        db.add(db_cocktail_orm)
-        
-        # Zarządzanie tagami
-        if cocktail_in.tags:
-            for tag_data in cocktail_in.tags:
-                tag = db.query(Tag).get(tag_data.tag_id)
-                if tag:
-                    db_cocktail_orm.tags.append(tag)
-        
-        try:
+        def work():
+            db_cocktail_orm = Cocktail(**db_cocktail_data, user_id=user_id, search_key=fold_text(cocktail_in.name))
+            db.add(db_cocktail_orm)
+
+            # Zarządzanie tagami
+            if cocktail_in.tags:
+                for tag_data in cocktail_in.tags:
+                    tag = db.query(Tag).get(tag_data.tag_id)
+                    if tag:
+                        db_cocktail_orm.tags.append(tag)
+
             db.flush()
-        except Exception:
-            db.rollback()
-            raise
-
-        # Zarządzanie składnikami
-        if cocktail_in.ingredients:
-            for ing_data in cocktail_in.ingredients:
-                stmt = cocktail_ingredient_association.insert().values(
-                    cocktail_id=db_cocktail_orm.id,
-                    ingredient_id=ing_data.ingredient_id,
-                    amount=ing_data.amount,
-                    unit=ing_data.unit.value
-                )
-                db.execute(stmt)
-        
-        db.commit()
+
+            # Zarządzanie składnikami
+            ingredient_ids = []
+            if cocktail_in.ingredients:
+                for ing_data in cocktail_in.ingredients:
+                    stmt = cocktail_ingredient_association.insert().values(
+                        cocktail_id=db_cocktail_orm.id,
+                        ingredient_id=ing_data.ingredient_id,
+                        amount=ing_data.amount,
+                        unit=ing_data.unit.value
+                    )
+                    db.execute(stmt)
+                    ingredient_ids.append(ing_data.ingredient_id)
+
+            # Indeks podobnych receptur (MinHash/LSH)
+            lsh_bands = recipe_index_crud.store(db, db_cocktail_orm.id, ingredient_ids)
+            change_log.record(db, COCKTAIL, [db_cocktail_orm.id])
+            user_stats.update(db, user_id, cocktails_count=1, public_cocktails_count=int(db_cocktail_orm.is_public is True))
+            return db_cocktail_orm, ingredient_ids, lsh_bands
+
+        db_cocktail_orm, ingredient_ids, lsh_bands = run_write_transaction(db, work, name="cocktail.create")
+        recipe_index.add(db_cocktail_orm.id, ingredient_ids, lsh_bands)
+        self._update_suggest_index(db_cocktail_orm)
+        cocktail_name_index.upsert(db_cocktail_orm.id, db_cocktail_orm.name)
+        listing_cache.invalidate()
+        purge_keys(COCKTAIL_LIST_KEY, user_cocktails_key(user_id))
         return self.get_cocktail(db, cocktail_id=db_cocktail_orm.id)
 
     def update_cocktail(
@@ -362,56 +1149,93 @@ class CRUDCocktail:
     ) -> Optional[CocktailWithDetails]:
         update_data = cocktail_in.model_dump(exclude_unset=True)
 
-        # Aktualizacja podstawowych pól
-        for field, value in update_data.items():
-            if field not in ["ingredients", "tags"]:
-                setattr(db_cocktail_orm, field, value)
-        
-        if 'image_url' in update_data and update_data['image_url'] is not None:
-            db_cocktail_orm.image_url = str(update_data['image_url'])
-
-        # Aktualizacja składników
-        if "ingredients" in update_data and update_data["ingredients"] is not None:
-            db.execute(delete(cocktail_ingredient_association).where(cocktail_ingredient_association.c.cocktail_id == db_cocktail_orm.id))
-            for ing_data_dict in update_data["ingredients"]:
-                try:
-                    ing_data = CocktailIngredientData(**ing_data_dict)
-                except Exception as e:
-                    print(f"Błąd walidacji danych składnika podczas aktualizacji: {e} dla {ing_data_dict}")
-                    continue
-
-                stmt = cocktail_ingredient_association.insert().values(
-                    cocktail_id=db_cocktail_orm.id,
-                    ingredient_id=ing_data.ingredient_id,
-                    amount=ing_data.amount,
-                    unit=ing_data.unit.value
-                )
-                db.execute(stmt)
-        
-        # Aktualizacja tagów
-        if "tags" in update_data and update_data["tags"] is not None:
-            db_cocktail_orm.tags.clear()
-            for tag_data_obj in update_data["tags"]:
-                tag_id = getattr(tag_data_obj, 'tag_id', tag_data_obj.get('tag_id') if isinstance(tag_data_obj, dict) else None)
-                if tag_id:
-                    tag = db.query(Tag).get(tag_id)
-                    if tag:
-                        db_cocktail_orm.tags.append(tag)
-        
-        try:
-            db.commit()
-        except Exception:
-            db.rollback()
-            raise
+        def work():
+            was_public = db_cocktail_orm.is_public is True
+            # Aktualizacja podstawowych pól
+            for field, value in update_data.items():
+                if field not in ["ingredients", "tags"]:
+                    setattr(db_cocktail_orm, field, value)
+
+            if 'image_url' in update_data and update_data['image_url'] is not None:
+                db_cocktail_orm.image_url = str(update_data['image_url'])
+
+            if update_data.get('name') is not None:
+                db_cocktail_orm.search_key = fold_text(update_data['name'])
+
+            # Aktualizacja składników
+            ingredient_ids = None
+            lsh_bands = None
+            if "ingredients" in update_data and update_data["ingredients"] is not None:
+                ingredient_ids = []
+                db.execute(delete(cocktail_ingredient_association).where(cocktail_ingredient_association.c.cocktail_id == db_cocktail_orm.id))
+                for ing_data_dict in update_data["ingredients"]:
+                    try:
+                        ing_data = CocktailIngredientData(**ing_data_dict)
+                    except Exception as e:
+                        print(f"Błąd walidacji danych składnika podczas aktualizacji: {e} dla {ing_data_dict}")
+                        continue
+
+                    stmt = cocktail_ingredient_association.insert().values(
+                        cocktail_id=db_cocktail_orm.id,
+                        ingredient_id=ing_data.ingredient_id,
+                        amount=ing_data.amount,
+                        unit=ing_data.unit.value
+                    )
+                    db.execute(stmt)
+                    ingredient_ids.append(ing_data.ingredient_id)
 
+                lsh_bands = recipe_index_crud.store(db, db_cocktail_orm.id, ingredient_ids)
+
+            # Aktualizacja tagów
+            if "tags" in update_data and update_data["tags"] is not None:
+                db_cocktail_orm.tags.clear()
+                for tag_data_obj in update_data["tags"]:
+                    tag_id = getattr(tag_data_obj, 'tag_id', tag_data_obj.get('tag_id') if isinstance(tag_data_obj, dict) else None)
+                    if tag_id:
+                        tag = db.query(Tag).get(tag_id)
+                        if tag:
+                            db_cocktail_orm.tags.append(tag)
+            change_log.record(db, COCKTAIL, [db_cocktail_orm.id])
+            is_public = db_cocktail_orm.is_public is True
+            if is_public != was_public:
+                user_stats.record_visibility(db, [db_cocktail_orm.id], is_public)
+            return ingredient_ids, lsh_bands
+
+        ingredient_ids, lsh_bands = run_write_transaction(db, work, name="cocktail.update")
+        if ingredient_ids is not None:
+            recipe_index.add(db_cocktail_orm.id, ingredient_ids, lsh_bands)
+        self._update_suggest_index(db_cocktail_orm)
+        cocktail_name_index.upsert(db_cocktail_orm.id, db_cocktail_orm.name)
+        listing_cache.invalidate()
+        purge_keys(cocktail_key(db_cocktail_orm.id), COCKTAIL_LIST_KEY, user_cocktails_key(db_cocktail_orm.user_id))
         return self.get_cocktail(db, cocktail_id=db_cocktail_orm.id)
 
+    def forget_cocktails(self, cocktail_ids: List[int]) -> None:
+        """Usuwa koktajle z indeksów w pamięci (po commit usunięcia z bazy)."""
+        for cocktail_id in cocktail_ids:
+            recipe_index.remove(cocktail_id)
+            suggest_index.remove("cocktail", cocktail_id)
+            cocktail_name_index.remove(cocktail_id)
+        listing_cache.invalidate()
+        purge_keys(
+            COCKTAIL_LIST_KEY,
+            *(cocktail_key(cocktail_id) for cocktail_id in cocktail_ids),
+            *(cocktail_ratings_key(cocktail_id) for cocktail_id in cocktail_ids)
+        )
+
     def delete_cocktail(self, db: Session, cocktail_id: int) -> Optional[Cocktail]:
-        db_cocktail_orm = db.query(Cocktail).get(cocktail_id)
-        if db_cocktail_orm:
-            db.delete(db_cocktail_orm)
-            db.commit()
+        def work() -> Optional[Cocktail]:
+            db_cocktail_orm = db.query(Cocktail).get(cocktail_id)
+            if db_cocktail_orm:
+                # Oceny, ulubione, powiązania i kubełki LSH usuwa baza (ON DELETE CASCADE)
+                user_stats.forget_cocktails(db, [cocktail_id])
+                db.delete(db_cocktail_orm)
+                change_log.record(db, COCKTAIL, [cocktail_id], DELETE)
             return db_cocktail_orm
-        return None
+
+        db_cocktail_orm = run_write_transaction(db, work, name="cocktail.delete")
+        if db_cocktail_orm:
+            self.forget_cocktails([cocktail_id])
+        return db_cocktail_orm
 
 cocktail = CRUDCocktail()
\ No newline at end of file
@@ -1,8 +1,15 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from sqlalchemy import Row, delete, select
 from sqlalchemy.orm import Session
 
+from app.db.transaction import run_write_transaction
+from app.db.upsert import dialect_insert
 from app.models.favorite import Favorite
 from app.schemas.favorite import FavoriteCreate
+from app.crud.crud_cocktail import cocktail as crud_cocktail
+from app.crud.crud_trending import trending as crud_trending
+from app.crud.crud_user_stats import user_stats
+from app.live_events import live_events
 
 class CRUDFavorite:
     def get_favorite(self, db: Session, user_id: int, cocktail_id: int) -> Optional[Favorite]:
@@ -11,30 +18,77 @@ class CRUDFavorite:
             Favorite.cocktail_id == cocktail_id
         ).first()
 
-    def get_user_favorites(self, db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Favorite]:
-        return db.query(Favorite).filter(Favorite.user_id == user_id).offset(skip).limit(limit).all()
+    def get_user_favorites(self, db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Row]:
+        # Lista tylko do odczytu - wiersze Core zamiast obiektów ORM (schemas.Favorite czyta je przez from_attributes)
+        return db.execute(
+            select(Favorite.id, Favorite.cocktail_id, Favorite.user_id, Favorite.created_at)
+            .where(Favorite.user_id == user_id)
+            .order_by(Favorite.id)
+            .offset(skip)
+            .limit(limit)
+        ).all()
 
-    def create_favorite(self, db: Session, favorite_in: FavoriteCreate, user_id: int) -> Favorite:
-        existing_favorite = self.get_favorite(db, user_id, favorite_in.cocktail_id)
-        if existing_favorite:
-            # Już istnieje, można zwrócić istniejący lub rzucić błąd
-            return existing_favorite # lub raise ValueError("Already favorited")
+    def _insert_favorite(self, db: Session, user_id: int, cocktail_id: int) -> Optional[Favorite]:
+        """INSERT ... ON CONFLICT DO NOTHING - zwraca None, jeśli ulubiony już istniał (bez commita)."""
+        stmt = (
+            dialect_insert(db, Favorite)
+            .values(user_id=user_id, cocktail_id=cocktail_id)
+            .on_conflict_do_nothing(index_elements=["user_id", "cocktail_id"])
+            .returning(Favorite)
+        )
+        db_favorite = db.scalars(stmt).first()
+        if db_favorite is not None:
+            crud_cocktail.update_favorites_count(db, cocktail_id, delta=1)
+            user_stats.update(db, user_id, favorites_count=1)
+            crud_trending.record_favorite(db, cocktail_id)
+        return db_favorite
+
+    def _delete_favorite(self, db: Session, user_id: int, cocktail_id: int) -> Optional[Favorite]:
+        """DELETE ... RETURNING - zwraca None, jeśli ulubionego nie było (bez commita)."""
+        stmt = (
+            delete(Favorite)
+            .where(Favorite.user_id == user_id, Favorite.cocktail_id == cocktail_id)
+            .returning(Favorite)
+        )
+        db_favorite = db.scalars(stmt).first()
+        if db_favorite is not None:
+            # Wiersza już nie ma w bazie - odłączamy obiekt, żeby commit go nie wygasił
+            db.expunge(db_favorite)
+            crud_cocktail.update_favorites_count(db, cocktail_id, delta=-1)
+            user_stats.update(db, user_id, favorites_count=-1)
+        return db_favorite
 
-        db_favorite = Favorite(
-            user_id=user_id,
-            cocktail_id=favorite_in.cocktail_id
+    def create_favorite(self, db: Session, favorite_in: FavoriteCreate, user_id: int) -> Optional[Favorite]:
+        """Dodaje koktajl do ulubionych; None, jeśli już był w ulubionych."""
+        db_favorite = run_write_transaction(
+            db, lambda: self._insert_favorite(db, user_id, favorite_in.cocktail_id), name="favorite.create"
         )
-        db.add(db_favorite)
-        db.commit()
-        db.refresh(db_favorite)
+        if db_favorite is not None:
+            live_events.publish([favorite_in.cocktail_id])
         return db_favorite
 
     def delete_favorite(self, db: Session, user_id: int, cocktail_id: int) -> Optional[Favorite]:
-        db_favorite = self.get_favorite(db, user_id, cocktail_id)
-        if db_favorite:
-            db.delete(db_favorite)
-            db.commit()
-            return db_favorite
-        return None
+        db_favorite = run_write_transaction(
+            db, lambda: self._delete_favorite(db, user_id, cocktail_id), name="favorite.delete"
+        )
+        if db_favorite is not None:
+            live_events.publish([cocktail_id])
+        return db_favorite
+
+    def toggle_favorite(self, db: Session, user_id: int, cocktail_id: int) -> Tuple[bool, Optional[Favorite]]:
+        """
+        Przełącza stan ulubionego w jednej transakcji: usuwa, jeśli istniał, w przeciwnym razie dodaje.
+        Zwraca (is_favorite po operacji, wiersz ulubionego).
+        """
+        def work() -> Tuple[bool, Optional[Favorite]]:
+            db_favorite = self._delete_favorite(db, user_id, cocktail_id)
+            if db_favorite is not None:
+                return False, db_favorite
+            return True, self._insert_favorite(db, user_id, cocktail_id)
+
+        result = run_write_transaction(db, work, name="favorite.toggle")
+        if result[1] is not None:
+            live_events.publish([cocktail_id])
+        return result
 
 favorite = CRUDFavorite()
\ No newline at end of file
@@ -1,7 +1,15 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.text import fold_text
+
 from app.models.ingredient import Ingredient
+from app.suggest import suggest_index
+from app.reference_data import reference_data
+from app.http_cache import purge_keys, INGREDIENT_LIST_KEY
+from app.trigram import ingredient_name_index
+from app.crud.crud_change_log import change_log, INGREDIENT, DELETE
 from app.schemas.ingredient import IngredientCreate, IngredientUpdate
 
 class CRUDIngredient:
@@ -14,11 +22,40 @@ class CRUDIngredient:
     def get_ingredients(self, db: Session, skip: int = 0, limit: int = 100) -> List[Ingredient]:
         return db.query(Ingredient).offset(skip).limit(limit).all()
 
+    def search_ingredients(self, db: Session, query: str, limit: int = 20) -> List[Ingredient]:
+        """
+        Wyszukuje składniki po nazwie bez względu na polskie znaki i wielkość liter
+        (dopasowanie fragmentu search_key) oraz z tolerancją literówek (indeks trigramów).
+        """
+        from app.crud.crud_search import search as crud_search
+
+        folded = fold_text(query)
+        if not folded:
+            return []
+        crud_search.ensure_loaded(db)
+        exact = db.query(Ingredient).filter(Ingredient.search_key.contains(folded, autoescape=True)).limit(limit).all()
+        exact_ids = {ingredient.id for ingredient in exact}
+        fuzzy_ids = [
+            ingredient_id
+            for ingredient_id, _ in ingredient_name_index.search(folded, settings.SEARCH_FUZZY_MIN_SIMILARITY, limit)
+            if ingredient_id not in exact_ids
+        ]
+        if fuzzy_ids and len(exact) < limit:
+            fuzzy = {ingredient.id: ingredient for ingredient in db.query(Ingredient).filter(Ingredient.id.in_(fuzzy_ids)).all()}
+            exact.extend(fuzzy[ingredient_id] for ingredient_id in fuzzy_ids if ingredient_id in fuzzy)
+        return exact[:limit]
+
     def create_ingredient(self, db: Session, ingredient_in: IngredientCreate) -> Ingredient:
-        db_ingredient = Ingredient(name=ingredient_in.name)
+        db_ingredient = Ingredient(name=ingredient_in.name, search_key=fold_text(ingredient_in.name))
         db.add(db_ingredient)
+        db.flush()
+        change_log.record(db, INGREDIENT, [db_ingredient.id])
         db.commit()
         db.refresh(db_ingredient)
+        suggest_index.upsert("ingredient", db_ingredient.id, db_ingredient.name)
+        ingredient_name_index.upsert(db_ingredient.id, db_ingredient.name)
+        reference_data.refresh(db)
+        purge_keys(INGREDIENT_LIST_KEY)
         return db_ingredient
 
     def update_ingredient(
@@ -26,9 +63,15 @@ class CRUDIngredient:
     ) -> Ingredient:
         if ingredient_in.name is not None:
             db_ingredient.name = ingredient_in.name
+            db_ingredient.search_key = fold_text(ingredient_in.name)
         db.add(db_ingredient)
+        change_log.record(db, INGREDIENT, [db_ingredient.id])
         db.commit()
         db.refresh(db_ingredient)
+        suggest_index.upsert("ingredient", db_ingredient.id, db_ingredient.name)
+        ingredient_name_index.upsert(db_ingredient.id, db_ingredient.name)
+        reference_data.refresh(db)
+        purge_keys(INGREDIENT_LIST_KEY)
         return db_ingredient
 
     def delete_ingredient(self, db: Session, ingredient_id: int) -> Optional[Ingredient]:
@@ -40,7 +83,12 @@ class CRUDIngredient:
             # Można dodać logikę sprawdzającą lub zmienić strategię ondelete.
             try:
                 db.delete(db_ingredient)
+                change_log.record(db, INGREDIENT, [ingredient_id], DELETE)
                 db.commit()
+                suggest_index.remove("ingredient", ingredient_id)
+                ingredient_name_index.remove(ingredient_id)
+                reference_data.refresh(db)
+                purge_keys(INGREDIENT_LIST_KEY)
                 return db_ingredient
             except Exception as e: # Np. IntegrityError
                 db.rollback()
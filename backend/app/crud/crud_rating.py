@@ -1,61 +1,156 @@
 # backend\app\crud\crud_rating.py
 from typing import Optional, List
+from sqlalchemy import Integer, bindparam, select
 from sqlalchemy.orm import Session
 
+from app.db.statement_cache import statements
+from app.db.transaction import run_write_transaction
+from app.db.upsert import dialect_insert
+from app.http_cache import purge_keys, cocktail_ratings_key
+from app.live_events import live_events
 from app.models.rating import Rating
-from app.schemas.rating import RatingCreate, RatingUpdate
+from app.schemas.rating import RatingCreate, RatingUpdate, RatingWithUser
 from app import models
+from app.crud.crud_cocktail import cocktail as crud_cocktail
+from app.crud.crud_trending import trending as crud_trending
+from app.crud.crud_user import user as crud_user
+from app.crud.crud_user_stats import user_stats
 
 class CRUDRating:
+    # Odczyty przez gotowe instrukcje z parametrami (app/db/statement_cache.py)
+
     def get_rating(self, db: Session, rating_id: int) -> Optional[Rating]:
-        return db.query(Rating).filter(Rating.id == rating_id).first()
+        stmt = statements.get("rating.get", lambda: select(Rating).where(Rating.id == bindparam("rating_id")))
+        return db.scalars(stmt, {"rating_id": rating_id}).first()
+
+    def _ratings_page(self, column):
+        return (
+            select(Rating).where(column == bindparam("key"))
+            .offset(bindparam("offset", type_=Integer)).limit(bindparam("limit", type_=Integer))
+        )
+
+    def _cocktail_ratings_page(self, keyset: bool, has_comment: Optional[bool]):
+        """
+        Oceny koktajlu od najnowszych. Z keyset stronicowanie po id (:before_id) zamiast OFFSET -
+        koszt strony nie rośnie z jej numerem. has_comment=True korzysta z indeksu częściowego
+        ix_ratings_cocktail_id_commented (warunek "comment IS NOT NULL" musi być w zapytaniu dosłownie).
+        """
+        stmt = select(Rating).where(Rating.cocktail_id == bindparam("cocktail_id"))
+        if keyset:
+            stmt = stmt.where(Rating.id < bindparam("before_id", type_=Integer))
+        if has_comment is True:
+            stmt = stmt.where(Rating.comment.is_not(None))
+        elif has_comment is False:
+            stmt = stmt.where(Rating.comment.is_(None))
+        return (
+            stmt.order_by(Rating.id.desc())
+            .offset(bindparam("offset", type_=Integer)).limit(bindparam("limit", type_=Integer))
+        )
+
+    def get_ratings_for_cocktail(
+        self,
+        db: Session,
+        cocktail_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        before_id: Optional[int] = None,
+        has_comment: Optional[bool] = None
+    ) -> List[Rating]:
+        keyset = before_id is not None
+        stmt = statements.get(
+            ("rating.for_cocktail", keyset, has_comment),
+            lambda: self._cocktail_ratings_page(keyset, has_comment)
+        )
+        return db.scalars(stmt, {
+            "cocktail_id": cocktail_id, "before_id": before_id, "offset": skip, "limit": limit
+        }).all()
 
-    def get_ratings_for_cocktail(self, db: Session, cocktail_id: int, skip: int = 0, limit: int = 100) -> List[Rating]:
-        return db.query(Rating).filter(Rating.cocktail_id == cocktail_id).offset(skip).limit(limit).all()
+    def with_users(self, db: Session, ratings: List[Rating]) -> List[RatingWithUser]:
+        """Osadza profile autorów ocen - jedno zapytanie (lub żadne, przy trafieniach w cache) na stronę."""
+        profiles = crud_user.get_user_briefs(db, {db_rating.user_id for db_rating in ratings})
+        return [
+            RatingWithUser(
+                id=db_rating.id,
+                rating_value=db_rating.rating_value,
+                comment=db_rating.comment,
+                user_id=db_rating.user_id,
+                cocktail_id=db_rating.cocktail_id,
+                created_at=db_rating.created_at,
+                updated_at=db_rating.updated_at,
+                user=profiles.get(db_rating.user_id)
+            )
+            for db_rating in ratings
+        ]
 
     def get_ratings_by_user(self, db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Rating]:
-        return db.query(Rating).filter(Rating.user_id == user_id).offset(skip).limit(limit).all()
+        stmt = statements.get("rating.by_user", lambda: self._ratings_page(Rating.user_id))
+        return db.scalars(stmt, {"key": user_id, "offset": skip, "limit": limit}).all()
 
     def create_rating(self, db: Session, rating_in: RatingCreate, user_id: int) -> Rating:
-        # Sprawdź, czy użytkownik już ocenił ten koktajl
-        existing_rating = db.query(Rating).filter(
-            Rating.user_id == user_id,
-            Rating.cocktail_id == rating_in.cocktail_id
-        ).first()
-        if existing_rating:
-            # Można zdecydować się na aktualizację istniejącej oceny lub rzucenie błędu
-            # Tutaj rzucamy błąd (lub można zwrócić None/podnieść HTTPException w endpoint)
-            raise ValueError("User has already rated this cocktail.") # lub return None
-
-        db_rating = Rating(
-            **rating_in.model_dump(),
-            user_id=user_id
-        )
-        db.add(db_rating)
-        db.commit()
+        def work() -> Rating:
+            # INSERT ... ON CONFLICT DO NOTHING na unikalnym (user_id, cocktail_id) - bez osobnego
+            # SELECT-a i bez wyścigu dwóch równoległych żądań
+            stmt = (
+                dialect_insert(db, Rating)
+                .values(**rating_in.model_dump(), user_id=user_id)
+                .on_conflict_do_nothing(index_elements=["user_id", "cocktail_id"])
+                .returning(Rating)
+            )
+            db_rating = db.scalars(stmt).first()
+            if db_rating is None:
+                raise ValueError("User has already rated this cocktail.")
+
+            crud_cocktail.update_rating_stats(db, rating_in.cocktail_id, {rating_in.rating_value: 1})
+            user_stats.update(db, user_id, ratings_count=1)
+            crud_trending.record_rating(db, rating_in.cocktail_id)
+            return db_rating
+
+        db_rating = run_write_transaction(db, work, name="rating.create")
+        purge_keys(cocktail_ratings_key(rating_in.cocktail_id))
+        live_events.publish([rating_in.cocktail_id])
         db.refresh(db_rating)
         return db_rating
 
     def update_rating(self, db: Session, db_rating: Rating, rating_in: RatingUpdate) -> Rating:
         update_data = rating_in.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_rating, field, value)
-        db.add(db_rating)
-        db.commit()
+
+        def work() -> bool:
+            old_value = db_rating.rating_value
+            for field, value in update_data.items():
+                setattr(db_rating, field, value)
+            db.add(db_rating)
+            if db_rating.rating_value != old_value:
+                crud_cocktail.update_rating_stats(db, db_rating.cocktail_id, {old_value: -1, db_rating.rating_value: 1})
+                return True
+            return False
+
+        stats_changed = run_write_transaction(db, work, name="rating.update")
+        purge_keys(cocktail_ratings_key(db_rating.cocktail_id))
+        if stats_changed:
+            live_events.publish([db_rating.cocktail_id])
         db.refresh(db_rating)
         return db_rating
 
     def delete_rating(self, db: Session, rating_id: int) -> Optional[Rating]:
-        db_rating = self.get_rating(db, rating_id)
+        def work() -> Optional[Rating]:
+            db_rating = self.get_rating(db, rating_id)
+            if db_rating:
+                db.delete(db_rating)
+                crud_cocktail.update_rating_stats(db, db_rating.cocktail_id, {db_rating.rating_value: -1})
+                user_stats.update(db, db_rating.user_id, ratings_count=-1)
+            return db_rating
+
+        db_rating = run_write_transaction(db, work, name="rating.delete")
         if db_rating:
-            db.delete(db_rating)
-            db.commit()
+            purge_keys(cocktail_ratings_key(db_rating.cocktail_id))
+            live_events.publish([db_rating.cocktail_id])
         return db_rating
     
     def get_rating_by_user_and_cocktail(self, db: Session, *, user_id: int, cocktail_id: int) -> Optional[models.Rating]:
-        return db.query(models.Rating).filter(
-            models.Rating.user_id == user_id,
-            models.Rating.cocktail_id == cocktail_id
-        ).first()
+        stmt = statements.get("rating.by_user_and_cocktail", lambda: select(Rating).where(
+            Rating.user_id == bindparam("user_id"),
+            Rating.cocktail_id == bindparam("cocktail_id")
+        ))
+        return db.scalars(stmt, {"user_id": user_id, "cocktail_id": cocktail_id}).first()
 
 rating = CRUDRating()
\ No newline at end of file
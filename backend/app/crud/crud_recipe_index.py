@@ -0,0 +1,76 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, delete, insert
+from sqlalchemy.orm import Session
+
+from app.minhash import recipe_index, minhash_signature, lsh_buckets
+from app.models.cocktail import cocktail_ingredient_association
+from app.models.recipe_lsh import CocktailLSHBucket
+
+class CRUDRecipeIndex:
+    """Zapis kubełków LSH receptur w bazie i synchronizacja z indeksem w pamięci (recipe_index)."""
+
+    def load(self, db: Session) -> int:
+        """
+        Ładuje indeks LSH z bazy do pamięci. Koktajle bez zapisanych kubełków
+        (np. sprzed wprowadzenia indeksu) są przeliczane i zapisywane. Zwraca liczbę koktajli w indeksie.
+        """
+        ingredients: Dict[int, set] = defaultdict(set)
+        for cocktail_id, ingredient_id in db.execute(
+            select(cocktail_ingredient_association.c.cocktail_id, cocktail_ingredient_association.c.ingredient_id)
+        ):
+            ingredients[cocktail_id].add(ingredient_id)
+
+        bands: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for cocktail_id, band, bucket in db.execute(
+            select(CocktailLSHBucket.cocktail_id, CocktailLSHBucket.band, CocktailLSHBucket.bucket)
+        ):
+            bands[cocktail_id].append((band, bucket))
+
+        index_bands = {
+            cocktail_id: [bucket for _, bucket in sorted(cocktail_bands)]
+            for cocktail_id, cocktail_bands in bands.items()
+            if cocktail_id in ingredients
+        }
+        missing = [cocktail_id for cocktail_id in ingredients if cocktail_id not in index_bands]
+        for cocktail_id in missing:
+            index_bands[cocktail_id] = self.store(db, cocktail_id, ingredients[cocktail_id])
+        if missing:
+            db.commit()
+
+        recipe_index.load(
+            index_bands,
+            {cocktail_id: frozenset(ids) for cocktail_id, ids in ingredients.items()}
+        )
+        return len(index_bands)
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not recipe_index.loaded:
+            self.load(db)
+
+    def store(self, db: Session, cocktail_id: int, ingredient_ids: Iterable[int]) -> List[int]:
+        """Zapisuje kubełki LSH receptury (bez commit). Zwraca listę kubełków do recipe_index.add."""
+        bands = lsh_buckets(minhash_signature(ingredient_ids))
+        db.execute(delete(CocktailLSHBucket).where(CocktailLSHBucket.cocktail_id == cocktail_id))
+        db.execute(
+            insert(CocktailLSHBucket),
+            [{"cocktail_id": cocktail_id, "band": band, "bucket": bucket} for band, bucket in enumerate(bands)]
+        )
+        return bands
+
+    def remove(self, db: Session, cocktail_id: int) -> None:
+        """Usuwa kubełki LSH receptury (bez commit)."""
+        db.execute(delete(CocktailLSHBucket).where(CocktailLSHBucket.cocktail_id == cocktail_id))
+
+    def find_similar(
+        self,
+        db: Session,
+        ingredient_ids: Iterable[int],
+        min_similarity: float,
+        exclude_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        self.ensure_loaded(db)
+        return recipe_index.query(ingredient_ids, min_similarity, exclude_id=exclude_id)
+
+recipe_index_crud = CRUDRecipeIndex()
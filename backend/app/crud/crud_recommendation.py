@@ -0,0 +1,82 @@
+import time
+from typing import Optional
+
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.transaction import run_write_transaction
+from app.models.favorite import Favorite
+from app.models.rating import Rating
+from app.models.recommendation import CocktailSimilarity
+
+# Ocena neutralna - niższe i równe nie są sygnałem, że koktajl się podobał
+_NEUTRAL_RATING = 3
+
+class CRUDRecommendation:
+    def last_rebuilt(self, db: Session) -> Optional[float]:
+        """Czas (epoch) ostatniej przebudowy zapisanej w tabeli; None - tabela pusta."""
+        return db.scalar(select(func.max(CocktailSimilarity.rebuilt_ts)))
+
+    def rebuild(self, db: Session, top_k: Optional[int] = None, max_age: Optional[float] = None) -> Optional[int]:
+        """
+        Przebudowuje tabelę cocktail_similarities z ulubionych i ocen.
+
+        Ulubiony koktajl ma wagę RECOMMENDER_FAVORITE_WEIGHT, ocena powyżej neutralnej (3)
+        RECOMMENDER_RATING_WEIGHT * (rating_value - 3) / 2; niskie oceny są pomijane, żeby
+        nie zbliżały do siebie koktajli, które użytkownikowi nie smakowały.
+        Zwraca liczbę zapisanych par albo None, jeśli przebudowa została pominięta: z max_age -
+        tabela przebudowana przed mniej niż max_age sekundami, a także gdy inny worker zapisał
+        ją w trakcie obliczeń.
+        """
+        from app import recommender  # NumPy/SciPy potrzebne tylko przy przebudowie
+
+        started = time.time()
+        if max_age is not None:
+            last_rebuilt = self.last_rebuilt(db)
+            if last_rebuilt is not None and started - last_rebuilt < max_age:
+                return None
+
+        top_k = top_k or settings.RECOMMENDER_TOP_K
+        user_ids, cocktail_ids, weights = [], [], []
+        for user_id, cocktail_id in db.execute(select(Favorite.user_id, Favorite.cocktail_id)):
+            user_ids.append(user_id)
+            cocktail_ids.append(cocktail_id)
+            weights.append(settings.RECOMMENDER_FAVORITE_WEIGHT)
+        for user_id, cocktail_id, rating_value in db.execute(
+            select(Rating.user_id, Rating.cocktail_id, Rating.rating_value)
+            .where(Rating.rating_value > _NEUTRAL_RATING)
+        ):
+            user_ids.append(user_id)
+            cocktail_ids.append(cocktail_id)
+            weights.append(
+                settings.RECOMMENDER_RATING_WEIGHT * (rating_value - _NEUTRAL_RATING) / (5 - _NEUTRAL_RATING)
+            )
+
+        rows = []
+        if user_ids:
+            matrix, cocktails = recommender.build_interaction_matrix(user_ids, cocktail_ids, weights)
+            for item, similar, scores in recommender.top_k_similar(matrix, top_k):
+                source_id = int(cocktails[item])
+                rows.extend(
+                    {"cocktail_id": source_id, "similar_cocktail_id": int(target_id), "score": float(score),
+                     "rebuilt_ts": started}
+                    for target_id, score in zip(cocktails[similar], scores)
+                )
+
+        # Obliczenia poza transakcją zapisu - blokada bazy tylko na podmianę tabeli
+        def work() -> bool:
+            # Inny worker zdążył zapisać przebudowę rozpoczętą nie wcześniej niż nasza
+            last_rebuilt = self.last_rebuilt(db)
+            if max_age is not None and last_rebuilt is not None and last_rebuilt >= started:
+                return False
+            db.execute(delete(CocktailSimilarity))
+            if rows:
+                db.execute(insert(CocktailSimilarity), rows)
+            return True
+
+        if not run_write_transaction(db, work, name="recommendation.rebuild"):
+            return None
+        return len(rows)
+
+recommendation = CRUDRecommendation()
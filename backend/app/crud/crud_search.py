@@ -0,0 +1,19 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.trigram import cocktail_name_index, ingredient_name_index
+from app.models.cocktail import Cocktail
+from app.models.ingredient import Ingredient
+
+class CRUDSearch:
+    """Ładowanie indeksów trigramów (app/trigram.py) z bazy."""
+
+    def load(self, db: Session) -> None:
+        cocktail_name_index.build(db.execute(select(Cocktail.id, Cocktail.name)).tuples())
+        ingredient_name_index.build(db.execute(select(Ingredient.id, Ingredient.name)).tuples())
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not cocktail_name_index.loaded or not ingredient_name_index.loaded:
+            self.load(db)
+
+search = CRUDSearch()
@@ -0,0 +1,58 @@
+from typing import List, Optional, Sequence
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.suggest import suggest_index, KINDS
+from app.models.cocktail import Cocktail, cocktail_ingredient_association, cocktail_tag_association
+from app.models.ingredient import Ingredient
+from app.models.tag import Tag
+from app.schemas.suggest import Suggestion
+
+class CRUDSuggest:
+    def load(self, db: Session) -> None:
+        """
+        Buduje indeks podpowiedzi z bazy. Popularność składnika/tagu to liczba koktajli,
+        które go używają; popularność koktajlu to suma ulubionych i ocen.
+        Indeksowane są tylko publiczne koktajle.
+        """
+        ingredient_usage = (
+            select(cocktail_ingredient_association.c.ingredient_id, func.count().label('usage'))
+            .group_by(cocktail_ingredient_association.c.ingredient_id)
+            .subquery()
+        )
+        suggest_index.build("ingredient", db.execute(
+            select(Ingredient.id, Ingredient.name, func.coalesce(ingredient_usage.c.usage, 0))
+            .outerjoin(ingredient_usage, ingredient_usage.c.ingredient_id == Ingredient.id)
+        ).all())
+
+        tag_usage = (
+            select(cocktail_tag_association.c.tag_id, func.count().label('usage'))
+            .group_by(cocktail_tag_association.c.tag_id)
+            .subquery()
+        )
+        suggest_index.build("tag", db.execute(
+            select(Tag.id, Tag.name, func.coalesce(tag_usage.c.usage, 0))
+            .outerjoin(tag_usage, tag_usage.c.tag_id == Tag.id)
+        ).all())
+
+        suggest_index.build("cocktail", db.execute(
+            select(Cocktail.id, Cocktail.name, Cocktail.favorites_count + Cocktail.ratings_count)
+            .where(Cocktail.is_public == True)
+        ).all())
+        suggest_index.loaded = True
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not suggest_index.loaded:
+            self.load(db)
+
+    def suggest(
+        self, db: Session, prefix: str, kinds: Optional[Sequence[str]] = None, limit: int = 10
+    ) -> List[Suggestion]:
+        self.ensure_loaded(db)
+        return [
+            Suggestion(kind=kind, id=item_id, name=name, popularity=popularity)
+            for kind, item_id, name, popularity in suggest_index.suggest(prefix, kinds or KINDS, limit)
+        ]
+
+suggest = CRUDSuggest()
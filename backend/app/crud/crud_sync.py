@@ -0,0 +1,108 @@
+from typing import Dict, List
+
+from sqlalchemy import select, bindparam
+from sqlalchemy.orm import Session
+
+from app.models.cocktail import Cocktail
+from app.models.ingredient import Ingredient
+from app.models.tag import Tag
+from app.db.statement_cache import statements
+from app.crud.crud_change_log import change_log, COCKTAIL, COCKTAIL_STATS, TAG, INGREDIENT, DELETE
+from app.crud.crud_cocktail import cocktail as crud_cocktail, average_rating_value
+from app.schemas.cocktail import CocktailView, CocktailStats
+from app.schemas.sync import (
+    SyncResponse, SyncCocktail, SyncCocktailIngredient, SyncNamedItem, SyncDeleted
+)
+
+class CRUDSync:
+    """
+    Delta katalogu dla repliki klienta (GET /sync).
+
+    Dziennik przechowuje tylko identyfikatory zmienionych encji, a odpowiedź zawiera ich
+    aktualny stan - kilka zmian tej samej encji daje jeden wpis. Koktajle, które zniknęły
+    lub przestały być publiczne, trafiają do deleted.cocktails (replika obejmuje tylko
+    publiczny katalog). Zmiana samych liczników trafia do cocktail_stats zamiast całego koktajlu.
+    """
+
+    def _public_cocktails(self, db: Session, cocktail_ids: List[int]) -> List[SyncCocktail]:
+        if not cocktail_ids:
+            return []
+        stmt = statements.get("sync.cocktails", lambda: (
+            crud_cocktail._visible_to(crud_cocktail._listing_query(CocktailView.FULL), with_viewer=False)
+            .where(Cocktail.id.in_(bindparam("cocktail_ids", expanding=True)))
+            .order_by(Cocktail.id)
+        ))
+        rows = db.execute(stmt, {"cocktail_ids": cocktail_ids}).all()
+        found_ids = [row.id for row in rows]
+        tags_by_cocktail = crud_cocktail._get_tags_for_cocktails(db, found_ids)
+        ingredients_by_cocktail = crud_cocktail._get_ingredients_for_cocktails(db, found_ids)
+        return [
+            SyncCocktail(
+                id=row.id,
+                name=row.name,
+                description=row.description,
+                instructions=row.instructions,
+                image_url=str(row.image_url) if row.image_url else None,
+                user_id=row.user_id,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                tag_ids=[tag.id for tag in tags_by_cocktail[row.id]],
+                ingredients=[
+                    SyncCocktailIngredient(id=ingredient.id, amount=ingredient.amount, unit=ingredient.unit)
+                    for ingredient in ingredients_by_cocktail[row.id]
+                ],
+                average_rating=average_rating_value(row.avg_rating),
+                ratings_count=int(row.ratings_count or 0),
+                favorites_count=row.favorites_count or 0
+            )
+            for row in rows
+        ]
+
+    def _public_cocktail_stats(self, db: Session, cocktail_ids: List[int]) -> List[CocktailStats]:
+        return [
+            crud_cocktail.stats_from_row(row)
+            for row in crud_cocktail.get_stats_rows(db, cocktail_ids) if row.is_public
+        ]
+
+    def _named(self, db: Session, model, ids: List[int]) -> List[SyncNamedItem]:
+        if not ids:
+            return []
+        rows = db.execute(select(model.id, model.name).where(model.id.in_(ids)).order_by(model.id)).all()
+        return [SyncNamedItem(id=row.id, name=row.name) for row in rows]
+
+    def get_changes(self, db: Session, since: int, limit: int) -> SyncResponse:
+        changes, next_since, has_more = change_log.get_since(db, since, limit)
+        ids: Dict[str, List[int]] = {COCKTAIL: [], COCKTAIL_STATS: [], TAG: [], INGREDIENT: []}
+        deleted: Dict[str, List[int]] = {COCKTAIL: [], TAG: [], INGREDIENT: []}
+        for (entity, entity_id), op in changes.items():
+            if op == DELETE:
+                deleted[entity].append(entity_id)
+            else:
+                ids[entity].append(entity_id)
+
+        # Pełny wpis koktajlu zawiera już liczniki, a usuniętego nie trzeba aktualizować
+        cocktail_ids = ids[COCKTAIL]
+        skip_stats = set(cocktail_ids) | set(deleted[COCKTAIL])
+        cocktails = self._public_cocktails(db, cocktail_ids)
+        # Koktajl niewidoczny (usunięty w międzyczasie lub prywatny) - replika ma go usunąć
+        hidden = set(cocktail_ids) - {item.id for item in cocktails}
+        cocktail_stats = self._public_cocktail_stats(db, [i for i in ids[COCKTAIL_STATS] if i not in skip_stats])
+
+        tags = self._named(db, Tag, ids[TAG])
+        ingredients = self._named(db, Ingredient, ids[INGREDIENT])
+        return SyncResponse(
+            since=since,
+            next_since=next_since,
+            has_more=has_more,
+            cocktails=cocktails,
+            cocktail_stats=cocktail_stats,
+            tags=tags,
+            ingredients=ingredients,
+            deleted=SyncDeleted(
+                cocktails=sorted(set(deleted[COCKTAIL]) | hidden),
+                tags=sorted(set(deleted[TAG]) | (set(ids[TAG]) - {item.id for item in tags})),
+                ingredients=sorted(set(deleted[INGREDIENT]) | (set(ids[INGREDIENT]) - {item.id for item in ingredients}))
+            )
+        )
+
+sync = CRUDSync()
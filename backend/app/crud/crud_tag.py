@@ -2,6 +2,10 @@ from typing import Optional, List
 from sqlalchemy.orm import Session
 
 from app.models.tag import Tag
+from app.suggest import suggest_index
+from app.reference_data import reference_data
+from app.http_cache import purge_keys, TAG_LIST_KEY
+from app.crud.crud_change_log import change_log, TAG, DELETE
 from app.schemas.tag import TagCreate, TagUpdate
 
 class CRUDTag:
@@ -17,16 +21,25 @@ class CRUDTag:
     def create_tag(self, db: Session, tag_in: TagCreate) -> Tag:
         db_tag = Tag(name=tag_in.name)
         db.add(db_tag)
+        db.flush()
+        change_log.record(db, TAG, [db_tag.id])
         db.commit()
         db.refresh(db_tag)
+        suggest_index.upsert("tag", db_tag.id, db_tag.name)
+        reference_data.refresh(db)
+        purge_keys(TAG_LIST_KEY)
         return db_tag
 
     def update_tag(self, db: Session, db_tag: Tag, tag_in: TagUpdate) -> Tag:
         if tag_in.name is not None:
             db_tag.name = tag_in.name
         db.add(db_tag)
+        change_log.record(db, TAG, [db_tag.id])
         db.commit()
         db.refresh(db_tag)
+        suggest_index.upsert("tag", db_tag.id, db_tag.name)
+        reference_data.refresh(db)
+        purge_keys(TAG_LIST_KEY)
         return db_tag
 
     def delete_tag(self, db: Session, tag_id: int) -> Optional[Tag]:
@@ -36,7 +49,11 @@ class CRUDTag:
             # w cocktail_tags uniemożliwi usunięcie, jeśli tag jest używany.
             try:
                 db.delete(db_tag)
+                change_log.record(db, TAG, [tag_id], DELETE)
                 db.commit()
+                suggest_index.remove("tag", tag_id)
+                reference_data.refresh(db)
+                purge_keys(TAG_LIST_KEY)
                 return db_tag
             except Exception as e:
                 db.rollback()
@@ -0,0 +1,110 @@
+import math
+import time
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.transaction import run_write_transaction
+from app.db.upsert import dialect_insert
+from app.models.cocktail import Cocktail
+from app.models.trending import TrendingState
+
+class CRUDTrending:
+    """
+    Przyrostowo utrzymywany ranking "trending".
+
+    Wynik koktajlu to suma wag zdarzeń (ocen, dodań do ulubionych) wygaszanych
+    wykładniczo z okresem połowicznego zaniku TRENDING_HALF_LIFE_HOURS.
+    Zamiast wygaszać wszystkie wyniki przy każdym odczycie, zdarzenia są dodawane
+    w skali wspólnego momentu odniesienia (TrendingState.epoch_ts), dzięki czemu
+    Cocktail.trending_score można sortować bezpośrednio po indeksie.
+    """
+
+    _state_id = 1
+    # Maksymalny wykładnik przy dodawaniu zdarzenia (e^50 ~ 5e21) - powyżej wyniki są najpierw
+    # przeskalowywane do bieżącej chwili, zamiast ryzykować przepełnienie exp() i floatów w bazie
+    _max_exponent = 50.0
+
+    def _decay_rate(self) -> float:
+        return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+    def get_state(self, db: Session) -> TrendingState:
+        state = db.get(TrendingState, self._state_id)
+        if state is None:
+            # Pierwszy zapis mogą robić równolegle dwa workery - INSERT ... ON CONFLICT DO NOTHING
+            # i odczyt wiersza, który wygrał
+            db.execute(
+                dialect_insert(db, TrendingState)
+                .values(id=self._state_id, epoch_ts=time.time())
+                .on_conflict_do_nothing(index_elements=["id"])
+            )
+            state = db.get(TrendingState, self._state_id)
+        return state
+
+    def record_event(self, db: Session, cocktail_id: int, weight: float, now: Optional[float] = None) -> None:
+        """Dodaje zdarzenie do wyniku koktajlu (bez commit - w transakcji zapisu oceny/ulubionego)."""
+        now = now if now is not None else time.time()
+        state = self.get_state(db)
+        exponent = self._decay_rate() * (now - state.epoch_ts)
+        if exponent > self._max_exponent:
+            # Długo bez renormalize (np. zatrzymane zadanie w tle) - przeskalowanie w tej transakcji
+            self._rescale(db, state, now)
+            exponent = 0.0
+        increment = weight * math.exp(exponent)
+        db.execute(
+            update(Cocktail)
+            .where(Cocktail.id == cocktail_id)
+            .values(
+                trending_score=Cocktail.trending_score + increment,
+                updated_at=Cocktail.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def record_rating(self, db: Session, cocktail_id: int) -> None:
+        self.record_event(db, cocktail_id, settings.TRENDING_RATING_WEIGHT)
+
+    def record_favorite(self, db: Session, cocktail_id: int) -> None:
+        self.record_event(db, cocktail_id, settings.TRENDING_FAVORITE_WEIGHT)
+
+    def renormalize(self, db: Session, now: Optional[float] = None) -> float:
+        """
+        Przesuwa moment odniesienia na `now` i przeskalowuje wszystkie wyniki.
+
+        Bez tego wartości rosłyby wykładniczo z czasem. Wyniki, które wygasły poniżej
+        TRENDING_MIN_SCORE, są zerowane. Zwraca zastosowany współczynnik.
+
+        Odczyt epoch_ts i przeskalowanie w jednej transakcji zapisu (BEGIN IMMEDIATE, ponawianej
+        przy blokadzie) - ocena zapisana w międzyczasie nie trafi do wyników w starej skali.
+        """
+        now = now if now is not None else time.time()
+
+        def work() -> float:
+            return self._rescale(db, self.get_state(db), now)
+
+        return run_write_transaction(db, work, name="trending.renormalize")
+
+    def _rescale(self, db: Session, state: TrendingState, now: float) -> float:
+        """Przeskalowuje wyniki do momentu now i przesuwa epoch_ts (bez commit). Zwraca współczynnik."""
+        factor = math.exp(-self._decay_rate() * (now - state.epoch_ts))
+        db.execute(
+            update(Cocktail)
+            .where(Cocktail.trending_score > 0)
+            .values(
+                trending_score=Cocktail.trending_score * factor,
+                updated_at=Cocktail.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(Cocktail)
+            .where(Cocktail.trending_score > 0, Cocktail.trending_score < settings.TRENDING_MIN_SCORE)
+            .values(trending_score=0.0, updated_at=Cocktail.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        state.epoch_ts = now
+        return factor
+
+trending = CRUDTrending()
@@ -1,19 +1,58 @@
-from typing import Optional, List
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, List
+from sqlalchemy import select, update, delete, func, bindparam
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
+from app.db.statement_cache import statements
+from app.db.transaction import run_write_transaction
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.models.cocktail import Cocktail
+from app.models.rating import Rating
+from app.models.favorite import Favorite
+from app.schemas.user import UserCreate, UserUpdate, UserBrief
+from app.http_cache import purge_keys, user_key
+from app.profile_cache import profile_cache
+from app.crud.crud_cocktail import cocktail as crud_cocktail
+from app.crud.crud_change_log import change_log, COCKTAIL, DELETE
+from app.crud.crud_user_stats import user_stats
 
 class CRUDUser:
+    # Wyszukiwania po kluczu wykonywane przy każdym żądaniu (m.in. uwierzytelnianie) - gotowe
+    # instrukcje z parametrem (app/db/statement_cache.py) zamiast budowania Query za każdym razem
+    def _get_by(self, db: Session, column, value) -> Optional[User]:
+        stmt = statements.get(("user.get_by", column.key), lambda: select(User).where(column == bindparam("value")))
+        return db.scalars(stmt, {"value": value}).first()
+
     def get_user(self, db: Session, user_id: int) -> Optional[User]:
-        return db.query(User).filter(User.id == user_id).first()
+        return self._get_by(db, User.id, user_id)
 
     def get_user_by_email(self, db: Session, email: str) -> Optional[User]:
-        return db.query(User).filter(User.email == email).first()
+        return self._get_by(db, User.email, email)
 
     def get_user_by_username(self, db: Session, username: str) -> Optional[User]:
-        return db.query(User).filter(User.username == username).first()
+        return self._get_by(db, User.username, username)
+
+    def get_user_briefs(self, db: Session, user_ids: Iterable[int]) -> Dict[int, UserBrief]:
+        """
+        Skrócone profile wielu użytkowników: z cache (app/profile_cache.py), brakujące jednym
+        zapytaniem. Konta usunięte lub oczekujące na usunięcie nie mają profilu.
+        """
+        profiles, missing, generation = profile_cache.get_many(set(user_ids))
+        if missing:
+            stmt = statements.get("user.briefs", lambda: (
+                select(User.id, User.username, User.avatar_url)
+                .where(User.id.in_(bindparam("user_ids", expanding=True)), User.deleted_at.is_(None))
+            ))
+            loaded = {
+                row.id: UserBrief(id=row.id, username=row.username, avatar_url=row.avatar_url)
+                for row in db.execute(stmt, {"user_ids": missing}).all()
+            }
+            # Pomija profile unieważnione w trakcie odczytu (zmiana lub usunięcie konta)
+            profile_cache.put_many(loaded, generation)
+            profiles.update(loaded)
+        return profiles
 
     def get_users(self, db: Session, skip: int = 0, limit: int = 100) -> List[User]:
         return db.query(User).offset(skip).limit(limit).all()
@@ -45,14 +84,131 @@ class CRUDUser:
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
+        self._forget_profile(db_user.id)
         return db_user
 
+    def _forget_profile(self, user_id: int) -> None:
+        """Po commit zmiany lub usunięcia konta: cache skróconych profili i GET /users/{id}/profile w proxy."""
+        profile_cache.invalidate(user_id)
+        purge_keys(user_key(user_id))
+
     def authenticate(self, db: Session, *, username: str, password: str) -> Optional[User]:
         user = self.get_user_by_username(db, username=username)
         if not user:
             return None
         if not verify_password(password, user.hashed_password):
             return None
+        if user.deleted_at is not None:
+            return None
         return user
 
+    def _history_size(self, db: Session, user_id: int) -> int:
+        return sum(
+            db.scalar(select(func.count()).select_from(model).where(model.user_id == user_id))
+            for model in (Cocktail, Rating, Favorite)
+        )
+
+    def delete_user(self, db: Session, db_user: User) -> bool:
+        """
+        Usuwa konto. Przy małej historii od razu (zwraca True). Przy dużej tylko oznacza konto
+        jako usunięte i ukrywa jego koktajle (zwraca False) - resztę robi purge_user w tle,
+        więc czas odpowiedzi nie zależy od liczby ocen i ulubionych użytkownika.
+        """
+        user_id = db_user.id
+        if self._history_size(db, user_id) <= settings.USER_PURGE_SYNC_LIMIT:
+            self.purge_user(db, user_id)
+            self._forget_profile(user_id)
+            return True
+
+        def work() -> List[int]:
+            db.execute(
+                update(User).where(User.id == user_id).values(deleted_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            hidden_ids = list(db.scalars(
+                update(Cocktail)
+                .where(Cocktail.user_id == user_id, Cocktail.is_public == True)
+                .values(is_public=False, updated_at=Cocktail.updated_at)
+                .returning(Cocktail.id)
+                .execution_options(synchronize_session=False)
+            ))
+            # Ukryte koktajle znikają z replik klientów (GET /sync zwraca je w deleted)
+            change_log.record(db, COCKTAIL, hidden_ids)
+            user_stats.record_visibility(db, hidden_ids, is_public=False)
+            return hidden_ids
+
+        hidden_ids = run_write_transaction(db, work, name="user.mark_deleted")
+        crud_cocktail.forget_cocktails(hidden_ids)
+        self._forget_profile(user_id)
+        return False
+
+    def _purge_ratings_batch(self, db: Session, user_id: int) -> int:
+        rating_ids = list(db.scalars(
+            select(Rating.id).where(Rating.user_id == user_id).limit(settings.USER_PURGE_BATCH_SIZE)
+        ))
+        if rating_ids:
+            # Oceny na cudzych koktajlach - liczniki trzeba skorygować przed usunięciem
+            star_deltas = defaultdict(dict)
+            for cocktail_id, rating_value, count in db.execute(
+                select(Rating.cocktail_id, Rating.rating_value, func.count())
+                .where(Rating.id.in_(rating_ids))
+                .group_by(Rating.cocktail_id, Rating.rating_value)
+            ):
+                star_deltas[cocktail_id][rating_value] = -count
+            for cocktail_id, deltas in star_deltas.items():
+                crud_cocktail.update_rating_stats(db, cocktail_id, deltas)
+            db.execute(delete(Rating).where(Rating.id.in_(rating_ids)))
+        return len(rating_ids)
+
+    def _purge_favorites_batch(self, db: Session, user_id: int) -> int:
+        favorite_ids = list(db.scalars(
+            select(Favorite.id).where(Favorite.user_id == user_id).limit(settings.USER_PURGE_BATCH_SIZE)
+        ))
+        if favorite_ids:
+            per_cocktail = db.execute(
+                select(Favorite.cocktail_id, func.count())
+                .where(Favorite.id.in_(favorite_ids))
+                .group_by(Favorite.cocktail_id)
+            ).all()
+            for cocktail_id, count in per_cocktail:
+                crud_cocktail.update_favorites_count(db, cocktail_id, delta=-count)
+            db.execute(delete(Favorite).where(Favorite.id.in_(favorite_ids)))
+        return len(favorite_ids)
+
+    def _purge_cocktails_batch(self, db: Session, user_id: int) -> List[int]:
+        cocktail_ids = list(db.scalars(
+            select(Cocktail.id).where(Cocktail.user_id == user_id).limit(settings.USER_PURGE_BATCH_SIZE)
+        ))
+        if cocktail_ids:
+            # Oceny, ulubione i powiązania tych koktajli usuwa baza (ON DELETE CASCADE) - liczniki
+            # oceniających i dodających do ulubionych trzeba skorygować przed usunięciem
+            user_stats.forget_cocktails(db, cocktail_ids)
+            db.execute(delete(Cocktail).where(Cocktail.id.in_(cocktail_ids)))
+            change_log.record(db, COCKTAIL, cocktail_ids, DELETE)
+        return cocktail_ids
+
+    def purge_user(self, db: Session, user_id: int) -> None:
+        """
+        Usuwa użytkownika wraz z historią, partiami po USER_PURGE_BATCH_SIZE wierszy
+        (każda partia w osobnej, krótkiej transakcji). Można wznowić po przerwaniu.
+        """
+        for purge_batch in (self._purge_ratings_batch, self._purge_favorites_batch):
+            while True:
+                deleted = run_write_transaction(db, lambda: purge_batch(db, user_id), name="user.purge")
+                if deleted < settings.USER_PURGE_BATCH_SIZE:
+                    break
+        while True:
+            cocktail_ids = run_write_transaction(db, lambda: self._purge_cocktails_batch(db, user_id), name="user.purge")
+            crud_cocktail.forget_cocktails(cocktail_ids)
+            if len(cocktail_ids) < settings.USER_PURGE_BATCH_SIZE:
+                break
+        run_write_transaction(
+            db,
+            lambda: db.execute(delete(User).where(User.id == user_id).execution_options(synchronize_session=False)),
+            name="user.purge"
+        )
+
+    def get_users_pending_purge(self, db: Session) -> List[int]:
+        return list(db.scalars(select(User.id).where(User.deleted_at.is_not(None))))
+
 user = CRUDUser()
\ No newline at end of file
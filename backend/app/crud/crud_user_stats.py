@@ -0,0 +1,221 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.db.statement_cache import statements
+from app.db.transaction import run_write_transaction
+from app.db.upsert import dialect_insert
+from app.models.cocktail import Cocktail
+from app.models.favorite import Favorite
+from app.models.rating import Rating
+from app.models.user import User
+from app.models.user_stats import UserStats
+from app.schemas.profile import UserProfileStats
+
+class CRUDUserStats:
+    """
+    Statystyki profilu użytkownika (tabela user_stats) utrzymywane przyrostowo.
+
+    Metody zmieniające liczniki nie robią commit - wywoływane są w transakcji zapisu koktajlu,
+    oceny lub ulubionego, więc liczniki zmieniają się razem z danymi. Wiersz statystyk
+    usuwanego użytkownika znika razem z kontem (ON DELETE CASCADE).
+    """
+
+    def get(self, db: Session, user_id: int) -> Optional[UserStats]:
+        stmt = statements.get("user_stats.get", lambda: select(UserStats).where(UserStats.user_id == bindparam("user_id")))
+        return db.scalars(stmt, {"user_id": user_id}).first()
+
+    def get_profile_stats(self, db: Session, user_id: int, include_private: bool) -> UserProfileStats:
+        """
+        Statystyki do profilu; include_private - liczniki koktajli i otrzymanych ocen łącznie
+        z prywatnymi koktajlami (profil własny), inaczej tylko z publicznych.
+        """
+        row = self.get(db, user_id)
+        if row is None:
+            return UserProfileStats()
+        if include_private:
+            received_count, received_sum = row.received_ratings_count, row.received_ratings_sum
+        else:
+            received_count, received_sum = row.public_received_ratings_count, row.public_received_ratings_sum
+        return UserProfileStats(
+            cocktails_count=row.cocktails_count if include_private else row.public_cocktails_count,
+            ratings_count=row.ratings_count,
+            favorites_count=row.favorites_count,
+            received_ratings_count=received_count,
+            # Zaokrąglenie połówkami w górę jak w CRUDCocktail._average_rating_expr
+            average_rating_received=(
+                ((received_sum * 200 + received_count) // (received_count * 2)) / 100 if received_count else None
+            )
+        )
+
+    def update(self, db: Session, user_id: int, **deltas: int) -> None:
+        """
+        Zmienia liczniki użytkownika o podane wartości, np. update(db, 7, ratings_count=1).
+        INSERT ... ON CONFLICT DO UPDATE - wiersz powstaje przy pierwszej zmianie.
+        """
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        stmt = (
+            dialect_insert(db, UserStats)
+            .values(user_id=user_id, **{name: max(delta, 0) for name, delta in deltas.items()})
+            .on_conflict_do_update(
+                index_elements=["user_id"],
+                set_={name: getattr(UserStats, name) + delta for name, delta in deltas.items()}
+            )
+        )
+        db.execute(stmt)
+
+    def update_many(self, db: Session, deltas_by_user: Dict[int, Dict[str, int]]) -> None:
+        for user_id, deltas in deltas_by_user.items():
+            self.update(db, user_id, **deltas)
+
+    def record_received(self, db: Session, cocktail_id: int, count_delta: int, sum_delta: int) -> None:
+        """Zmiana ocen otrzymanych przez autora koktajlu (wywoływane z CRUDCocktail.update_rating_stats)."""
+        if not count_delta and not sum_delta:
+            return
+        author_id = select(Cocktail.user_id).where(Cocktail.id == cocktail_id).scalar_subquery()
+        is_public = select(Cocktail.is_public).where(Cocktail.id == cocktail_id).scalar_subquery()
+        db.execute(
+            update(UserStats)
+            .where(UserStats.user_id == author_id)
+            .values(
+                received_ratings_count=UserStats.received_ratings_count + count_delta,
+                received_ratings_sum=UserStats.received_ratings_sum + sum_delta,
+                public_received_ratings_count=UserStats.public_received_ratings_count
+                    + case((is_public == True, count_delta), else_=0),
+                public_received_ratings_sum=UserStats.public_received_ratings_sum
+                    + case((is_public == True, sum_delta), else_=0)
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def record_visibility(self, db: Session, cocktail_ids: List[int], is_public: bool) -> None:
+        """
+        Koktajle stały się publiczne (is_public=True) lub prywatne: przenosi je razem z otrzymanymi
+        ocenami do liczników publicznych autora albo z nich usuwa. Wywoływane w transakcji zmiany.
+        """
+        if not cocktail_ids:
+            return
+        sign = 1 if is_public else -1
+        authored = db.execute(
+            select(
+                Cocktail.user_id,
+                func.count().label("cocktails"),
+                func.sum(Cocktail.ratings_count).label("ratings"),
+                func.sum(Cocktail.ratings_sum).label("ratings_sum")
+            )
+            .where(Cocktail.id.in_(cocktail_ids))
+            .group_by(Cocktail.user_id)
+        ).all()
+        for row in authored:
+            self.update(
+                db, row.user_id,
+                public_cocktails_count=sign * row.cocktails,
+                public_received_ratings_count=sign * (row.ratings or 0),
+                public_received_ratings_sum=sign * (row.ratings_sum or 0)
+            )
+
+    def forget_cocktails(self, db: Session, cocktail_ids: List[int]) -> None:
+        """
+        Koryguje liczniki przed usunięciem koktajli: autorom (koktajle i otrzymane oceny) oraz
+        użytkownikom, których oceny i ulubione tych koktajli usunie baza (ON DELETE CASCADE).
+        """
+        if not cocktail_ids:
+            return
+        for model, column in ((Rating, UserStats.ratings_count), (Favorite, UserStats.favorites_count)):
+            # Jedna instrukcja na tabelę niezależnie od liczby oceniających (podzapytanie skorelowane)
+            per_user = (
+                select(func.count())
+                .where(model.user_id == UserStats.user_id, model.cocktail_id.in_(cocktail_ids))
+                .scalar_subquery()
+            )
+            db.execute(
+                update(UserStats)
+                .where(UserStats.user_id.in_(select(model.user_id).where(model.cocktail_id.in_(cocktail_ids))))
+                .values({column.key: column - per_user})
+                .execution_options(synchronize_session=False)
+            )
+        authored = db.execute(
+            select(
+                Cocktail.user_id,
+                func.count().label("cocktails"),
+                func.sum(case((Cocktail.is_public == True, 1), else_=0)).label("public_cocktails"),
+                func.sum(Cocktail.ratings_count).label("ratings"),
+                func.sum(Cocktail.ratings_sum).label("ratings_sum"),
+                func.sum(case((Cocktail.is_public == True, Cocktail.ratings_count), else_=0)).label("public_ratings"),
+                func.sum(case((Cocktail.is_public == True, Cocktail.ratings_sum), else_=0)).label("public_ratings_sum")
+            )
+            .where(Cocktail.id.in_(cocktail_ids))
+            .group_by(Cocktail.user_id)
+        ).all()
+        for row in authored:
+            self.update(
+                db, row.user_id,
+                cocktails_count=-row.cocktails,
+                public_cocktails_count=-(row.public_cocktails or 0),
+                received_ratings_count=-(row.ratings or 0),
+                received_ratings_sum=-(row.ratings_sum or 0),
+                public_received_ratings_count=-(row.public_ratings or 0),
+                public_received_ratings_sum=-(row.public_ratings_sum or 0)
+            )
+
+    def _computed_columns(self) -> Dict[str, Any]:
+        """Statystyki wszystkich użytkowników liczone z tabel źródłowych (kolumna user_stats -> wyrażenie)."""
+        def count_of(model, *conditions):
+            return (
+                select(func.count()).select_from(model)
+                .where(model.user_id == User.id, *conditions)
+                .scalar_subquery()
+            )
+
+        def authored_sum(column, *conditions):
+            return (
+                select(func.coalesce(func.sum(column), 0))
+                .where(Cocktail.user_id == User.id, *conditions)
+                .scalar_subquery()
+            )
+
+        return {
+            "user_id": User.id,
+            "cocktails_count": count_of(Cocktail),
+            "public_cocktails_count": count_of(Cocktail, Cocktail.is_public == True),
+            "ratings_count": count_of(Rating),
+            "favorites_count": count_of(Favorite),
+            "received_ratings_count": authored_sum(Cocktail.ratings_count),
+            "received_ratings_sum": authored_sum(Cocktail.ratings_sum),
+            "public_received_ratings_count": authored_sum(Cocktail.ratings_count, Cocktail.is_public == True),
+            "public_received_ratings_sum": authored_sum(Cocktail.ratings_sum, Cocktail.is_public == True),
+        }
+
+    def find_stale(self, db: Session) -> List[int]:
+        """Id użytkowników, których zapisane statystyki różnią się od przeliczonych (bez zapisu)."""
+        columns = self._computed_columns()
+        names = [name for name in columns if name != "user_id"]
+        expected = {row.user_id: tuple(getattr(row, name) for name in names) for row in db.execute(
+            select(*(expression.label(name) for name, expression in columns.items()))
+        )}
+        stored = {row.user_id: tuple(getattr(row, name) for name in names) for row in db.scalars(select(UserStats))}
+        # Brak wiersza oznacza same zera (użytkownik bez aktywności)
+        zeros = (0,) * len(names)
+        return sorted(
+            user_id for user_id in expected.keys() | stored.keys()
+            if expected.get(user_id, zeros) != stored.get(user_id, zeros)
+        )
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Przelicza statystyki wszystkich użytkowników od zera (jedna transakcja).
+        Zwraca liczbę wierszy; używane przez scripts/rebuild_user_stats.py.
+        """
+        columns = self._computed_columns()
+
+        def work() -> int:
+            db.execute(delete(UserStats))
+            db.execute(insert(UserStats).from_select(list(columns), select(*columns.values())))
+            return db.scalar(select(func.count()).select_from(UserStats))
+
+        return run_write_transaction(db, work, name="user_stats.rebuild")
+
+user_stats = CRUDUserStats()
@@ -0,0 +1,189 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.transaction import end_read_transaction, run_write_transaction
+from app.db.upsert import dialect_insert
+from app.http_cache import purge_keys, cocktail_ratings_key
+from app.live_events import live_events
+from app.models.cocktail import Cocktail
+from app.models.favorite import Favorite
+from app.models.rating import Rating
+from app.models.user import User
+from app.schemas.rating import RatingCreate
+from app.write_behind import write_behind_buffer, RATING_CREATE, FAVORITE_SET
+from app.crud.crud_cocktail import cocktail as crud_cocktail
+from app.crud.crud_favorite import favorite as crud_favorite
+from app.crud.crud_rating import rating as crud_rating
+from app.crud.crud_trending import trending as crud_trending
+from app.crud.crud_user_stats import user_stats
+
+class CRUDWriteBehind:
+    """
+    Zapis ocen i ulubionych w trybie write-behind (app/write_behind.py).
+
+    enqueue_* sprawdzają stan (baza + oczekujące zdarzenia tego użytkownika) i dopisują
+    zdarzenie do logu; flush() zapisuje partię w jednej transakcji, aktualizując liczniki
+    koktajli raz na koktajl. Odczyty stanu użytkownika wołają flush_for_user(), żeby
+    użytkownik zawsze widział własne zapisy.
+    """
+
+    def enqueue_rating(self, db: Session, rating_in: RatingCreate, user_id: int) -> Dict[str, Any]:
+        def already_rated() -> bool:
+            # Każde sprawdzenie w nowej transakcji odczytu - musi widzieć oceny zapisane przez
+            # flush, który zakończył się po rozpoczęciu poprzedniej
+            end_read_transaction(db)
+            return crud_rating.get_rating_by_user_and_cocktail(
+                db, user_id=user_id, cocktail_id=rating_in.cocktail_id
+            ) is not None
+
+        event = write_behind_buffer.enqueue_rating_once(
+            user_id, rating_in.cocktail_id, already_rated,
+            rating_value=rating_in.rating_value,
+            comment=rating_in.comment
+        )
+        if event is None:
+            raise ValueError("User has already rated this cocktail.")
+        return event
+
+    def is_favorite(self, db: Session, user_id: int, cocktail_id: int) -> bool:
+        pending_state = write_behind_buffer.pending_favorite_state(user_id, cocktail_id)
+        if pending_state is not None:
+            return pending_state
+        return crud_favorite.get_favorite(db, user_id, cocktail_id) is not None
+
+    def enqueue_favorite(self, db: Session, user_id: int, cocktail_id: int, is_favorite: bool) -> bool:
+        """Ustawia stan ulubionego. Zwraca False, jeśli już był taki (nic nie dopisano)."""
+        if self.is_favorite(db, user_id, cocktail_id) == is_favorite:
+            return False
+        write_behind_buffer.enqueue(FAVORITE_SET, user_id=user_id, cocktail_id=cocktail_id, is_favorite=is_favorite)
+        return True
+
+    def toggle_favorite(self, db: Session, user_id: int, cocktail_id: int) -> bool:
+        is_favorite = not self.is_favorite(db, user_id, cocktail_id)
+        write_behind_buffer.enqueue(FAVORITE_SET, user_id=user_id, cocktail_id=cocktail_id, is_favorite=is_favorite)
+        return is_favorite
+
+    def apply_batch(self, db: Session, events: List[Dict[str, Any]]) -> None:
+        """
+        Zapisuje partię zdarzeń (bez commit). Idempotentne: oceny wstawiane z ON CONFLICT DO NOTHING,
+        ulubione ustawiane na stan z ostatniego zdarzenia, a liczniki zmieniane tylko o wiersze
+        faktycznie wstawione/usunięte - ponowne odtworzenie logu po awarii nic nie podwaja.
+        """
+        existing_cocktails = set(db.scalars(
+            select(Cocktail.id).where(Cocktail.id.in_({event["cocktail_id"] for event in events}))
+        ))
+        active_users = set(db.scalars(
+            select(User.id).where(User.id.in_({event["user_id"] for event in events}), User.deleted_at.is_(None))
+        ))
+        rating_rows = []
+        favorite_states = {}
+        for event in events:
+            if event["cocktail_id"] not in existing_cocktails or event["user_id"] not in active_users:
+                continue  # Koktajl lub konto usunięte, zanim zdarzenie trafiło do bazy
+            if event["kind"] == RATING_CREATE:
+                rating_rows.append({
+                    "user_id": event["user_id"],
+                    "cocktail_id": event["cocktail_id"],
+                    "rating_value": event["rating_value"],
+                    "comment": event.get("comment"),
+                    "created_at": datetime.fromtimestamp(event["ts"], timezone.utc),
+                })
+            elif event["kind"] == FAVORITE_SET:
+                favorite_states[(event["user_id"], event["cocktail_id"])] = event["is_favorite"]
+
+        ratings_delta = defaultdict(lambda: defaultdict(int))
+        favorites_delta = defaultdict(int)
+        favorites_added = defaultdict(int)
+        user_deltas = defaultdict(lambda: defaultdict(int))
+        if rating_rows:
+            inserted = db.execute(
+                dialect_insert(db, Rating)
+                .on_conflict_do_nothing(index_elements=["user_id", "cocktail_id"])
+                .returning(Rating.user_id, Rating.cocktail_id, Rating.rating_value),
+                rating_rows
+            )
+            for user_id, cocktail_id, rating_value in inserted:
+                ratings_delta[cocktail_id][rating_value] += 1
+                user_deltas[user_id]["ratings_count"] += 1
+
+        to_add = [{"user_id": key[0], "cocktail_id": key[1]} for key, state in favorite_states.items() if state]
+        to_remove = [key for key, state in favorite_states.items() if not state]
+        if to_add:
+            inserted = db.execute(
+                dialect_insert(db, Favorite)
+                .on_conflict_do_nothing(index_elements=["user_id", "cocktail_id"])
+                .returning(Favorite.user_id, Favorite.cocktail_id),
+                to_add
+            )
+            for user_id, cocktail_id in inserted:
+                favorites_delta[cocktail_id] += 1
+                favorites_added[cocktail_id] += 1
+                user_deltas[user_id]["favorites_count"] += 1
+        if to_remove:
+            deleted = db.execute(
+                delete(Favorite)
+                .where(tuple_(Favorite.user_id, Favorite.cocktail_id).in_(to_remove))
+                .returning(Favorite.user_id, Favorite.cocktail_id)
+                .execution_options(synchronize_session=False)
+            )
+            for user_id, cocktail_id in deleted:
+                favorites_delta[cocktail_id] -= 1
+                user_deltas[user_id]["favorites_count"] -= 1
+
+        for cocktail_id, star_deltas in ratings_delta.items():
+            crud_cocktail.update_rating_stats(db, cocktail_id, star_deltas)
+        for cocktail_id, delta in favorites_delta.items():
+            if delta:
+                crud_cocktail.update_favorites_count(db, cocktail_id, delta=delta)
+        user_stats.update_many(db, user_deltas)
+        for cocktail_id in ratings_delta.keys() | favorites_added.keys():
+            weight = (sum(ratings_delta[cocktail_id].values()) * settings.TRENDING_RATING_WEIGHT
+                      + favorites_added[cocktail_id] * settings.TRENDING_FAVORITE_WEIGHT)
+            crud_trending.record_event(db, cocktail_id, weight)
+
+    def _flush_events(self, db: Session, events: List[Dict[str, Any]]) -> None:
+        """Zapisuje zdarzenia w jednej transakcji i usuwa je z bufora (wywoływane pod flush_lock)."""
+        run_write_transaction(db, lambda: self.apply_batch(db, events), name="write_behind.flush")
+        write_behind_buffer.mark_flushed(events)
+        purge_keys(*(cocktail_ratings_key(event["cocktail_id"]) for event in events if event["kind"] == RATING_CREATE))
+        live_events.publish({event["cocktail_id"] for event in events})
+        metrics.incr("write_behind.batches")
+        metrics.incr("write_behind.flushed_events", len(events))
+
+    def flush(self, db: Session) -> int:
+        """
+        Zapisuje oczekujące zdarzenia partiami po WRITE_BEHIND_MAX_BATCH. Zwraca liczbę zdarzeń.
+        flush_lock jest brany na każdą partię osobno - flush_for_user czeka najwyżej na jedną.
+        """
+        flushed = 0
+        while True:
+            with write_behind_buffer.flush_lock:
+                events = write_behind_buffer.take_batch(settings.WRITE_BEHIND_MAX_BATCH)
+                if not events:
+                    return flushed
+                self._flush_events(db, events)
+            flushed += len(events)
+
+    def flush_for_user(self, db: Session, user_id: int) -> bool:
+        """
+        Read-your-writes: przed odczytem stanu użytkownika zapisuje tylko jego oczekujące zdarzenia
+        (zaległości innych użytkowników zostają dla pętli w tle). Zwraca True, jeśli coś zapisano.
+        """
+        if not write_behind_buffer.has_pending_for_user(user_id):
+            return False
+        with write_behind_buffer.flush_lock:
+            # Ponownie pod blokadą - zdarzenia mogła właśnie zapisać pętla w tle
+            events = write_behind_buffer.take_user_events(user_id)
+            if not events:
+                return False
+            metrics.incr("write_behind.read_your_writes_flushes")
+            self._flush_events(db, events)
+        return True
+
+write_behind = CRUDWriteBehind()
@@ -1,10 +1,65 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import metrics
+
+# Opcja wykonania połączenia: transakcja zapisu otwierana przez BEGIN IMMEDIATE (app/db/transaction.py)
+WRITE_TRANSACTION = "write_transaction"
 
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} # Potrzebne tylko dla SQLite
+    connect_args={
+        "check_same_thread": False, # Potrzebne tylko dla SQLite
+        "timeout": settings.SQLITE_BUSY_TIMEOUT_SECONDS,
+    },
+    query_cache_size=settings.SQL_COMPILED_CACHE_SIZE
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_compiled_cache(conn, cursor, statement, parameters, context, executemany):
+    # Wynik sprawdzenia cache kompilacji: hit / miss / no_cache_key (surowy SQL) / caching_disabled
+    metrics.incr(f"db.compile_cache.{context.cache_hit.name.lower().removeprefix('cache_')}")
+
+@event.listens_for(engine, "checkout")
+def _count_pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    metrics.incr("db.pool.checkouts")
+
+@event.listens_for(engine, "checkin")
+def _count_pool_checkin(dbapi_connection, connection_record):
+    metrics.incr("db.pool.checkins")
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _sqlite_enable_foreign_keys(dbapi_connection, connection_record):
+        # SQLite domyślnie ignoruje klucze obce - bez tego nie działa ON DELETE CASCADE/RESTRICT
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _sqlite_begin_immediate(conn):
+        # Transakcje zapisu zaczynamy od BEGIN IMMEDIATE: blokada zapisu jest brana od razu, więc
+        # SQLITE_BUSY pojawia się przy BEGIN (gdzie działa busy timeout i ponawianie), a nie przy
+        # promocji blokady w połowie transakcji. Pozostałe transakcje zostają przy domyślnym
+        # zachowaniu pysqlite (BEGIN DEFERRED dopiero przed pierwszym zapisem).
+        if conn.get_execution_options().get(WRITE_TRANSACTION):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Numer ostatniego commitu w tym procesie - odczyty łączone przez app/single_flight.py
+# nie dołączają do obliczeń rozpoczętych przed commitem (read-your-writes)
+_commit_lock = threading.Lock()
+_commit_generation = 0
+
+@event.listens_for(Session, "after_commit")
+def _count_commit(session):
+    global _commit_generation
+    with _commit_lock:
+        _commit_generation += 1
+
+def commit_generation() -> int:
+    return _commit_generation
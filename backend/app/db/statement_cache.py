@@ -0,0 +1,37 @@
+# app/db/statement_cache.py
+"""
+Gotowe instrukcje SQL dla najczęstszych zapytań, budowane raz na "kształt".
+
+Budowa wyrażenia SQLAlchemy (koercje, etykiety, podzapytania) i wyliczenie jego klucza
+cache kosztują przy każdym wywołaniu więcej niż samo zapytanie do SQLite. Instrukcja
+z bindparam() w miejscu wartości filtrów, listami IN jako expanding bindparam oraz
+LIMIT/OFFSET jako parametrami ma stały kształt: obiekt jest współdzielony między
+żądaniami, jego klucz cache jest zapamiętany, a skompilowany SQL pochodzi z cache
+kompilacji silnika (trafienia: db.compile_cache.* w GET /metrics/).
+
+Kluczem jest krotka opisująca kształt (np. które filtry są użyte), nigdy same wartości.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from app.core.metrics import metrics
+
+class StatementCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._statements: Dict[Hashable, Any] = {}
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        statement = self._statements.get(key)
+        if statement is None:
+            with self._lock:
+                statement = self._statements.get(key)
+                if statement is None:
+                    statement = self._statements[key] = build()
+                    metrics.incr("db.statement_cache.built")
+        return statement
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+statements = StatementCache()
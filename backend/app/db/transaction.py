@@ -0,0 +1,103 @@
+# app/db/transaction.py
+"""
+Transakcje zapisu z ponawianiem przy SQLITE_BUSY / "database is locked" (i błędach
+serializacji PostgreSQL).
+
+Jednostka pracy (work) musi wykonywać wszystkie zapisy w środku - przy ponowieniu
+transakcja jest wycofywana, a work uruchamiane od nowa na świeżym stanie sesji.
+Efekty poza bazą (indeksy w pamięci itp.) należy robić dopiero po powrocie z run_write_transaction.
+"""
+import random
+import sqlite3
+import time
+from typing import Callable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import WRITE_TRANSACTION
+
+T = TypeVar("T")
+
+_SQLITE_RETRYABLE_CODES = {sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED}
+_POSTGRES_RETRYABLE_CODES = {"40001", "40P01"}  # serialization_failure, deadlock_detected
+
+def is_retryable_error(exc: DBAPIError) -> bool:
+    orig = exc.orig
+    sqlite_code = getattr(orig, "sqlite_errorcode", None)
+    if sqlite_code is not None:
+        return (sqlite_code & 0xFF) in _SQLITE_RETRYABLE_CODES
+    if isinstance(orig, sqlite3.OperationalError):
+        return "locked" in str(orig) or "busy" in str(orig)
+    return getattr(orig, "pgcode", None) in _POSTGRES_RETRYABLE_CODES
+
+def backoff_delay(attempt: int) -> float:
+    """Wykładniczy backoff z pełnym jitterem (attempt liczone od 1)."""
+    cap = min(settings.DB_WRITE_BACKOFF_MAX_SECONDS, settings.DB_WRITE_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+    return random.uniform(0, cap)
+
+# Klucz w Session.info: w bieżącej transakcji był flush (zapisy wysłane do bazy, jeszcze bez commit)
+_FLUSHED_KEY = "flushed_in_transaction"
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session, flush_context):
+    session.info[_FLUSHED_KEY] = True
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_flushed(session):
+    session.info.pop(_FLUSHED_KEY, None)
+
+def end_read_transaction(db: Session) -> None:
+    """
+    Kończy bieżącą transakcję sesji, jeśli była tylko odczytem (rollback - nic nie jest commitowane).
+
+    Niezapisane lub wysłane flushem zmiany wywołującego oznaczają błąd programisty: zamiast
+    po cichu ich commitować (albo gubić) zgłaszany jest RuntimeError.
+    """
+    if not db.in_transaction():
+        return
+    if db.new or db.dirty or db.deleted or db.info.get(_FLUSHED_KEY):
+        raise RuntimeError("Sesja ma niezatwierdzone zmiany - zapisy muszą być wykonywane w work().")
+    db.rollback()
+
+def run_write_transaction(db: Session, work: Callable[[], T], name: str = "write") -> T:
+    """
+    Wykonuje work() w transakcji zapisu (na SQLite BEGIN IMMEDIATE) i commituje.
+
+    Bieżąca transakcja odczytu sesji (np. odczyty endpointu) jest najpierw zamykana
+    (end_read_transaction), bo deferred transakcja odczytu promowana do zapisu dostaje
+    SQLITE_BUSY bez czekania na busy timeout.
+    """
+    end_read_transaction(db)
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            db.connection(execution_options={WRITE_TRANSACTION: True})
+            result = work()
+            db.commit()
+        except DBAPIError as e:
+            db.rollback()
+            if not is_retryable_error(e):
+                raise
+            metrics.incr("db.write.busy_errors")
+            metrics.incr(f"db.write.{name}.busy_errors")
+            if attempt >= settings.DB_WRITE_MAX_ATTEMPTS:
+                metrics.incr("db.write.gave_up")
+                raise
+            metrics.incr("db.write.retries")
+            time.sleep(backoff_delay(attempt))
+            continue
+        except Exception:
+            db.rollback()
+            raise
+
+        metrics.incr("db.write.transactions")
+        if attempt > 1:
+            metrics.incr("db.write.retried_transactions")
+        return result
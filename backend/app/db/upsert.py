@@ -0,0 +1,31 @@
+# app/db/upsert.py
+"""
+INSERT ... ON CONFLICT zależny od dialektu bazy.
+
+sqlalchemy.insert() nie ma klauzuli ON CONFLICT - udostępniają ją wersje z
+dialektów SQLite i PostgreSQL (ta sama sygnatura on_conflict_do_nothing /
+on_conflict_do_update), więc wybieramy ją na podstawie silnika sesji. Inne bazy
+są odrzucane przy starcie aplikacji (check_dialect_supported), a nie przy pierwszym zapisie.
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+def dialect_insert(db: Session, table):
+    dialect_name = db.get_bind().dialect.name
+    try:
+        return _INSERTS[dialect_name](table)
+    except KeyError:
+        raise NotImplementedError(f"INSERT ... ON CONFLICT nie jest obsługiwany dla dialektu '{dialect_name}'")
+
+def check_dialect_supported(engine: Engine) -> None:
+    """Wywoływane przy starcie - oceny, ulubione i statystyki nie zadziałają bez ON CONFLICT."""
+    if engine.dialect.name not in _INSERTS:
+        raise RuntimeError(
+            f"Baza '{engine.dialect.name}' nie jest obsługiwana - wymagany SQLite lub PostgreSQL (INSERT ... ON CONFLICT)"
+        )
@@ -22,20 +22,47 @@ class UserAuth(BaseModel):
 # Zmodyfikowany HTTPBearer, który nie wymaga tokenu (auto_error=False)
 optional_bearer = HTTPBearer(auto_error=False)
 
-def get_db() -> Generator:
+class LazySession:
+    """
+    Sesja bazy na czas żądania, tworzona dopiero przy pierwszym get().
+
+    Wspólna dla get_db i get_current_user (FastAPI cache'uje zależność w obrębie żądania),
+    więc uwierzytelnienie i endpoint używają tej samej sesji, a żądanie, które bazy nie
+    potrzebuje (np. anonimowe trafienie w cache), w ogóle jej nie tworzy. Sama sesja
+    pobiera połączenie z puli dopiero przy pierwszym zapytaniu (db.pool.* w GET /metrics/).
+    """
+
+    def __init__(self) -> None:
+        self._session: Optional[Session] = None
+
+    def get(self) -> Session:
+        if self._session is None:
+            self._session = SessionLocal()
+        return self._session
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+def get_lazy_session() -> Generator:
+    lazy_session = LazySession()
     try:
-        db = SessionLocal()
-        yield db
+        yield lazy_session
     finally:
-        db.close()
+        lazy_session.close()
+
+def get_db(lazy_session: LazySession = Depends(get_lazy_session)) -> Session:
+    return lazy_session.get()
 
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
-    db: Session = Depends(get_db)
+    lazy_session: LazySession = Depends(get_lazy_session)
 ) -> Optional[User]:
     """
     Pobiera aktualnego użytkownika na podstawie tokenu JWT.
     Zwraca None jeśli token nie został podany lub jest nieprawidłowy.
+    Bez tokenu nie dotyka bazy - sesja tworzona jest dopiero do wyszukania użytkownika.
     """
     
     # Jeśli nie ma tokenu, zwróć None (dla niezalogowanych użytkowników)
@@ -94,7 +121,7 @@ async def get_current_user(
         )
 
     print(f"--- DEBUG [get_current_user] --- Próbuję pobrać użytkownika z DB: {token_data.username}")
-    user = crud_user.user.get_user_by_username(db, username=token_data.username)
+    user = crud_user.user.get_user_by_username(lazy_session.get(), username=token_data.username)
     print(f"--- DEBUG [get_current_user] --- Wynik z DB dla użytkownika '{token_data.username}': {user}")
 
     if user is None:
@@ -115,8 +142,9 @@ async def get_current_active_user(
     if current_user is None:
         return None
     
-    # Tutaj można dodać logikę sprawdzającą, czy użytkownik jest aktywny
-    # np. if not current_user.is_active: return None
+    # Konto oczekujące na usunięcie w tle (CRUDUser.delete_user) nie jest już aktywne
+    if current_user.deleted_at is not None:
+        return None
     
     return current_user
 
@@ -0,0 +1,126 @@
+# app/http_cache.py
+"""
+Nagłówki cache dla reverse proxy (Cache-Control, Vary, Surrogate-Key) i zgłaszanie purge.
+
+Odpowiedzi na żądania anonimowe publicznych odczytów dostają Cache-Control: public z s-maxage
+wg polityki trasy (CACHE_POLICIES) oraz Surrogate-Key z kluczami treści (np. "cocktail-42",
+"tag-list"). Żądania z nagłówkiem Authorization dostają "private, no-cache" - ich treść może
+zależeć od użytkownika (np. jego prywatne koktajle). Vary: Authorization pilnuje, żeby proxy
+nie podało odpowiedzi anonimowej zalogowanemu.
+
+Ścieżki zapisu w CRUD wołają purge_keys(...) po commit. Subskrybenci (purge_hooks.subscribe)
+dostają listę kluczy - tak podłącza się zastępcze proxy w testach. Jeśli ustawiono
+HTTP_CACHE_PURGE_URL, klucze wysyłane są też żądaniem PURGE z nagłówkiem Surrogate-Key
+(w wątku w tle, bez blokowania zapisu).
+
+Zmiany liczników ocen i ulubionych oraz nazw tagów i składników nie wywołują purge koktajli,
+w których się pojawiają - odświeżają się po s-maxage.
+"""
+import threading
+import urllib.request
+from typing import Callable, Dict, Iterable, List, NamedTuple
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+class CachePolicy(NamedTuple):
+    max_age: int  # przeglądarka
+    s_maxage: int  # współdzielony cache (proxy)
+    stale_while_revalidate: int
+
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "cocktails.list": CachePolicy(max_age=15, s_maxage=60, stale_while_revalidate=30),
+    "cocktails.detail": CachePolicy(max_age=30, s_maxage=300, stale_while_revalidate=60),
+    "users.cocktails": CachePolicy(max_age=30, s_maxage=300, stale_while_revalidate=60),
+    "users.profile": CachePolicy(max_age=30, s_maxage=120, stale_while_revalidate=60),
+    "ratings.for_cocktail": CachePolicy(max_age=15, s_maxage=120, stale_while_revalidate=30),
+    "cocktails.rating_stats": CachePolicy(max_age=15, s_maxage=120, stale_while_revalidate=30),
+    "tags.list": CachePolicy(max_age=300, s_maxage=3600, stale_while_revalidate=300),
+    "ingredients.list": CachePolicy(max_age=300, s_maxage=3600, stale_while_revalidate=300),
+}
+
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+VARY = "Authorization, Accept-Encoding"
+
+def cache_headers(request: Request, policy_name: str, keys: Iterable[str]) -> Dict[str, str]:
+    """Nagłówki odpowiedzi dla trasy policy_name; keys to klucze Surrogate-Key treści."""
+    if not settings.HTTP_CACHE_ENABLED or request.headers.get("authorization"):
+        return {"Cache-Control": PRIVATE_CACHE_CONTROL, "Vary": VARY}
+    policy = CACHE_POLICIES[policy_name]
+    return {
+        "Cache-Control": "public, max-age=%d, s-maxage=%d, stale-while-revalidate=%d"
+                         % (policy.max_age, policy.s_maxage, policy.stale_while_revalidate),
+        "Vary": VARY,
+        "Surrogate-Key": " ".join(dict.fromkeys(keys)),
+    }
+
+def cocktail_key(cocktail_id: int) -> str:
+    return f"cocktail-{cocktail_id}"
+
+def cocktail_ratings_key(cocktail_id: int) -> str:
+    return f"cocktail-{cocktail_id}-ratings"
+
+def user_cocktails_key(user_id: int) -> str:
+    return f"user-{user_id}-cocktails"
+
+def user_key(user_id: int) -> str:
+    return f"user-{user_id}"
+
+COCKTAIL_LIST_KEY = "cocktail-list"
+TAG_LIST_KEY = "tag-list"
+INGREDIENT_LIST_KEY = "ingredient-list"
+
+class PurgeHooks:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[List[str]], None]] = []
+
+    def subscribe(self, callback: Callable[[List[str]], None]) -> Callable[[], None]:
+        """Rejestruje odbiorcę kluczy purge. Zwraca funkcję wyrejestrowującą."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def purge(self, keys: Iterable[str]) -> None:
+        keys = list(dict.fromkeys(keys))
+        if not keys or not settings.HTTP_CACHE_ENABLED:
+            return
+        metrics.incr("http_cache.purged_keys", len(keys))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(keys)
+            except Exception as e:
+                # Błąd proxy nie może wycofać zapisu, który już jest w bazie
+                metrics.incr("http_cache.purge_errors")
+                print(f"WARNING: purge {keys} nie powiódł się: {type(e).__name__} - {e}")
+
+purge_hooks = PurgeHooks()
+
+def purge_keys(*keys: str) -> None:
+    purge_hooks.purge(keys)
+
+def _send_purge(keys: List[str]) -> None:
+    request = urllib.request.Request(
+        settings.HTTP_CACHE_PURGE_URL, method="PURGE", headers={"Surrogate-Key": " ".join(keys)}
+    )
+
+    def send() -> None:
+        try:
+            urllib.request.urlopen(request, timeout=settings.HTTP_CACHE_PURGE_TIMEOUT_SECONDS).close()
+        except Exception as e:
+            metrics.incr("http_cache.purge_errors")
+            print(f"WARNING: PURGE {settings.HTTP_CACHE_PURGE_URL} ({' '.join(keys)}) nie powiódł się: {e}")
+
+    threading.Thread(target=send, name="http-cache-purge", daemon=True).start()
+
+if settings.HTTP_CACHE_PURGE_URL:
+    purge_hooks.subscribe(_send_purge)
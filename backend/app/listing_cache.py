@@ -0,0 +1,107 @@
+# app/listing_cache.py
+"""
+Współdzielony cache stron publicznej listy koktajli (GET /cocktails/).
+
+Strona zależy wyłącznie od filtrów, sortowania, widoku i paginacji - nie od tego, kto pyta -
+więc ten sam wpis obsługuje ruch anonimowy i zalogowany. Prywatne koktajle zalogowanego
+użytkownika dokładane są na wierzch strony przez CRUDCocktail.get_cocktails (zwykle pusta
+lista), dlatego każdy wpis przechowuje też klucze sortowania pozycji.
+
+Osobno trzymane są liczby wyników per zestaw filtrów (count=cached/estimated w get_cocktails) -
+niezależne od sortowania, widoku i strony, z dłuższym LISTING_COUNT_CACHE_TTL_SECONDS.
+
+Każdy zapis koktajlu (utworzenie, edycja, usunięcie, ukrycie) podbija wersję i czyści oba cache.
+Zmiany liczników ocen i ulubionych nie unieważniają wpisów - są widoczne najpóźniej po TTL
+(dotyczy też liczby wyników filtra min_avg_rating). TTL równy 0 wyłącza dany cache.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+class ListingPage:
+    __slots__ = ("total", "entries", "created_at")
+
+    def __init__(self, total: Optional[int], entries: List[Tuple[Tuple[Any, int], Any]]) -> None:
+        # Dokładna liczba publicznych wyników z chwili odczytu strony (None - nie liczona)
+        self.total = total
+        # (klucz sortowania, element) w kolejności listy; klucz to (wartość kolumny sortowania, id)
+        self.entries = entries
+        self.created_at = time.monotonic()
+
+class ListingCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._version = 0
+        self._pages: "OrderedDict[Hashable, ListingPage]" = OrderedDict()
+        self._counts: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, key: Hashable) -> Optional[ListingPage]:
+        if settings.LISTING_CACHE_TTL_SECONDS <= 0:
+            return None
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None and time.monotonic() - page.created_at < settings.LISTING_CACHE_TTL_SECONDS:
+                self._pages.move_to_end(key)
+                metrics.incr("listing_cache.hits")
+                return page
+            if page is not None:
+                del self._pages[key]
+        metrics.incr("listing_cache.misses")
+        return None
+
+    def put(self, key: Hashable, version: int, page: ListingPage) -> None:
+        """Zapisuje stronę policzoną przy wersji version (pomija ją, jeśli w międzyczasie był zapis)."""
+        if settings.LISTING_CACHE_TTL_SECONDS <= 0:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > settings.LISTING_CACHE_MAX_ENTRIES:
+                self._pages.popitem(last=False)
+
+    def get_count(self, key: Hashable) -> Optional[Any]:
+        if settings.LISTING_COUNT_CACHE_TTL_SECONDS <= 0:
+            return None
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None and time.monotonic() - cached[0] < settings.LISTING_COUNT_CACHE_TTL_SECONDS:
+                self._counts.move_to_end(key)
+                metrics.incr("listing_cache.count_hits")
+                return cached[1]
+            if cached is not None:
+                del self._counts[key]
+        metrics.incr("listing_cache.count_misses")
+        return None
+
+    def put_count(self, key: Hashable, version: int, value: Any) -> None:
+        if settings.LISTING_COUNT_CACHE_TTL_SECONDS <= 0:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            self._counts[key] = (time.monotonic(), value)
+            self._counts.move_to_end(key)
+            while len(self._counts) > settings.LISTING_CACHE_MAX_ENTRIES:
+                self._counts.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._pages.clear()
+            self._counts.clear()
+        metrics.incr("listing_cache.invalidations")
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+listing_cache = ListingCache()
@@ -0,0 +1,116 @@
+# app/live_events.py
+"""
+Magistrala zdarzeń na żywo (pub/sub w procesie) dla strumieni SSE liczników ocen i ulubionych.
+
+CRUDRating, CRUDFavorite i zapis write-behind po commit wywołują publish(ids), które tylko
+oznacza koktajle jako zmienione (nic nie robi, gdy nikt nie słucha). Zadanie w tle
+(background.live_events_loop) co LIVE_EVENTS_COALESCE_INTERVAL_MS odczytuje jednym zapytaniem
+aktualne liczniki oznaczonych koktajli i rozsyła po jednym zdarzeniu na koktajl - seria ocen
+w jednym okresie daje jedno zdarzenie z ostatnim stanem.
+
+Subskrybent to kolejka asyncio (LIVE_EVENTS_QUEUE_SIZE); gdy klient nie nadąża, najstarsze
+zdarzenia są odrzucane (liczą się tylko ostatnie liczniki). Magistrala działa w obrębie
+jednego workera - przy wielu workerach każdy rozsyła zmiany zapisane przez siebie.
+
+Liczniki: live_events.published, .broadcast, .delivered, .dropped (GET /metrics/).
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.crud.crud_cocktail import cocktail as crud_cocktail
+from app.schemas.cocktail import CocktailStats
+
+class LiveSubscriber:
+    __slots__ = ("cocktail_id", "user_id", "queue")
+
+    def __init__(self, cocktail_id: Optional[int], user_id: Optional[int]) -> None:
+        # None - globalny strumień wszystkich publicznych koktajli
+        self.cocktail_id = cocktail_id
+        # Zalogowany autor dostaje też zdarzenia swojego prywatnego koktajlu
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=settings.LIVE_EVENTS_QUEUE_SIZE)
+
+    def push(self, frame: str) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            metrics.incr("live_events.dropped")
+        self.queue.put_nowait(frame)
+
+class LiveEventBus:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: Set[int] = set()
+        self._subscribers: Dict[Optional[int], Set[LiveSubscriber]] = defaultdict(set)
+        self._count = 0
+        self._event_id = 0
+
+    def publish(self, cocktail_ids: Iterable[int]) -> None:
+        """Oznacza koktajle jako zmienione (wywoływane po commit, z dowolnego wątku)."""
+        if not self._count:
+            return
+        with self._lock:
+            self._pending.update(cocktail_ids)
+        metrics.incr("live_events.published")
+
+    def take_pending(self) -> List[int]:
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        return sorted(pending)
+
+    def has_capacity(self) -> bool:
+        return self._count < settings.LIVE_EVENTS_MAX_SUBSCRIBERS
+
+    def subscribe(self, cocktail_id: Optional[int], user_id: Optional[int] = None) -> Optional[LiveSubscriber]:
+        """Rejestruje subskrybenta (w pętli zdarzeń); None, gdy osiągnięto LIVE_EVENTS_MAX_SUBSCRIBERS."""
+        subscriber = LiveSubscriber(cocktail_id, user_id)
+        with self._lock:
+            if self._count >= settings.LIVE_EVENTS_MAX_SUBSCRIBERS:
+                return None
+            self._subscribers[cocktail_id].add(subscriber)
+            self._count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: LiveSubscriber) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.cocktail_id)
+            if subscribers is None or subscriber not in subscribers:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.cocktail_id]
+            self._count -= 1
+
+    def format_event(self, stats: CocktailStats) -> str:
+        with self._lock:
+            self._event_id += 1
+            event_id = self._event_id
+        return f"id: {event_id}\nevent: stats\ndata: {stats.model_dump_json()}\n\n"
+
+    def broadcast(self, rows) -> None:
+        """
+        Rozsyła liczniki (wiersze CRUDCocktail.get_stats_rows) do subskrybentów. Wywoływane
+        w pętli zdarzeń - kolejki asyncio nie są bezpieczne dla innych wątków.
+        """
+        for row in rows:
+            with self._lock:
+                targets = list(self._subscribers.get(row.id, ()))
+                if row.is_public:
+                    targets.extend(self._subscribers.get(None, ()))
+            if not row.is_public:
+                targets = [subscriber for subscriber in targets if subscriber.user_id == row.user_id]
+            if not targets:
+                continue
+            frame = self.format_event(crud_cocktail.stats_from_row(row))
+            for subscriber in targets:
+                subscriber.push(frame)
+            metrics.incr("live_events.broadcast")
+            metrics.incr("live_events.delivered", len(targets))
+
+    def __len__(self) -> int:
+        return self._count
+
+live_events = LiveEventBus()
@@ -1,16 +1,45 @@
 # app/main.py
+import asyncio
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.api_v1.api import api_router
 from app.core.config import settings
+from app import background
+from app.db.session import engine
+from app.db.upsert import check_dialect_supported
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_dialect_supported(engine)
+    await asyncio.to_thread(background.load_recipe_index)
+    await asyncio.to_thread(background.load_suggest_index)
+    await asyncio.to_thread(background.load_search_index)
+    # Zadania w tle działające przez cały czas życia aplikacji
+    tasks = [
+        asyncio.create_task(background.trending_renormalize_loop()),
+        asyncio.create_task(background.recommendations_rebuild_loop()),
+        asyncio.create_task(background.suggest_reload_loop()),
+        asyncio.create_task(background.user_purge_loop()),
+        asyncio.create_task(background.change_log_compact_loop()),
+        asyncio.create_task(background.live_events_loop()),
+    ]
+    if settings.WRITE_BEHIND_ENABLED:
+        await asyncio.to_thread(background.open_write_behind)
+        tasks.append(asyncio.create_task(background.write_behind_flush_loop()))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     version="0.1.0",
     description=f"API dla aplikacji {settings.PROJECT_NAME}",
+    lifespan=lifespan,
 )
 
 print(f"--- DEBUG [main.py PRZED MIDDLEWARE] ---")
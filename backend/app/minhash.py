@@ -0,0 +1,112 @@
+# app/minhash.py
+"""
+MinHash + LSH dla zestawów składników koktajli.
+
+Sygnatura MinHash koktajlu to MINHASH_NUM_PERM minimów funkcji haszujących
+h_i(x) = (a_i * x + b_i) mod p po ID składników. Sygnatura dzielona jest na
+MINHASH_BANDS pasm; koktajle o identycznym paśmie trafiają do tego samego kubełka,
+więc kandydaci na podobne receptury znajdowani są bez porównywania z całym katalogiem.
+Podobieństwo kandydatów liczone jest dokładnie (Jaccard na zbiorach składników).
+
+Kubełki zapisywane są w tabeli cocktail_lsh_buckets i ładowane do pamięci (recipe_index).
+"""
+import random
+import threading
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+_PRIME = (1 << 61) - 1
+
+_rng = random.Random(20250521)  # Stałe ziarno - sygnatury muszą być takie same we wszystkich procesach
+_hash_params = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(settings.MINHASH_NUM_PERM)
+]
+
+def minhash_signature(ingredient_ids: Iterable[int]) -> Tuple[int, ...]:
+    ids = list(ingredient_ids)
+    if not ids:
+        return tuple([_PRIME] * len(_hash_params))
+    return tuple(min((a * x + b) % _PRIME for x in ids) for a, b in _hash_params)
+
+def lsh_buckets(signature: Tuple[int, ...]) -> List[int]:
+    """Zwraca identyfikator kubełka dla każdego pasma sygnatury (mieści się w INTEGER SQLite)."""
+    rows = len(signature) // settings.MINHASH_BANDS
+    buckets = []
+    for band in range(settings.MINHASH_BANDS):
+        bucket = band
+        for value in signature[band * rows:(band + 1) * rows]:
+            bucket = (bucket * 1_000_003 + value) % _PRIME
+        buckets.append(bucket)
+    return buckets
+
+def jaccard(first: FrozenSet[int], second: FrozenSet[int]) -> float:
+    if not first and not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+class RecipeLSHIndex:
+    """Indeks LSH receptur w pamięci procesu (kubełki + zbiory składników)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        self._bands: Dict[int, List[int]] = {}
+        self._ingredients: Dict[int, FrozenSet[int]] = {}
+        self.loaded = False
+
+    def load(self, bands: Dict[int, List[int]], ingredients: Dict[int, FrozenSet[int]]) -> None:
+        with self._lock:
+            self._buckets = defaultdict(set)
+            for cocktail_id, cocktail_bands in bands.items():
+                for band, bucket in enumerate(cocktail_bands):
+                    self._buckets[(band, bucket)].add(cocktail_id)
+            self._bands = dict(bands)
+            self._ingredients = dict(ingredients)
+            self.loaded = True
+
+    def add(self, cocktail_id: int, ingredient_ids: Iterable[int], bands: List[int]) -> None:
+        with self._lock:
+            self._remove_locked(cocktail_id)
+            for band, bucket in enumerate(bands):
+                self._buckets[(band, bucket)].add(cocktail_id)
+            self._bands[cocktail_id] = bands
+            self._ingredients[cocktail_id] = frozenset(ingredient_ids)
+
+    def remove(self, cocktail_id: int) -> None:
+        with self._lock:
+            self._remove_locked(cocktail_id)
+
+    def _remove_locked(self, cocktail_id: int) -> None:
+        for band, bucket in enumerate(self._bands.pop(cocktail_id, [])):
+            members = self._buckets.get((band, bucket))
+            if members is not None:
+                members.discard(cocktail_id)
+                if not members:
+                    del self._buckets[(band, bucket)]
+        self._ingredients.pop(cocktail_id, None)
+
+    def query(
+        self,
+        ingredient_ids: Iterable[int],
+        min_similarity: float,
+        exclude_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Zwraca (cocktail_id, Jaccard) dla receptur o podobieństwie >= min_similarity, malejąco."""
+        ingredients = frozenset(ingredient_ids)
+        bands = lsh_buckets(minhash_signature(ingredients))
+        with self._lock:
+            candidates: Set[int] = set()
+            for band, bucket in enumerate(bands):
+                candidates.update(self._buckets.get((band, bucket), ()))
+            candidates.discard(exclude_id)
+            scored = [
+                (candidate_id, jaccard(ingredients, self._ingredients.get(candidate_id, frozenset())))
+                for candidate_id in candidates
+            ]
+        matches = [(cocktail_id, score) for cocktail_id, score in scored if score >= min_similarity]
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+recipe_index = RecipeLSHIndex()
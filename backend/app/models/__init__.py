@@ -4,6 +4,11 @@ from .ingredient import Ingredient
 from .tag import Tag
 from .rating import Rating
 from .favorite import Favorite
+from .trending import TrendingState
+from .recommendation import CocktailSimilarity
+from .recipe_lsh import CocktailLSHBucket
+from .change_log import ChangeLogEntry
+from .user_stats import UserStats
 
 # Import Base z base_class, aby Alembic mógł go znaleźć
 from app.db.base_class import Base
\ No newline at end of file
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+class ChangeLogEntry(Base):
+    """
+    Wpis dziennika zmian katalogu (tylko dopisywany) - źródło GET /sync.
+
+    Zapisywany w tej samej transakcji co zmiana (patrz CRUDChangeLog). Przechowuje tylko
+    (encja, id, operacja); aktualny stan encji odczytywany jest przy synchronizacji.
+    AUTOINCREMENT na SQLite gwarantuje, że numery seq nigdy nie są używane ponownie.
+    Wpisy zastąpione późniejszymi usuwa CRUDChangeLog.compact (zadanie w tle).
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        # Szukanie późniejszego wpisu tej samej encji przy kompaktowaniu
+        Index("ix_change_log_entity_id_seq", "entity_id", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True)
+    entity = Column(String(20), nullable=False)  # cocktail / cocktail_stats / tag / ingredient
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)  # upsert / delete
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
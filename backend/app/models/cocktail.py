@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Table, Float
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.db.base_class import Base
+from app.core.config import settings
 
 cocktail_ingredient_association = Table(
     'cocktail_ingredients', Base.metadata,
@@ -23,27 +24,47 @@ class Cocktail(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False, unique=True) # Zakładam, że unikalność nazwy pozostała
+    # Nazwa znormalizowana przez app.core.text.fold_text (bez polskich znaków, małe litery)
+    search_key = Column(String, index=True, nullable=True)
     description = Column(Text, nullable=True)
     instructions = Column(Text, nullable=False)
     image_url = Column(String, nullable=True)
     is_public = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Zagregowane statystyki utrzymywane przyrostowo przy zapisie ocen i ulubionych
+    # (patrz CRUDCocktail.update_rating_stats / update_favorites_count)
+    ratings_count = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    ratings_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    # Rozkład ocen - liczba ocen z daną liczbą gwiazdek (GET /cocktails/{id}/rating-stats)
+    ratings_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    ratings_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    ratings_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    ratings_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    ratings_5 = Column(Integer, nullable=False, default=0, server_default="0")
+    bayesian_rating = Column(Float, nullable=False, default=settings.RATING_PRIOR_MEAN, server_default=str(settings.RATING_PRIOR_MEAN), index=True)
+    favorites_count = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    # Wynik "trending" w skali TrendingState.epoch_ts (patrz CRUDTrending)
+    trending_score = Column(Float, nullable=False, default=0.0, server_default="0", index=True)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     author = relationship("User", back_populates="cocktails")
 
     ingredients = relationship(
         "Ingredient", # Nazwa klasy modelu Ingredient
         secondary=cocktail_ingredient_association,
-        back_populates="cocktails" # Nazwa relacji w modelu Ingredient
+        back_populates="cocktails", # Nazwa relacji w modelu Ingredient
+        passive_deletes=True
     )
     
     tags = relationship(
         "Tag", # Nazwa klasy modelu Tag
         secondary=cocktail_tag_association,
-        back_populates="cocktails" # Nazwa relacji w modelu Tag
+        back_populates="cocktails", # Nazwa relacji w modelu Tag
+        passive_deletes=True
     )
     
-    ratings = relationship("Rating", back_populates="cocktail", cascade="all, delete-orphan")
-    favorited_by = relationship("Favorite", back_populates="cocktail", cascade="all, delete-orphan")
\ No newline at end of file
+    # Wiersze zależne usuwa baza (ON DELETE CASCADE), ORM ich nie ładuje przy usuwaniu koktajlu
+    ratings = relationship("Rating", back_populates="cocktail", cascade="all, delete-orphan", passive_deletes=True)
+    favorited_by = relationship("Favorite", back_populates="cocktail", cascade="all, delete-orphan", passive_deletes=True)
\ No newline at end of file
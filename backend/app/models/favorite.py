@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -10,8 +10,13 @@ class Favorite(Base):
     id = Column(Integer, primary_key=True, index=True) # Lub można użyć (user_id, cocktail_id) jako klucz główny
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    cocktail_id = Column(Integer, ForeignKey("cocktails.id"), nullable=False)
+    # ON DELETE CASCADE w bazie - usunięcie koktajlu/użytkownika nie ładuje ulubionych do pamięci (passive_deletes)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    cocktail_id = Column(Integer, ForeignKey("cocktails.id", ondelete="CASCADE"), nullable=False, index=True)
 
     user = relationship("User", back_populates="favorites")
-    cocktail = relationship("Cocktail", back_populates="favorited_by")
\ No newline at end of file
+    cocktail = relationship("Cocktail", back_populates="favorited_by")
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'cocktail_id', name='uq_favorites_user_cocktail'),
+    )
@@ -10,6 +10,8 @@ class Ingredient(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
+    # Nazwa znormalizowana przez app.core.text.fold_text (bez polskich znaków, małe litery)
+    search_key = Column(String, index=True, nullable=True)
 
     # Relacja zdefiniowana w cocktail.py przez `secondary=cocktail_ingredient_association`
     cocktails = relationship(
@@ -1,5 +1,5 @@
 # backend\app\models\rating.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -14,12 +14,21 @@ class Rating(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    cocktail_id = Column(Integer, ForeignKey("cocktails.id"), nullable=False)
+    # ON DELETE CASCADE w bazie - usunięcie koktajlu/użytkownika nie ładuje ocen do pamięci (passive_deletes)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    cocktail_id = Column(Integer, ForeignKey("cocktails.id", ondelete="CASCADE"), nullable=False, index=True)
 
     user = relationship("User", back_populates="ratings")
     cocktail = relationship("Cocktail", back_populates="ratings")
 
     __table_args__ = (
         CheckConstraint('rating_value >= 1 AND rating_value <= 5', name='rating_value_check'),
+        UniqueConstraint('user_id', 'cocktail_id', name='uq_ratings_user_cocktail'),
+        # Stronicowanie ocen z komentarzem (has_comment=true) od najnowszych - indeks częściowy,
+        # bez ocen bez komentarza. Puste komentarze zapisywane są jako NULL (schemas/rating.py)
+        Index(
+            'ix_ratings_cocktail_id_commented', 'cocktail_id', 'id',
+            sqlite_where=text('comment IS NOT NULL'),
+            postgresql_where=text('comment IS NOT NULL')
+        ),
     )
\ No newline at end of file
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, Index
+
+from app.db.base_class import Base
+
+class CocktailLSHBucket(Base):
+    """Kubełek LSH (jedno pasmo sygnatury MinHash) receptury koktajlu - patrz app/minhash.py."""
+    __tablename__ = "cocktail_lsh_buckets"
+
+    cocktail_id = Column(Integer, ForeignKey("cocktails.id", ondelete="CASCADE"), primary_key=True)
+    band = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index("ix_cocktail_lsh_buckets_band_bucket", "band", "bucket"),
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+
+from app.db.base_class import Base
+
+class CocktailSimilarity(Base):
+    """
+    Prekomputowane podobieństwo koktajli (top-K sąsiadów dla każdego koktajlu).
+    Tabela jest w całości przebudowywana przez CRUDRecommendation.rebuild.
+    """
+    __tablename__ = "cocktail_similarities"
+
+    cocktail_id = Column(Integer, ForeignKey("cocktails.id", ondelete="CASCADE"), primary_key=True)
+    # Indeks potrzebny, żeby ON DELETE CASCADE nie skanował całej tabeli przy usuwaniu koktajlu
+    similar_cocktail_id = Column(Integer, ForeignKey("cocktails.id", ondelete="CASCADE"), primary_key=True, index=True)
+    score = Column(Float, nullable=False)
+    # Czas przebudowy (epoch) - workery pomijają przebudowę, jeśli tabela jest świeża
+    rebuilt_ts = Column(Float, nullable=False, server_default="0")
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Float
+
+from app.db.base_class import Base
+
+class TrendingState(Base):
+    """
+    Stan rankingu "trending" (jeden wiersz, id=1).
+
+    Wynik koktajlu przechowywany jest w skali momentu `epoch_ts`:
+    każde zdarzenie dodaje waga * exp(λ * (t - epoch_ts)), więc kolejność wyników
+    odpowiada kolejności wyników wygaszonych wykładniczo w dowolnej chwili.
+    Zadanie w tle okresowo przesuwa epoch_ts na "teraz" i przeskalowuje wyniki.
+    """
+    __tablename__ = "trending_state"
+
+    id = Column(Integer, primary_key=True)
+    epoch_ts = Column(Float, nullable=False) # Unix timestamp
@@ -15,7 +15,10 @@ class User(Base):
     avatar_url = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Ustawione, gdy konto czeka na usunięcie w tle (CRUDUser.delete_user) - użytkownik jest już nieaktywny
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
-    cocktails = relationship("Cocktail", back_populates="author", cascade="all, delete-orphan")
-    ratings = relationship("Rating", back_populates="user", cascade="all, delete-orphan")
-    favorites = relationship("Favorite", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    # Wiersze zależne usuwa baza (ON DELETE CASCADE), ORM ich nie ładuje przy usuwaniu użytkownika
+    cocktails = relationship("Cocktail", back_populates="author", cascade="all, delete-orphan", passive_deletes=True)
+    ratings = relationship("Rating", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    favorites = relationship("Favorite", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, ForeignKey
+
+from app.db.base_class import Base
+
+class UserStats(Base):
+    """
+    Zagregowane statystyki profilu użytkownika (GET /users/{id}/profile).
+
+    Utrzymywane przyrostowo w transakcjach zapisu koktajli, ocen i ulubionych (CRUDUserStats),
+    więc odczyt profilu nie liczy złączeń po cocktails, ratings i favorites.
+    Odbudowa od zera: python -m scripts.rebuild_user_stats.
+    """
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # Koktajle autora (wszystkie i publiczne - obcy widzą tylko publiczne)
+    cocktails_count = Column(Integer, nullable=False, default=0, server_default="0")
+    public_cocktails_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Oceny i ulubione wystawione przez użytkownika
+    ratings_count = Column(Integer, nullable=False, default=0, server_default="0")
+    favorites_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Oceny otrzymane przez koktajle autora (średnia = suma / liczba) - wszystkie i tylko
+    # z koktajli publicznych (obcy nie mogą z nich odczytać ocen prywatnych koktajli)
+    received_ratings_count = Column(Integer, nullable=False, default=0, server_default="0")
+    received_ratings_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    public_received_ratings_count = Column(Integer, nullable=False, default=0, server_default="0")
+    public_received_ratings_sum = Column(Integer, nullable=False, default=0, server_default="0")
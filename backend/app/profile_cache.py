@@ -0,0 +1,81 @@
+# app/profile_cache.py
+"""
+Cache skróconych profili użytkowników (id, nazwa, avatar) osadzanych w listach, np. autorów
+ocen w GET /ratings/cocktail/{id}?expand=user.
+
+Na stronie listy powtarzają się ci sami aktywni użytkownicy, więc większość profili pochodzi
+z pamięci, a brakujące CRUDUser.get_user_briefs doczytuje jednym zapytaniem. Zmiana profilu
+lub usunięcie konta usuwa wpis (CRUDUser); zmiany z innych workerów są widoczne po TTL.
+Profil odczytany z bazy przed invalidate() nie wraca do cache: get_many zwraca numer generacji,
+a put_many pomija użytkowników unieważnionych po nim.
+
+Liczniki: profile_cache.hits, profile_cache.misses (GET /metrics/).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.schemas.user import UserBrief
+
+class UserProfileCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[float, UserBrief]]" = OrderedDict()
+        # Numer generacji podbijany przy każdym invalidate() i generacja ostatniego unieważnienia
+        # użytkownika (ograniczona do USER_PROFILE_CACHE_MAX_ENTRIES najnowszych - starsze opisuje
+        # _forgotten_generation, poniżej której put_many niczego nie zapisuje)
+        self._generation = 0
+        self._invalidated: "OrderedDict[int, int]" = OrderedDict()
+        self._forgotten_generation = 0
+
+    def get_many(self, user_ids: Iterable[int]) -> Tuple[Dict[int, UserBrief], List[int], int]:
+        """Zwraca (profile znalezione w cache, id do doczytania z bazy, generacja dla put_many)."""
+        found: Dict[int, UserBrief] = {}
+        missing: List[int] = []
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            for user_id in user_ids:
+                cached = self._entries.get(user_id)
+                if cached is not None and now - cached[0] < settings.USER_PROFILE_CACHE_TTL_SECONDS:
+                    self._entries.move_to_end(user_id)
+                    found[user_id] = cached[1]
+                else:
+                    missing.append(user_id)
+        metrics.incr("profile_cache.hits", len(found))
+        metrics.incr("profile_cache.misses", len(missing))
+        return found, missing, generation
+
+    def put_many(self, profiles: Dict[int, UserBrief], generation: int) -> None:
+        """Zapisuje profile odczytane po get_many(); pomija unieważnione od tamtej generacji."""
+        if settings.USER_PROFILE_CACHE_TTL_SECONDS <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if generation < self._forgotten_generation:
+                return
+            for user_id, profile in profiles.items():
+                if self._invalidated.get(user_id, 0) > generation:
+                    continue
+                self._entries[user_id] = (now, profile)
+                self._entries.move_to_end(user_id)
+            while len(self._entries) > settings.USER_PROFILE_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generation += 1
+            self._invalidated[user_id] = self._generation
+            self._invalidated.move_to_end(user_id)
+            while len(self._invalidated) > settings.USER_PROFILE_CACHE_MAX_ENTRIES:
+                _, forgotten = self._invalidated.popitem(last=False)
+                self._forgotten_generation = max(self._forgotten_generation, forgotten)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+profile_cache = UserProfileCache()
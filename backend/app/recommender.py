@@ -0,0 +1,80 @@
+# app/recommender.py
+"""
+Obliczenia rekomendacji item-to-item (koktajl -> podobne koktajle).
+
+Macierz interakcji użytkownik x koktajl budowana jest z ulubionych i ocen,
+a podobieństwo koktajli to podobieństwo cosinusowe kolumn tej macierzy
+(współwystępowanie w ulubionych / ocenach tych samych użytkowników).
+Moduł wymaga NumPy i SciPy - używany jest wyłącznie przy przebudowie
+(CRUDRecommendation.rebuild), serwowanie rekomendacji to zwykłe odczyty z bazy.
+
+Przebudowa z linii poleceń:
+    python -m app.recommender
+"""
+from typing import Iterator, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+def build_interaction_matrix(
+    user_ids: Sequence[int], cocktail_ids: Sequence[int], weights: Sequence[float]
+) -> Tuple[sp.csr_matrix, np.ndarray]:
+    """
+    Buduje rzadką macierz użytkownik x koktajl.
+
+    Powtórzone pary (użytkownik, koktajl) - np. ulubiony i oceniony - są sumowane.
+    Zwraca macierz oraz tablicę ID koktajli odpowiadających kolumnom.
+    """
+    _, user_index = np.unique(np.asarray(user_ids, dtype=np.int64), return_inverse=True)
+    cocktails, cocktail_index = np.unique(np.asarray(cocktail_ids, dtype=np.int64), return_inverse=True)
+    matrix = sp.csr_matrix(
+        (np.asarray(weights, dtype=np.float32), (user_index, cocktail_index)),
+        shape=(int(user_index.max(initial=-1)) + 1, len(cocktails)),
+        dtype=np.float32,
+    )
+    matrix.sum_duplicates()
+    return matrix, cocktails
+
+def top_k_similar(
+    matrix: sp.csr_matrix, top_k: int, block_size: int = 1024
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Dla każdej kolumny (koktajlu) zwraca top_k najbardziej podobnych kolumn.
+
+    Iloczyn macierzy liczony jest blokami po block_size koktajli, więc pamięć
+    zależy od rozmiaru bloku, a nie od kwadratu liczby koktajli.
+    Zwraca krotki (indeks koktajlu, indeksy podobnych, podobieństwa) malejąco.
+    """
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1.0
+    normalized = (matrix @ sp.diags((1.0 / norms).astype(np.float32))).tocsr()
+    item_user = normalized.T.tocsr()
+
+    n_items = matrix.shape[1]
+    for start in range(0, n_items, block_size):
+        sims = (item_user[start:start + block_size] @ normalized).tocsr()
+        for row in range(sims.shape[0]):
+            item = start + row
+            row_start, row_end = sims.indptr[row], sims.indptr[row + 1]
+            indices = sims.indices[row_start:row_end]
+            scores = sims.data[row_start:row_end]
+            keep = indices != item
+            indices, scores = indices[keep], scores[keep]
+            if len(scores) == 0:
+                continue
+            if len(scores) > top_k:
+                best = np.argpartition(-scores, top_k - 1)[:top_k]
+                indices, scores = indices[best], scores[best]
+            order = np.argsort(-scores, kind="stable")
+            yield item, indices[order], scores[order]
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+    from app.crud.crud_recommendation import recommendation
+
+    db = SessionLocal()
+    try:
+        rows = recommendation.rebuild(db)
+        print(f"Zapisano {rows} par podobnych koktajli.")
+    finally:
+        db.close()
@@ -0,0 +1,84 @@
+# app/reference_data.py
+"""
+Niezmienny snapshot danych słownikowych (wszystkie tagi i składniki).
+
+Snapshot zawiera gotowy do wysłania JSON (także skompresowany gzipem), ETag
+oraz wersję - skrót treści, więc ta sama zawartość ma tę samą wersję i ETag w każdym
+procesie. Po każdym zapisie w crud_tag / crud_ingredient budowany jest nowy snapshot
+i podmieniany jednym przypisaniem, więc czytelnicy zawsze widzą spójną wersję bez blokad.
+Snapshot sprawdzony w bazie dawniej niż REFERENCE_DATA_TTL_SECONDS temu jest odczytywany
+ponownie (zapisy wykonane w innych procesach).
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from typing import FrozenSet, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.ingredient import Ingredient
+from app.models.tag import Tag
+
+class ReferenceDataSnapshot:
+    __slots__ = ("version", "tags", "ingredients", "tag_ids", "ingredient_ids", "body", "gzip_body", "etag")
+
+    def __init__(self, tags: Tuple[Tuple[int, str], ...], ingredients: Tuple[Tuple[int, str], ...]) -> None:
+        self.tags = tags
+        self.ingredients = ingredients
+        self.tag_ids: FrozenSet[int] = frozenset(tag_id for tag_id, _ in tags)
+        self.ingredient_ids: FrozenSet[int] = frozenset(ingredient_id for ingredient_id, _ in ingredients)
+        content = json.dumps(
+            {
+                "tags": [{"id": tag_id, "name": name} for tag_id, name in tags],
+                "ingredients": [{"id": ingredient_id, "name": name} for ingredient_id, name in ingredients],
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        # Wersja i ETag zależą tylko od treści, więc są zgodne między procesami
+        self.version = hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+        self.etag = f'"{self.version}"'
+        self.body = ('{"version":"%s",%s' % (self.version, content[1:])).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, compresslevel=9)
+
+class ReferenceDataCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ReferenceDataSnapshot] = None
+        # Moment (monotonic) ostatniego odczytu z bazy - snapshot sam w sobie się nie zmienia
+        self._checked_at = 0.0
+        # Numer odświeżenia wydawany przed odczytem z bazy i numer tego, które opublikowało bieżący snapshot
+        self._refresh_seq = 0
+        self._published_seq = 0
+
+    def refresh(self, db: Session) -> ReferenceDataSnapshot:
+        """
+        Buduje nowy snapshot z bazy i atomowo podmienia bieżący. Odświeżenie, które zaczęło
+        odczyt wcześniej niż opublikowane już nowsze, nie nadpisuje go swoim (starszym) stanem.
+        """
+        with self._lock:
+            self._refresh_seq += 1
+            refresh_seq = self._refresh_seq
+        tags = tuple(db.execute(select(Tag.id, Tag.name).order_by(Tag.name)).tuples())
+        ingredients = tuple(db.execute(select(Ingredient.id, Ingredient.name).order_by(Ingredient.name)).tuples())
+        with self._lock:
+            current = self._snapshot
+            if refresh_seq < self._published_seq:
+                return current
+            self._published_seq = refresh_seq
+            self._checked_at = time.monotonic()
+            if current is None or current.tags != tags or current.ingredients != ingredients:
+                self._snapshot = ReferenceDataSnapshot(tags, ingredients)
+            return self._snapshot
+
+    def get(self, db: Session) -> ReferenceDataSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - self._checked_at > settings.REFERENCE_DATA_TTL_SECONDS:
+            snapshot = self.refresh(db)
+        return snapshot
+
+reference_data = ReferenceDataCache()
@@ -1,15 +1,19 @@
 from .token import Token, TokenData
-from .user import User, UserCreate, UserUpdate, UserInDBBase, UserBase
+from .user import User, UserCreate, UserUpdate, UserInDBBase, UserBase, UserBrief, UserPublic
 from .ingredient import Ingredient, IngredientCreate, IngredientUpdate, IngredientBase
 from .tag import Tag, TagCreate, TagUpdate, TagBase
 # Załóżmy, że UnitEnum jest teraz w cocktail.py LUB cocktail.py go importuje
 from .cocktail import (
-    UnitEnum,
+    UnitEnum, CocktailView, CocktailSort, CocktailCount,
     Cocktail, CocktailCreate, CocktailUpdate, CocktailBase,
     CocktailIngredientData, CocktailTagData,
     IngredientInCocktailDetail,
-    CocktailWithDetails
+    CocktailWithDetails, CocktailSummary, CocktailStats, CocktailRatingStats, PaginatedCocktailResponse
 )
 # Usunięto duplikaty InDBBase, ponieważ Rating i Favorite już dziedziczą
-from .rating import Rating, RatingCreate, RatingUpdate, RatingBase
-from .favorite import Favorite, FavoriteCreate, FavoriteBase
\ No newline at end of file
+from .rating import Rating, RatingCreate, RatingUpdate, RatingBase, RatingExpand, RatingWithUser, RatingQueued
+from .favorite import Favorite, FavoriteCreate, FavoriteBase, FavoriteQueued
+from .profile import UserProfile, UserProfileStats
+from .sync import (
+    SyncResponse, SyncCocktail, SyncCocktailIngredient, SyncNamedItem, SyncDeleted
+)
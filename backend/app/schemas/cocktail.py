@@ -20,6 +20,22 @@ class UnitEnum(str, Enum):
     DROP = "drop"
     OTHER = "other"
 
+class CocktailView(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+class CocktailSort(str, Enum):
+    NEWEST = "newest"
+    TOP_RATED = "top_rated"
+    MOST_RATED = "most_rated"
+    MOST_FAVORITED = "most_favorited"
+
+# Sposób liczenia "total" w liście koktajli
+class CocktailCount(str, Enum):
+    EXACT = "exact"          # COUNT przy każdym odczycie strony
+    CACHED = "cached"        # dokładny COUNT zapamiętany per zestaw filtrów (do zapisu koktajlu lub TTL)
+    ESTIMATED = "estimated"  # COUNT do limitu (np. "1000+"), patrz total_capped
+
 class IngredientInCocktailDetail(BaseModel):
     id: int
     name: str
@@ -76,13 +92,48 @@ class CocktailWithDetails(CocktailBase):
     # NOWE POLA - średnia ocena i liczba ocen
     average_rating: Optional[float] = Field(default=None, description="Średnia ocena koktajlu")
     ratings_count: int = Field(default=0, description="Liczba ocen dla koktajlu")
+    favorites_count: int = Field(default=0, description="Liczba użytkowników, którzy dodali koktajl do ulubionych")
     
     model_config = {"from_attributes": True}
 
+# Lekki schemat koktajlu dla list (np. CocktailCard) - bez instrukcji, opisu, autora i składników
+class CocktailSummary(BaseModel):
+    id: int
+    name: str
+    image_url: Optional[str] = None
+    is_public: bool = True
+    user_id: int
+    created_at: datetime
+    tags: List[TagSchema]
+    average_rating: Optional[float] = Field(default=None, description="Średnia ocena koktajlu")
+    ratings_count: int = Field(default=0, description="Liczba ocen dla koktajlu")
+    favorites_count: int = Field(default=0, description="Liczba użytkowników, którzy dodali koktajl do ulubionych")
+
+    model_config = {"from_attributes": True}
+
+# Same liczniki ocen i ulubionych koktajlu (GET /sync, strumień zdarzeń /cocktails/{id}/events)
+class CocktailStats(BaseModel):
+    id: int
+    average_rating: Optional[float] = None
+    ratings_count: int = 0
+    favorites_count: int = 0
+
+# Rozkład ocen koktajlu (GET /cocktails/{id}/rating-stats)
+class CocktailRatingStats(BaseModel):
+    cocktail_id: int
+    average_rating: Optional[float] = None
+    ratings_count: int = 0
+    # Liczba ocen dla każdej liczby gwiazdek 1-5
+    distribution: Dict[int, int]
+
 # Schemat odpowiedzi z paginacją
 class PaginatedCocktailResponse(BaseModel):
-    items: List[CocktailWithDetails]
+    items: List[Union[CocktailWithDetails, CocktailSummary]]
     total: int
     page: int
     size: int
-    pages: int
\ No newline at end of file
+    # None, gdy total jest obcięty (total_capped) - liczba stron nie jest wtedy znana
+    pages: Optional[int]
+    count_mode: CocktailCount = CocktailCount.EXACT
+    # True, gdy wyników jest więcej niż total (tryb estimated po osiągnięciu limitu)
+    total_capped: bool = False
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -16,4 +17,9 @@ class FavoriteInDBBase(FavoriteBase):
         from_attributes = True
 
 class Favorite(FavoriteInDBBase):
-    pass
\ No newline at end of file
+    pass
+# Odpowiedź 202 w trybie write-behind - zmiana zapisana w logu, wiersz powstanie przy flushu
+class FavoriteQueued(BaseModel):
+    status: Literal["queued"] = "queued"
+    is_favorite: bool
+    cocktail_id: int
@@ -0,0 +1,19 @@
+from typing import List, Optional, Union
+from pydantic import BaseModel, Field
+
+from .user import UserPublic
+from .cocktail import CocktailWithDetails, CocktailSummary
+
+# Statystyki profilu z tabeli user_stats
+class UserProfileStats(BaseModel):
+    cocktails_count: int = Field(default=0, description="Liczba koktajli autora widocznych dla pytającego")
+    ratings_count: int = Field(default=0, description="Liczba ocen wystawionych przez użytkownika")
+    favorites_count: int = Field(default=0, description="Liczba koktajli w ulubionych użytkownika")
+    received_ratings_count: int = Field(default=0, description="Liczba ocen koktajli autora widocznych dla pytającego")
+    average_rating_received: Optional[float] = Field(default=None, description="Średnia ocen koktajli autora widocznych dla pytającego")
+
+# Profil w jednej odpowiedzi (GET /users/{id}/profile): dane, statystyki i pierwsza strona koktajli
+class UserProfile(BaseModel):
+    user: UserPublic
+    stats: UserProfileStats
+    cocktails: List[Union[CocktailWithDetails, CocktailSummary]]
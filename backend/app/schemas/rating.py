@@ -1,11 +1,22 @@
-from typing import Optional, Annotated
-from pydantic import BaseModel, Field 
+from typing import Optional, Annotated, Literal
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
+from enum import Enum
+
+from .user import UserBrief
+
+def _blank_to_none(comment: Optional[str]) -> Optional[str]:
+    # Pusty komentarz to brak komentarza (filtr has_comment i indeks częściowy na ratings)
+    if comment is not None and not comment.strip():
+        return None
+    return comment
 
 class RatingBase(BaseModel):
     rating_value: Annotated[int, Field(ge=1, le=5)] # Ocena od 1 do 5
     comment: Optional[str] = None
 
+    _normalize_comment = field_validator("comment")(_blank_to_none)
+
 class RatingCreate(RatingBase):
     cocktail_id: int
 
@@ -13,6 +24,8 @@ class RatingUpdate(BaseModel):
     rating_value: Optional[Annotated[int, Field(ge=1, le=5)]] = None
     comment: Optional[str] = None
 
+    _normalize_comment = field_validator("comment")(_blank_to_none)
+
 class RatingInDBBase(RatingBase):
     id: int
     user_id: int
@@ -24,4 +37,19 @@ class RatingInDBBase(RatingBase):
         from_attributes = True
 
 class Rating(RatingInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+class RatingExpand(str, Enum):
+    USER = "user"
+
+# Ocena z osadzonym profilem autora (expand=user) - osobna klasa, nie podklasa Rating,
+# żeby Union w response_model nie dopasował jej do Rating i nie zgubił pola user
+class RatingWithUser(RatingInDBBase):
+    # None - konto autora usunięte lub oczekuje na usunięcie
+    user: Optional[UserBrief] = None
+
+# Odpowiedź 202 w trybie write-behind - ocena zapisana w logu, wiersz powstanie przy flushu
+class RatingQueued(BaseModel):
+    status: Literal["queued"] = "queued"
+    seq: int
+    cocktail_id: int
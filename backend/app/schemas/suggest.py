@@ -0,0 +1,13 @@
+from enum import Enum
+from pydantic import BaseModel
+
+class SuggestKind(str, Enum):
+    INGREDIENT = "ingredient"
+    TAG = "tag"
+    COCKTAIL = "cocktail"
+
+class Suggestion(BaseModel):
+    kind: SuggestKind
+    id: int
+    name: str
+    popularity: int = 0
@@ -0,0 +1,49 @@
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+from .cocktail import UnitEnum, CocktailStats
+
+class SyncCocktailIngredient(BaseModel):
+    id: int
+    amount: int
+    unit: UnitEnum
+
+class SyncCocktail(BaseModel):
+    """Koktajl w replice klienta - tagi i składniki jako identyfikatory (nazwy w tags/ingredients)."""
+    id: int
+    name: str
+    description: Optional[str] = None
+    instructions: str
+    image_url: Optional[str] = None
+    user_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    tag_ids: List[int] = []
+    ingredients: List[SyncCocktailIngredient] = []
+    average_rating: Optional[float] = None
+    ratings_count: int = 0
+    favorites_count: int = 0
+
+class SyncNamedItem(BaseModel):
+    id: int
+    name: str
+
+class SyncDeleted(BaseModel):
+    """Identyfikatory do usunięcia z repliki (usunięte lub już niepubliczne)."""
+    cocktails: List[int] = []
+    tags: List[int] = []
+    ingredients: List[int] = []
+
+class SyncResponse(BaseModel):
+    since: int
+    # Wartość since dla kolejnego wywołania
+    next_since: int
+    # True - odpowiedź objęła tylko część zmian, należy od razu pobrać kolejną porcję
+    has_more: bool
+    cocktails: List[SyncCocktail] = []
+    # Zmienione liczniki koktajli, które same się nie zmieniły
+    cocktail_stats: List[CocktailStats] = []
+    tags: List[SyncNamedItem] = []
+    ingredients: List[SyncNamedItem] = []
+    deleted: SyncDeleted = SyncDeleted()
@@ -34,6 +34,23 @@ class UserInDBBase(UserBase):
 class User(UserInDBBase):
     pass
 
+# Skrócony profil osadzany w listach (np. autor oceny przy expand=user) - bez e-maila
+class UserBrief(BaseModel):
+    id: int
+    username: str
+    avatar_url: Optional[str] = None
+
+# Publiczne dane użytkownika w profilu (GET /users/{id}/profile, cache'owane publicznie) - bez e-maila
+class UserPublic(BaseModel):
+    id: int
+    username: str
+    bio: Optional[str] = None
+    avatar_url: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
 # Schemat użytkownika przechowywany w bazie (zawiera zahaszowane hasło)
 # Może nie być potrzebny na zewnątrz, ale przydatny wewnętrznie
 class UserInDB(UserInDBBase):
@@ -0,0 +1,73 @@
+# app/single_flight.py
+"""
+Łączenie identycznych, równoczesnych odczytów w jednym workerze (single-flight).
+
+Pierwsze wywołanie do(key, fn) dla danego klucza (lider) liczy fn(); wywołania z tym samym
+kluczem, które przyjdą w trakcie, czekają na jego wynik zamiast liczyć go ponownie. Wynik
+(lub wyjątek) dostają wszyscy czekający - musi być traktowany jako tylko do odczytu.
+
+Klucz obejmuje numer ostatniego commitu w procesie (app/db/session.py): odczyt rozpoczęty po
+zapisie nie dołączy do obliczenia sprzed niego, więc autor zmiany zawsze widzi jej efekt.
+Czekający, który nie doczeka się wyniku w SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS, liczy sam.
+
+Liczniki: single_flight.<nazwa>.leaders, .coalesced, .wait_timeouts (GET /metrics/).
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import commit_generation
+
+T = TypeVar("T")
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return fn()
+        key = (key, commit_generation())
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._flights[key] = _Flight()
+
+        if not is_leader:
+            metrics.incr(f"single_flight.{self.name}.coalesced")
+            if not flight.done.wait(settings.SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS):
+                metrics.incr(f"single_flight.{self.name}.wait_timeouts")
+                return fn()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        metrics.incr(f"single_flight.{self.name}.leaders")
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+# Odczyty koktajli (szczegóły i strony listy) - app/crud/crud_cocktail.py
+cocktail_reads = SingleFlight("cocktail")
@@ -0,0 +1,129 @@
+# app/suggest.py
+"""
+Indeks prefiksowy dla podpowiedzi (typeahead) nazw składników, tagów i koktajli.
+
+Dla każdej nazwy indeksowane są klucze znormalizowane przez fold_text
+(bez polskich znaków, małe litery) zaczynające się od każdego słowa, np.
+"Sok z limonki" -> "sok z limonki", "z limonki", "limonki". Klucze trzymane są
+w posortowanej liście, więc wyszukanie prefiksu to dwa wyszukiwania binarne,
+a wyniki z zakresu są rangowane według popularności. Wyniki dla krótkich
+prefiksów (obejmujących duże zakresy) są zapamiętywane do najbliższej zmiany indeksu.
+
+Nazwy są aktualizowane przy zapisach w tym procesie, a popularność pochodzi z ostatniego
+odczytu z bazy (CRUDSuggest.load, ponawiany co SUGGEST_RELOAD_INTERVAL_SECONDS) - oceny,
+ulubione i zmiany składników koktajli są w niej widoczne po najbliższym przeładowaniu.
+"""
+import bisect
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.text import fold_text
+
+KINDS = ("ingredient", "tag", "cocktail")
+
+# Prefiksy o długości do tej wartości są cache'owane
+SHORT_PREFIX_LENGTH = 2
+
+class PrefixIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._keys: Dict[str, List[Tuple[str, int]]] = {kind: [] for kind in KINDS}
+        self._items: Dict[str, Dict[int, Tuple[str, int, List[str]]]] = {kind: {} for kind in KINDS}
+        self._short_prefix_cache: Dict[Tuple[str, Tuple[str, ...], int], List[Tuple[str, int, str, int]]] = {}
+        self._generation = 0
+        self.loaded = False
+
+    def _invalidate_locked(self) -> None:
+        self._generation += 1
+        self._short_prefix_cache.clear()
+
+    @staticmethod
+    def _word_keys(name: str) -> List[str]:
+        folded = fold_text(name)
+        words = folded.split(" ")
+        return [" ".join(words[position:]) for position in range(len(words)) if words[position]]
+
+    def build(self, kind: str, items: Iterable[Tuple[int, str, int]]) -> None:
+        """Zastępuje wpisy danego rodzaju; items to krotki (id, nazwa, popularność)."""
+        entries: Dict[int, Tuple[str, int, List[str]]] = {}
+        keys: List[Tuple[str, int]] = []
+        for item_id, name, popularity in items:
+            word_keys = self._word_keys(name)
+            entries[item_id] = (name, popularity or 0, word_keys)
+            keys.extend((key, item_id) for key in word_keys)
+        keys.sort()
+        with self._lock:
+            self._items[kind] = entries
+            self._keys[kind] = keys
+            self._invalidate_locked()
+
+    def upsert(self, kind: str, item_id: int, name: str, popularity: Optional[int] = None) -> None:
+        with self._lock:
+            previous = self._remove_locked(kind, item_id)
+            if popularity is None:
+                popularity = previous[1] if previous else 0
+            word_keys = self._word_keys(name)
+            self._items[kind][item_id] = (name, popularity, word_keys)
+            for key in word_keys:
+                bisect.insort(self._keys[kind], (key, item_id))
+            self._invalidate_locked()
+
+    def remove(self, kind: str, item_id: int) -> None:
+        with self._lock:
+            self._remove_locked(kind, item_id)
+            self._invalidate_locked()
+
+    def _remove_locked(self, kind: str, item_id: int) -> Optional[Tuple[str, int, List[str]]]:
+        entry = self._items[kind].pop(item_id, None)
+        if entry is not None:
+            keys = self._keys[kind]
+            for key in entry[2]:
+                position = bisect.bisect_left(keys, (key, item_id))
+                if position < len(keys) and keys[position] == (key, item_id):
+                    del keys[position]
+        return entry
+
+    def suggest(self, prefix: str, kinds: Sequence[str] = KINDS, limit: int = 10) -> List[Tuple[str, int, str, int]]:
+        """
+        Zwraca do `limit` krotek (rodzaj, id, nazwa, popularność). Dopasowania od początku
+        nazwy mają pierwszeństwo przed dopasowaniami od kolejnego słowa, dalej decyduje popularność.
+        """
+        folded = fold_text(prefix)
+        if not folded:
+            return []
+        cache_key = (folded, tuple(kinds), limit)
+        if len(folded) <= SHORT_PREFIX_LENGTH:
+            cached = self._short_prefix_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        upper = folded + "\uffff"
+        candidates: Dict[Tuple[str, int], Tuple[bool, int, str]] = {}
+        with self._lock:
+            generation = self._generation
+            for kind in kinds:
+                keys = self._keys[kind]
+                items = self._items[kind]
+                start = bisect.bisect_left(keys, (folded,))
+                end = bisect.bisect_left(keys, (upper,), lo=start)
+                for key, item_id in keys[start:end]:
+                    name, popularity, word_keys = items[item_id]
+                    from_start = key == word_keys[0]
+                    current = candidates.get((kind, item_id))
+                    if current is None or (from_start and not current[0]):
+                        candidates[(kind, item_id)] = (from_start, popularity, name)
+
+        best = heapq.nsmallest(
+            limit,
+            candidates.items(),
+            key=lambda candidate: (not candidate[1][0], -candidate[1][1], candidate[1][2].casefold())
+        )
+        result = [(kind, item_id, name, popularity) for (kind, item_id), (_, popularity, name) in best]
+        if len(folded) <= SHORT_PREFIX_LENGTH:
+            with self._lock:
+                if generation == self._generation:
+                    self._short_prefix_cache[cache_key] = result
+        return result
+
+suggest_index = PrefixIndex()
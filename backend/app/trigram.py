@@ -0,0 +1,84 @@
+# app/trigram.py
+"""
+Indeks trigramów (lista postingów w pamięci procesu) do wyszukiwania odpornego na literówki.
+
+Tekst normalizowany jest przez fold_text, a każde słowo dzielone na trigramy
+z dopełnieniem spacjami (jak w pg_trgm: "  s", " so", "sok", "ok "). Dla zapytania
+zliczane są wspólne trigramy kandydatów z postingów; wynik to odsetek trigramów
+zapytania występujących w nazwie (podobieństwo "słowne"), więc "mohito" znajduje
+"Mojito", a "zubrowka" - "Żubrówka z sokiem".
+"""
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from app.core.text import fold_text
+
+def trigrams(text: str) -> FrozenSet[str]:
+    result: Set[str] = set()
+    for word in fold_text(text).split(" "):
+        if word:
+            padded = f"  {word} "
+            result.update(padded[position:position + 3] for position in range(len(padded) - 2))
+    return frozenset(result)
+
+class TrigramIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._trigrams: Dict[int, FrozenSet[str]] = {}
+        self.loaded = False
+
+    def build(self, items: Iterable[Tuple[int, str]]) -> None:
+        postings: Dict[str, Set[int]] = defaultdict(set)
+        item_trigrams: Dict[int, FrozenSet[str]] = {}
+        for item_id, text in items:
+            item_trigrams[item_id] = trigrams(text)
+            for trigram in item_trigrams[item_id]:
+                postings[trigram].add(item_id)
+        with self._lock:
+            self._postings = postings
+            self._trigrams = item_trigrams
+            self.loaded = True
+
+    def upsert(self, item_id: int, text: str) -> None:
+        with self._lock:
+            self._remove_locked(item_id)
+            self._trigrams[item_id] = trigrams(text)
+            for trigram in self._trigrams[item_id]:
+                self._postings[trigram].add(item_id)
+
+    def remove(self, item_id: int) -> None:
+        with self._lock:
+            self._remove_locked(item_id)
+
+    def _remove_locked(self, item_id: int) -> None:
+        for trigram in self._trigrams.pop(item_id, frozenset()):
+            members = self._postings.get(trigram)
+            if members is not None:
+                members.discard(item_id)
+                if not members:
+                    del self._postings[trigram]
+
+    def search(self, query: str, min_similarity: float, limit: Optional[int] = 200) -> List[Tuple[int, float]]:
+        """
+        Zwraca (id, podobieństwo) dla wpisów z podobieństwem >= min_similarity, malejąco.
+        limit=None - wszystkie dopasowania (gdy wynik służy jako filtr, a nie lista podpowiedzi).
+        """
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            return []
+        shared: Counter = Counter()
+        with self._lock:
+            for trigram in query_trigrams:
+                shared.update(self._postings.get(trigram, ()))
+        matches = [
+            (item_id, count / len(query_trigrams))
+            for item_id, count in shared.items()
+            if count / len(query_trigrams) >= min_similarity
+        ]
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches if limit is None else matches[:limit]
+
+cocktail_name_index = TrigramIndex()
+ingredient_name_index = TrigramIndex()
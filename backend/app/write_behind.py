@@ -0,0 +1,162 @@
+# app/write_behind.py
+"""
+Bufor write-behind (group commit) dla ocen i ulubionych.
+
+W trybie WRITE_BEHIND_ENABLED zapis jest potwierdzany po dopisaniu zdarzenia do
+lokalnego logu (JSON lines, fsync), a app/crud/crud_write_behind.py co
+WRITE_BEHIND_FLUSH_INTERVAL_MS przenosi oczekujące zdarzenia do bazy w jednej
+transakcji. Po udanym zapisie log jest przepisywany tylko z pozostałymi zdarzeniami;
+po restarcie open() odtwarza z niego niezapisane zdarzenia (ich zastosowanie jest
+idempotentne - patrz crud_write_behind.apply_batch).
+
+Log jest lokalny dla procesu - przy kilku workerach każdy potrzebuje własnej ścieżki.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+RATING_CREATE = "rating.create"
+FAVORITE_SET = "favorite.set"
+
+class WriteBehindBuffer:
+    def __init__(self, log_path: str) -> None:
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        # Tylko jeden flush naraz (pętla w tle i flush wymuszony przez odczyt użytkownika)
+        self.flush_lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._seq = 0
+        # Liczba zakończonych mark_flushed - enqueue_rating_once wykrywa nią flush w trakcie odczytu z bazy
+        self._flush_generation = 0
+        self._log = None
+
+    def open(self) -> int:
+        """Otwiera log i wczytuje niezapisane zdarzenia. Zwraca ich liczbę."""
+        with self._lock:
+            self._open_locked()
+            return len(self._pending)
+
+    def _open_locked(self) -> None:
+        if self._log is not None:
+            return
+        events = []
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as log_file:
+                for line in log_file:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        # Urwany ostatni wiersz (awaria w trakcie zapisu) - zdarzenie nie zostało potwierdzone
+                        break
+        self._pending = events
+        self._seq = max((event["seq"] for event in events), default=0)
+        self._log = open(self.log_path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def _enqueue_locked(self, kind: str, **data: Any) -> Dict[str, Any]:
+        self._open_locked()
+        self._seq += 1
+        event = {"seq": self._seq, "kind": kind, "ts": time.time(), **data}
+        self._log.write(json.dumps(event) + "\n")
+        self._log.flush()
+        if settings.WRITE_BEHIND_FSYNC:
+            os.fsync(self._log.fileno())
+        self._pending.append(event)
+        return event
+
+    def enqueue(self, kind: str, **data: Any) -> Dict[str, Any]:
+        """Trwale dopisuje zdarzenie do logu; po powrocie zapis można potwierdzić klientowi."""
+        with self._lock:
+            event = self._enqueue_locked(kind, **data)
+        metrics.incr("write_behind.enqueued")
+        return event
+
+    def enqueue_rating_once(
+        self, user_id: int, cocktail_id: int, already_rated: Callable[[], bool], **data: Any
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Dopisuje ocenę, jeśli użytkownik jeszcze nie ocenił koktajlu (None w przeciwnym razie).
+
+        already_rated() (odczyt z bazy, w nowej transakcji) działa poza blokadą bufora. Pod blokadą
+        ponownie sprawdzane są oczekujące zdarzenia, więc dwa równoległe żądania nie dostaną obu
+        potwierdzeń. Jeśli w międzyczasie zakończył się flush (zdarzenie mogło przejść z bufora do
+        bazy już po odczycie), odczyt z bazy jest powtarzany.
+        """
+        while True:
+            with self._lock:
+                if self._pending_rating_locked(user_id, cocktail_id) is not None:
+                    return None
+                generation = self._flush_generation
+            if already_rated():
+                return None
+            with self._lock:
+                if self._pending_rating_locked(user_id, cocktail_id) is not None:
+                    return None
+                if self._flush_generation == generation:
+                    event = self._enqueue_locked(RATING_CREATE, user_id=user_id, cocktail_id=cocktail_id, **data)
+                    break
+        metrics.incr("write_behind.enqueued")
+        return event
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def has_pending_for_user(self, user_id: int) -> bool:
+        with self._lock:
+            return any(event["user_id"] == user_id for event in self._pending)
+
+    def _pending_rating_locked(self, user_id: int, cocktail_id: int) -> Optional[Dict[str, Any]]:
+        for event in self._pending:
+            if (event["kind"] == RATING_CREATE and event["user_id"] == user_id
+                    and event["cocktail_id"] == cocktail_id):
+                return event
+        return None
+
+    def pending_favorite_state(self, user_id: int, cocktail_id: int) -> Optional[bool]:
+        """Stan ulubionego wynikający z ostatniego oczekującego zdarzenia (None - brak zdarzeń)."""
+        with self._lock:
+            for event in reversed(self._pending):
+                if (event["kind"] == FAVORITE_SET and event["user_id"] == user_id
+                        and event["cocktail_id"] == cocktail_id):
+                    return event["is_favorite"]
+        return None
+
+    def take_batch(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._pending[:limit])
+
+    def take_user_events(self, user_id: int) -> List[Dict[str, Any]]:
+        """Oczekujące zdarzenia jednego użytkownika (w kolejności seq)."""
+        with self._lock:
+            return [event for event in self._pending if event["user_id"] == user_id]
+
+    def mark_flushed(self, events: Iterable[Dict[str, Any]]) -> None:
+        """Usuwa zapisane zdarzenia i atomowo przepisuje log z pozostałymi."""
+        flushed_seqs = {event["seq"] for event in events}
+        with self._lock:
+            self._pending = [event for event in self._pending if event["seq"] not in flushed_seqs]
+            tmp_path = f"{self.log_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as tmp_file:
+                for event in self._pending:
+                    tmp_file.write(json.dumps(event) + "\n")
+                tmp_file.flush()
+                if settings.WRITE_BEHIND_FSYNC:
+                    os.fsync(tmp_file.fileno())
+            if self._log is not None:
+                self._log.close()
+            os.replace(tmp_path, self.log_path)
+            self._log = open(self.log_path, "a", encoding="utf-8")
+            self._flush_generation += 1
+
+write_behind_buffer = WriteBehindBuffer(settings.WRITE_BEHIND_LOG_PATH)
@@ -0,0 +1,127 @@
+# backend/scripts/benchmark_cocktail_detail.py
+"""
+Benchmark odczytu szczegółów koktajlu: ścieżka ORM (get_cocktail + walidacja
+i serializacja Pydantic) kontra jedno zapytanie agregujące JSON w bazie
+(get_cocktail_json, używane przez GET /cocktails/{id}).
+
+Tworzy tymczasową bazę SQLite z koktajlami o kilku składnikach, tagach i ocenach
+(w tym średnie z połówką na trzecim miejscu, np. 25/8 i 107/40), sprawdza, że obie
+ścieżki dają identyczny JSON i tak samo zaokrąglają średnią, i mierzy czas oraz
+liczbę zapytań SQL na jeden odczyt.
+
+Uruchomienie (z katalogu backend):
+    python -m scripts.benchmark_cocktail_detail --cocktails 500 --reads 5000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cocktails", type=int, default=500)
+    parser.add_argument("--ingredients", type=int, default=8, help="składników na koktajl")
+    parser.add_argument("--tags", type=int, default=3, help="tagów na koktajl")
+    parser.add_argument("--reads", type=int, default=5000)
+    args = parser.parse_args()
+
+    # Konfiguracja musi być ustawiona przed importem app.* (settings i silnik tworzone przy imporcie)
+    db_path = os.path.join(tempfile.mkdtemp(), "detail.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from sqlalchemy import event, insert, update
+
+    from app import models
+    from app.crud.crud_cocktail import cocktail as crud_cocktail
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.cocktail import cocktail_ingredient_association, cocktail_tag_association
+
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    db = SessionLocal()
+    db.add(models.User(username="author", email="author@example.com", hashed_password="x"))
+    db.add_all(models.User(username=f"rater{i}", email=f"rater{i}@example.com", hashed_password="x") for i in range(40))
+    db.add_all(models.Ingredient(name=f"Składnik {i}", search_key=f"skladnik {i}") for i in range(100))
+    db.add_all(models.Tag(name=f"tag{i}") for i in range(30))
+    db.add_all(
+        models.Cocktail(name=f"Koktajl {i}", search_key=f"koktajl {i}", description="Opis " * 20,
+                        instructions="Wymieszać. " * 10, user_id=1)
+        for i in range(args.cocktails)
+    )
+    db.flush()
+    db.execute(insert(cocktail_ingredient_association), [
+        {"cocktail_id": cocktail_id, "ingredient_id": ingredient_id, "amount": rng.randint(1, 100), "unit": "ml"}
+        for cocktail_id in range(1, args.cocktails + 1)
+        for ingredient_id in rng.sample(range(1, 101), args.ingredients)
+    ])
+    db.execute(insert(cocktail_tag_association), [
+        {"cocktail_id": cocktail_id, "tag_id": tag_id}
+        for cocktail_id in range(1, args.cocktails + 1)
+        for tag_id in rng.sample(range(1, 31), args.tags)
+    ])
+    # Oceny: pierwsze koktajle mają średnie, które round() Pythona i ROUND() bazy zaokrąglają
+    # różnie (3.125, 2.675), pozostałe losowe; liczniki jak po create_rating
+    fixed_ratings = [[5, 4, 4, 3, 3, 2, 2, 2], [3] * 27 + [2] * 13, [4, 4, 5], [5]]
+    ratings_by_cocktail = {
+        cocktail_id: (fixed_ratings[cocktail_id - 1] if cocktail_id <= len(fixed_ratings)
+                      else [rng.randint(1, 5) for _ in range(rng.randint(0, 40))])
+        for cocktail_id in range(1, args.cocktails + 1)
+    }
+    rating_rows = [
+        {"cocktail_id": cocktail_id, "user_id": index + 2, "rating_value": value}
+        for cocktail_id, values in ratings_by_cocktail.items()
+        for index, value in enumerate(values)
+    ]
+    if rating_rows:
+        db.execute(insert(models.Rating), rating_rows)
+    for cocktail_id, values in ratings_by_cocktail.items():
+        db.execute(update(models.Cocktail).where(models.Cocktail.id == cocktail_id).values(
+            ratings_count=len(values), ratings_sum=sum(values),
+            **{f"ratings_{star}": values.count(star) for star in range(1, 6)}
+        ))
+    db.commit()
+    db.close()
+
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statements(*_):
+        statements[0] += 1
+
+    def orm_read(session, cocktail_id):
+        return crud_cocktail.get_cocktail(session, cocktail_id=cocktail_id).model_dump_json()
+
+    def json_read(session, cocktail_id):
+        return crud_cocktail.get_cocktail_json(session, cocktail_id=cocktail_id)[2]
+
+    expected_averages = {3.125: 3.13, 2.675: 2.68}
+    session = SessionLocal()
+    for cocktail_id in range(1, min(args.cocktails, 20) + 1):
+        assert orm_read(session, cocktail_id) == json_read(session, cocktail_id), cocktail_id
+        values = ratings_by_cocktail[cocktail_id]
+        exact = sum(values) / len(values) if values else None
+        if exact in expected_averages:
+            detail = json.loads(json_read(session, cocktail_id))
+            assert detail["average_rating"] == expected_averages[exact], (cocktail_id, detail["average_rating"])
+    session.close()
+
+    ids = [rng.randint(1, args.cocktails) for _ in range(args.reads)]
+    print(f"Koktajle: {args.cocktails}, składniki/tagi na koktajl: {args.ingredients}/{args.tags}, odczyty: {args.reads}")
+    for label, read in (("ORM + Pydantic", orm_read), ("JSON z bazy", json_read)):
+        session = SessionLocal()
+        statements[0] = 0
+        started = time.perf_counter()
+        for cocktail_id in ids:
+            read(session, cocktail_id)
+            # Jak w żądaniu HTTP: każdy odczyt zaczyna się z pustą mapą tożsamości
+            session.expunge_all()
+        elapsed = time.perf_counter() - started
+        session.close()
+        print(f"{label:>15}: {elapsed / args.reads * 1e6:7.0f} µs/odczyt, "
+              f"{statements[0] / args.reads:.1f} zapytań/odczyt")
+
+if __name__ == "__main__":
+    main()
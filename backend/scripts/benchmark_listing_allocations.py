@@ -0,0 +1,140 @@
+# backend/scripts/benchmark_listing_allocations.py
+"""
+Pomiar alokacji pamięci (tracemalloc) i czasu budowy jednej strony listy koktajli.
+
+Porównuje ścieżkę z app/crud/crud_cocktail.py (kolumny Core, wiersze Row bez
+mapy tożsamości) z wcześniejszym podejściem: encje Cocktail ładowane przez ORM
+z joinedload(author) + selectinload(tags), kopiowane następnie do Pydantic.
+Obie ścieżki doczytują składniki tym samym zapytaniem dla całej strony, więc
+różnica dotyczy tylko materializacji obiektów ORM.
+
+Uruchomienie (z katalogu backend):
+    python -m scripts.benchmark_listing_allocations --cocktails 2000 --size 48
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cocktails", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=48, help="koktajli na stronę")
+    parser.add_argument("--pages", type=int, default=200, help="liczba odczytów stron do pomiaru czasu")
+    args = parser.parse_args()
+
+    # Konfiguracja musi być ustawiona przed importem app.* (settings i silnik tworzone przy imporcie)
+    db_path = os.path.join(tempfile.mkdtemp(), "listing.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from sqlalchemy import insert, select
+    from sqlalchemy.orm import joinedload, selectinload
+
+    from app import models
+    from app.crud.crud_cocktail import cocktail as crud_cocktail
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.cocktail import cocktail_ingredient_association, cocktail_tag_association
+    from app.schemas.cocktail import CocktailSort, CocktailWithDetails
+    from app.schemas.tag import Tag as TagSchema
+    from app.schemas.user import User as UserSchema
+
+    Cocktail = models.Cocktail
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    db = SessionLocal()
+    db.add_all(
+        models.User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x", bio="Bio " * 10)
+        for i in range(50)
+    )
+    db.add_all(models.Ingredient(name=f"Składnik {i}", search_key=f"skladnik {i}") for i in range(100))
+    db.add_all(models.Tag(name=f"tag{i}") for i in range(30))
+    db.add_all(
+        models.Cocktail(name=f"Koktajl {i}", search_key=f"koktajl {i}", description="Opis " * 20,
+                        instructions="Wymieszać. " * 10, user_id=rng.randint(1, 50))
+        for i in range(args.cocktails)
+    )
+    db.flush()
+    db.execute(insert(cocktail_ingredient_association), [
+        {"cocktail_id": cocktail_id, "ingredient_id": ingredient_id, "amount": rng.randint(1, 100), "unit": "ml"}
+        for cocktail_id in range(1, args.cocktails + 1)
+        for ingredient_id in rng.sample(range(1, 101), 6)
+    ])
+    db.execute(insert(cocktail_tag_association), [
+        {"cocktail_id": cocktail_id, "tag_id": tag_id}
+        for cocktail_id in range(1, args.cocktails + 1)
+        for tag_id in rng.sample(range(1, 31), 3)
+    ])
+    db.commit()
+    db.close()
+
+    order = crud_cocktail._sort_orders[CocktailSort.NEWEST]
+    pages = max(args.cocktails // args.size, 1)
+
+    def core_page(session, page):
+        rows = session.execute(
+            crud_cocktail._listing_query()
+            .where(Cocktail.is_public == True)
+            .order_by(*order).offset(page * args.size).limit(args.size)
+        ).all()
+        return crud_cocktail._build_listing_items(session, rows)
+
+    def orm_page(session, page):
+        results = session.execute(
+            select(Cocktail, crud_cocktail._average_rating_expr.label("avg_rating"))
+            .options(joinedload(Cocktail.author), selectinload(Cocktail.tags))
+            .where(Cocktail.is_public == True)
+            .order_by(*order).offset(page * args.size).limit(args.size)
+        ).all()
+        ingredients = crud_cocktail._get_ingredients_for_cocktails(session, [row[0].id for row in results])
+        return [
+            CocktailWithDetails(
+                id=cocktail.id, name=cocktail.name, description=cocktail.description,
+                instructions=cocktail.instructions, image_url=cocktail.image_url,
+                is_public=cocktail.is_public, user_id=cocktail.user_id,
+                created_at=cocktail.created_at, updated_at=cocktail.updated_at,
+                author=UserSchema.model_validate(cocktail.author),
+                ingredients=ingredients[cocktail.id],
+                tags=[TagSchema.model_validate(tag) for tag in cocktail.tags],
+                average_rating=round(float(avg_rating), 2) if avg_rating is not None else None,
+                ratings_count=cocktail.ratings_count, favorites_count=cocktail.favorites_count,
+            )
+            for cocktail, avg_rating in results
+        ]
+
+    session = SessionLocal()
+    assert [item.model_dump() for item in core_page(session, 0)] == [item.model_dump() for item in orm_page(session, 0)]
+    session.close()
+
+    print(f"Koktajle: {args.cocktails}, strona: {args.size} (widok full)")
+    for label, build_page in (("ORM (encje)", orm_page), ("Core (wiersze)", core_page)):
+        session = SessionLocal()
+        build_page(session, 0)  # rozgrzanie cache kompilacji zapytań
+        session.expunge_all()
+
+        tracemalloc.start()
+        peaks = []
+        for page in range(min(pages, 20)):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            items = build_page(session, page)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            del items
+            # Jak w żądaniu HTTP: każda strona zaczyna się z pustą mapą tożsamości
+            session.expunge_all()
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        for page in range(args.pages):
+            build_page(session, page % pages)
+            session.expunge_all()
+        elapsed = time.perf_counter() - started
+        session.close()
+        print(f"{label:>15}: szczyt alokacji {sum(peaks) / len(peaks) / 1024:7.1f} KiB/stronę, "
+              f"{elapsed / args.pages * 1000:6.2f} ms/stronę")
+
+if __name__ == "__main__":
+    main()
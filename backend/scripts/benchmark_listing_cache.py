@@ -0,0 +1,110 @@
+# backend/scripts/benchmark_listing_cache.py
+"""
+Ruch mieszany (anonimowi i zalogowani) na listę koktajli: zapytanie "publiczne LUB moje"
+dla każdego zalogowanego (dotychczas) kontra wspólny cache stron publicznych z dołożonymi
+prywatnymi koktajlami użytkownika (app/listing_cache.py).
+
+Uruchomienie (z katalogu backend):
+    python -m scripts.benchmark_listing_cache --requests 3000 --users 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--cocktails", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--logged-in", type=float, default=0.7, help="odsetek żądań zalogowanych użytkowników")
+    parser.add_argument("--private-owners", type=float, default=0.1, help="odsetek użytkowników z prywatnymi koktajlami")
+    args = parser.parse_args()
+
+    # Konfiguracja musi być ustawiona przed importem app.* (settings i silnik tworzone przy imporcie)
+    db_path = os.path.join(tempfile.mkdtemp(), "listing_cache.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from sqlalchemy import insert
+
+    from app import models
+    from app.core.config import settings
+    from app.core.metrics import metrics
+    from app.crud.crud_cocktail import cocktail as crud_cocktail
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.listing_cache import listing_cache
+    from app.models.cocktail import cocktail_tag_association
+    from app.schemas.cocktail import CocktailSort, CocktailView
+
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    db = SessionLocal()
+    db.add_all(
+        models.User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x")
+        for i in range(args.users)
+    )
+    db.add_all(models.Tag(name=f"tag{i}") for i in range(10))
+    owners = rng.sample(range(1, args.users + 1), max(int(args.users * args.private_owners), 1))
+    db.add_all(
+        models.Cocktail(name=f"Koktajl {i}", search_key=f"koktajl {i}", instructions="Wymieszać.",
+                        user_id=rng.randint(1, args.users), is_public=True,
+                        ratings_count=rng.randint(0, 20), favorites_count=rng.randint(0, 20))
+        for i in range(args.cocktails)
+    )
+    db.add_all(
+        models.Cocktail(name=f"Prywatny {owner}-{i}", search_key=f"prywatny {owner}-{i}", instructions="Wymieszać.",
+                        user_id=owner, is_public=False)
+        for owner in owners
+        for i in range(rng.randint(1, 5))
+    )
+    db.flush()
+    db.execute(insert(cocktail_tag_association), [
+        {"cocktail_id": cocktail_id, "tag_id": rng.randint(1, 10)}
+        for cocktail_id in range(1, args.cocktails + 1)
+    ])
+    db.commit()
+    db.close()
+
+    traffic = [
+        {
+            "user_id": rng.randint(1, args.users) if rng.random() < args.logged_in else None,
+            "page": min(int(rng.expovariate(0.5)) + 1, 10),
+            "sort": rng.choice(list(CocktailSort)),
+            "tag_ids": [rng.randint(1, 10)] if rng.random() < 0.3 else None,
+            "view": CocktailView.SUMMARY,
+        }
+        for _ in range(args.requests)
+    ]
+
+    print(f"Koktajle: {args.cocktails}, użytkownicy: {args.users} ({len(owners)} z prywatnymi), "
+          f"żądania: {args.requests} ({args.logged_in:.0%} zalogowanych)")
+    strategies = (
+        ("publiczne LUB moje", 0, -1),
+        ("cache + nakładka", 60, settings.LISTING_PRIVATE_OVERLAY_MAX),
+    )
+    for label, ttl, overlay_max in strategies:
+        settings.LISTING_CACHE_TTL_SECONDS = ttl
+        settings.LISTING_PRIVATE_OVERLAY_MAX = overlay_max
+        listing_cache.invalidate()
+        metrics.reset()
+        session = SessionLocal()
+        started = time.perf_counter()
+        # get_cocktails wypisuje logi DEBUG - pomijamy je w pomiarze
+        with contextlib.redirect_stdout(io.StringIO()):
+            for request in traffic:
+                crud_cocktail.get_cocktails(session, **request)
+                session.expunge_all()
+        elapsed = time.perf_counter() - started
+        session.close()
+        hits, misses = metrics.get("listing_cache.hits"), metrics.get("listing_cache.misses")
+        hit_ratio = hits / (hits + misses) if hits + misses else 0.0
+        print(f"{label:>20}: {elapsed / args.requests * 1000:6.2f} ms/żądanie, trafienia cache {hit_ratio:6.1%}, "
+              f"nakładki scalone {int(metrics.get('listing.private_overlay.merged'))}, "
+              f"bezpośrednio {int(metrics.get('listing.private_overlay.direct'))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# backend/scripts/benchmark_listing_count.py
+"""
+Koszt liczby wyników (total) listy koktajli na dużym katalogu dla trybów count:
+exact (COUNT przy każdym odczycie), cached (COUNT zapamiętany per zestaw filtrów)
+i estimated (COUNT do LISTING_COUNT_ESTIMATE_CAP). Cache stron listy jest wyłączony,
+żeby każdy odczyt wykonywał zapytanie strony.
+
+Uruchomienie (z katalogu backend):
+    python -m scripts.benchmark_listing_count --cocktails 100000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cocktails", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    # Konfiguracja musi być ustawiona przed importem app.* (settings i silnik tworzone przy imporcie)
+    db_path = os.path.join(tempfile.mkdtemp(), "listing_count.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["LISTING_CACHE_TTL_SECONDS"] = "0"
+
+    from sqlalchemy import insert
+
+    from app import models
+    from app.core.config import settings
+    from app.crud.crud_cocktail import cocktail as crud_cocktail
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.cocktail import cocktail_tag_association
+    from app.schemas.cocktail import CocktailCount, CocktailSort, CocktailView
+
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    db = SessionLocal()
+    db.add_all(models.User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(50))
+    db.add_all(models.Tag(name=f"tag{i}") for i in range(20))
+    db.flush()
+    db.execute(insert(models.Cocktail), [
+        {"name": f"Koktajl {i}", "search_key": f"koktajl {i}", "instructions": "Wymieszać.",
+         "user_id": rng.randint(1, 50), "is_public": True, "ratings_count": rng.randint(0, 30)}
+        for i in range(args.cocktails)
+    ])
+    db.execute(insert(cocktail_tag_association), [
+        {"cocktail_id": cocktail_id, "tag_id": tag_id}
+        for cocktail_id in range(1, args.cocktails + 1)
+        for tag_id in rng.sample(range(1, 21), 2)
+    ])
+    db.commit()
+    db.close()
+
+    queries = {
+        "bez filtrów": {},
+        "tag": {"tag_ids": [3]},
+    }
+    print(f"Koktajle: {args.cocktails}, odczytów na wariant: {args.requests} "
+          f"(strony 1-5, limit estimated {settings.LISTING_COUNT_ESTIMATE_CAP})")
+    for query_label, filters in queries.items():
+        for mode in CocktailCount:
+            session = SessionLocal()
+            elapsed = 0.0
+            # get_cocktails wypisuje logi DEBUG - pomijamy je w pomiarze
+            with contextlib.redirect_stdout(io.StringIO()):
+                for i in range(args.requests):
+                    started = time.perf_counter()
+                    result = crud_cocktail.get_cocktails(
+                        session, page=i % 5 + 1, size=24, view=CocktailView.SUMMARY,
+                        sort=CocktailSort.MOST_RATED, count=mode, **filters
+                    )
+                    elapsed += time.perf_counter() - started
+                    session.rollback()
+            session.close()
+            total = f"{result['total']}{'+' if result['total_capped'] else ''}"
+            print(f"{query_label:>12} / {mode.value:>9}: {elapsed / args.requests * 1000:6.2f} ms/żądanie, total {total}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# backend/scripts/benchmark_recommender.py
+"""
+Benchmark przebudowy rekomendacji (app/recommender.py) na danych syntetycznych.
+
+Generuje N ulubionych o rozkładzie popularności zbliżonym do Zipfa i mierzy
+czas oraz szczytowe zużycie pamięci (tracemalloc) budowy macierzy i top-K.
+
+Uruchomienie (z katalogu backend):
+    python -m scripts.benchmark_recommender --favorites 1000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.recommender import build_interaction_matrix, top_k_similar
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--favorites", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--cocktails", type=int, default=10_000)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    popularity = 1.0 / np.arange(1, args.cocktails + 1) ** 0.8
+    popularity /= popularity.sum()
+    user_ids = rng.integers(0, args.users, size=args.favorites)
+    cocktail_ids = rng.choice(args.cocktails, size=args.favorites, p=popularity)
+    weights = np.ones(args.favorites, dtype=np.float32)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    matrix, cocktails = build_interaction_matrix(user_ids, cocktail_ids, weights)
+    matrix_done = time.perf_counter()
+    pairs = sum(len(similar) for _, similar, _ in top_k_similar(matrix, args.top_k))
+    finished = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Ulubione: {args.favorites}, użytkownicy: {args.users}, koktajle: {len(cocktails)}, nnz: {matrix.nnz}")
+    print(f"Budowa macierzy: {matrix_done - started:.2f} s")
+    print(f"Top-{args.top_k} podobnych: {finished - matrix_done:.2f} s ({pairs} par)")
+    print(f"Szczytowa pamięć (tracemalloc): {peak / 1024 / 1024:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
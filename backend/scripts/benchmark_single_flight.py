@@ -0,0 +1,107 @@
+# backend/scripts/benchmark_single_flight.py
+"""
+Fala równoczesnych identycznych odczytów (udostępniony popularny koktajl): wątki startują razem
+i pobierają te same szczegóły koktajlu oraz tę samą stronę listy z filtrem tagu. Porównuje
+liczbę faktycznych obliczeń i czas fali z łączeniem odczytów (app/single_flight.py) i bez niego.
+Cache stron listy jest wyłączony, żeby każda fala trafiała do bazy.
+
+Uruchomienie (z katalogu backend):
+    python -m scripts.benchmark_single_flight --threads 32 --waves 30
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--waves", type=int, default=30)
+    parser.add_argument("--cocktails", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Konfiguracja musi być ustawiona przed importem app.* (settings i silnik tworzone przy imporcie)
+    db_path = os.path.join(tempfile.mkdtemp(), "single_flight.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["LISTING_CACHE_TTL_SECONDS"] = "0"
+
+    from sqlalchemy import insert
+
+    from app import models
+    from app.core.config import settings
+    from app.core.metrics import metrics
+    from app.crud.crud_cocktail import cocktail as crud_cocktail
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.cocktail import cocktail_ingredient_association, cocktail_tag_association
+    from app.schemas.cocktail import CocktailView
+
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    db = SessionLocal()
+    db.add_all(models.User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(20))
+    db.add_all(models.Ingredient(name=f"Składnik {i}", search_key=f"skladnik {i}") for i in range(50))
+    db.add_all(models.Tag(name=f"tag{i}") for i in range(10))
+    db.add_all(
+        models.Cocktail(name=f"Koktajl {i}", search_key=f"koktajl {i}", description="Opis " * 20,
+                        instructions="Wymieszać.", user_id=rng.randint(1, 20))
+        for i in range(args.cocktails)
+    )
+    db.flush()
+    db.execute(insert(cocktail_ingredient_association), [
+        {"cocktail_id": cocktail_id, "ingredient_id": ingredient_id, "amount": 10, "unit": "ml"}
+        for cocktail_id in range(1, args.cocktails + 1)
+        for ingredient_id in rng.sample(range(1, 51), 5)
+    ])
+    db.execute(insert(cocktail_tag_association), [
+        {"cocktail_id": cocktail_id, "tag_id": rng.randint(1, 10)}
+        for cocktail_id in range(1, args.cocktails + 1)
+    ])
+    db.commit()
+    db.close()
+
+    def read(session, wave: int) -> None:
+        crud_cocktail.get_cocktail_json(session, cocktail_id=wave % args.cocktails + 1)
+        crud_cocktail.get_cocktails(session, tag_ids=[wave % 10 + 1], size=24, view=CocktailView.FULL)
+
+    print(f"Wątki: {args.threads}, fale: {args.waves} (każda: szczegóły koktajlu + strona listy)")
+    for label, enabled in (("bez łączenia", False), ("single-flight", True)):
+        settings.SINGLE_FLIGHT_ENABLED = enabled
+        metrics.reset()
+        barrier = threading.Barrier(args.threads + 1)
+
+        def worker() -> None:
+            session = SessionLocal()
+            for wave in range(args.waves):
+                barrier.wait()
+                read(session, wave)
+                session.rollback()
+                barrier.wait()
+            session.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        elapsed = 0.0
+        # get_cocktails wypisuje logi DEBUG - pomijamy je w pomiarze
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(args.waves):
+                barrier.wait()
+                started = time.perf_counter()
+                barrier.wait()
+                elapsed += time.perf_counter() - started
+        for thread in threads:
+            thread.join()
+
+        reads = args.threads * args.waves * 2
+        computed = metrics.get("single_flight.cocktail.leaders") if enabled else reads
+        print(f"{label:>14}: {elapsed / args.waves * 1000:7.1f} ms/falę, obliczeń {int(computed)}/{reads}, "
+              f"połączonych {int(metrics.get('single_flight.cocktail.coalesced'))}, "
+              f"zapytań SQL {int(metrics.get('db.compile_cache.hit') + metrics.get('db.compile_cache.miss'))}")
+
+if __name__ == "__main__":
+    main()
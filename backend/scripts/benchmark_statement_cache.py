@@ -0,0 +1,124 @@
+# backend/scripts/benchmark_statement_cache.py
+"""
+Czas CPU Pythona na typowe zapytania odczytu (lista koktajli z filtrami,
+oceny koktajlu, użytkownik po nazwie) - miara kosztu budowy i kompilacji SQL.
+
+Z --no-compiled-cache silnik działa bez cache skompilowanych instrukcji
+(compiled_cache=None), czyli każde zapytanie jest kompilowane od nowa.
+Na końcu wypisuje liczniki db.compile_cache.* z app/core/metrics.py.
+
+Uruchomienie (z katalogu backend):
+    python -m scripts.benchmark_statement_cache --requests 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--cocktails", type=int, default=300)
+    parser.add_argument("--no-compiled-cache", action="store_true")
+    args = parser.parse_args()
+
+    # Konfiguracja musi być ustawiona przed importem app.* (settings i silnik tworzone przy imporcie)
+    db_path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    # Mierzymy zapytania, nie cache stron listy (app/listing_cache.py)
+    os.environ["LISTING_CACHE_TTL_SECONDS"] = "0"
+
+    from sqlalchemy import insert
+
+    from app import models
+    from app.core.metrics import metrics
+    from app.crud.crud_cocktail import cocktail as crud_cocktail
+    from app.crud.crud_rating import rating as crud_rating
+    from app.crud.crud_user import user as crud_user
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.cocktail import cocktail_ingredient_association, cocktail_tag_association
+    from app.schemas.cocktail import CocktailSort, CocktailView
+
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    db = SessionLocal()
+    db.add_all(models.User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(50))
+    db.add_all(models.Ingredient(name=f"Składnik {i}", search_key=f"skladnik {i}") for i in range(60))
+    db.add_all(models.Tag(name=f"tag{i}") for i in range(20))
+    db.add_all(
+        models.Cocktail(name=f"Koktajl {i}", search_key=f"koktajl {i}", instructions="x",
+                        user_id=rng.randint(1, 50), ratings_count=3, ratings_sum=rng.randint(3, 15))
+        for i in range(args.cocktails)
+    )
+    db.flush()
+    db.execute(insert(cocktail_ingredient_association), [
+        {"cocktail_id": cocktail_id, "ingredient_id": ingredient_id, "amount": 10, "unit": "ml"}
+        for cocktail_id in range(1, args.cocktails + 1)
+        for ingredient_id in rng.sample(range(1, 61), 5)
+    ])
+    db.execute(insert(cocktail_tag_association), [
+        {"cocktail_id": cocktail_id, "tag_id": tag_id}
+        for cocktail_id in range(1, args.cocktails + 1)
+        for tag_id in rng.sample(range(1, 21), 2)
+    ])
+    db.add_all(
+        models.Rating(user_id=user_id, cocktail_id=cocktail_id, rating_value=rng.randint(1, 5))
+        for user_id in range(1, 51)
+        for cocktail_id in rng.sample(range(1, args.cocktails + 1), 10)
+    )
+    db.commit()
+    db.close()
+
+    metrics.reset()  # liczniki tylko dla mierzonych zapytań, bez przygotowania danych
+    if args.no_compiled_cache:
+        SessionLocal.configure(bind=engine.execution_options(compiled_cache=None))
+
+    operations = {
+        "get_cocktails": lambda session: crud_cocktail.get_cocktails(
+            session,
+            ingredient_ids=rng.sample(range(1, 61), rng.randint(0, 3)) or None,
+            tag_ids=rng.choice([None, [rng.randint(1, 20)]]),
+            min_avg_rating=rng.choice([None, 3.0]),
+            page=rng.randint(1, 3),
+            size=12,
+            user_id=rng.choice([None, rng.randint(1, 50)]),
+            view=rng.choice(list(CocktailView)),
+            sort=rng.choice(list(CocktailSort)),
+        ),
+        "get_cocktail": lambda session: crud_cocktail.get_cocktail(session, rng.randint(1, args.cocktails)),
+        "get_ratings_for_cocktail": lambda session: crud_rating.get_ratings_for_cocktail(
+            session, rng.randint(1, args.cocktails)
+        ),
+        "get_rating_by_user_and_cocktail": lambda session: crud_rating.get_rating_by_user_and_cocktail(
+            session, user_id=rng.randint(1, 50), cocktail_id=rng.randint(1, args.cocktails)
+        ),
+        "get_user_by_username": lambda session: crud_user.get_user_by_username(session, f"user{rng.randint(0, 49)}"),
+    }
+
+    print(f"Koktajle: {args.cocktails}, żądania na operację: {args.requests}, "
+          f"cache kompilacji: {'wyłączony' if args.no_compiled_cache else 'włączony'}")
+    for name, operation in operations.items():
+        session = SessionLocal()
+        # get_cocktails wypisuje logi DEBUG - pomijamy je w pomiarze wyjścia
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(20):
+                operation(session)  # rozgrzanie cache
+            session.expunge_all()
+            started = time.process_time()
+            for _ in range(args.requests):
+                operation(session)
+                session.expunge_all()
+            elapsed = time.process_time() - started
+        session.close()
+        print(f"{name:>32}: {elapsed / args.requests * 1e6:7.0f} µs CPU/żądanie")
+
+    for name, value in metrics.snapshot().items():
+        if name.startswith("db.compile_cache."):
+            print(f"  {name}: {value:.0f}")
+
+if __name__ == "__main__":
+    main()
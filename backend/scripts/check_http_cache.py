@@ -0,0 +1,136 @@
+# backend/scripts/check_http_cache.py
+"""
+Zastępcze proxy cache'ujące przed API - sprawdza nagłówki Cache-Control / Vary / Surrogate-Key
+i purge wywoływany ze ścieżek zapisu w CRUD (app/http_cache.py).
+
+Proxy przechowuje odpowiedzi z "public" i s-maxage (klucz: URL + Authorization, jak Vary),
+indeksuje je po Surrogate-Key i usuwa po kluczach zgłoszonych przez purge_hooks.
+
+Uruchomienie (z katalogu backend):
+    python -m scripts.check_http_cache
+"""
+import contextlib
+import io
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Set, Tuple
+
+class StandInProxy:
+    def __init__(self, client) -> None:
+        self.client = client
+        self.entries: Dict[Tuple[str, str], Tuple[float, object]] = {}
+        self.keys: Dict[str, Set[Tuple[str, str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str, headers: Dict[str, str] = None):
+        headers = headers or {}
+        cache_key = (url, headers.get("Authorization", ""))
+        cached = self.entries.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        response = self.client.get(url, headers=headers)
+        cache_control = response.headers.get("cache-control", "")
+        s_maxage = re.search(r"s-maxage=(\d+)", cache_control)
+        if response.status_code == 200 and "public" in cache_control and s_maxage:
+            self.entries[cache_key] = (time.monotonic() + int(s_maxage.group(1)), response)
+            for key in response.headers.get("surrogate-key", "").split():
+                self.keys.setdefault(key, set()).add(cache_key)
+        return response
+
+    def purge(self, keys: List[str]) -> None:
+        for key in keys:
+            for cache_key in self.keys.pop(key, set()):
+                self.entries.pop(cache_key, None)
+
+def main() -> None:
+    # Konfiguracja musi być ustawiona przed importem app.* (settings i silnik tworzone przy imporcie)
+    db_path = os.path.join(tempfile.mkdtemp(), "http_cache.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from fastapi.testclient import TestClient
+
+    from app import models
+    from app.core import security
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.http_cache import purge_hooks
+    from app.main import app
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.add_all(models.User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(2))
+    db.add(models.Ingredient(name="Rum", search_key="rum"))
+    db.add(models.Tag(name="klasyk"))
+    db.commit()
+    db.close()
+
+    proxy = StandInProxy(TestClient(app))
+    unsubscribe = purge_hooks.subscribe(proxy.purge)
+    auth = {"Authorization": "Bearer " + security.create_access_token({"sub": "user0"})}
+    rater = {"Authorization": "Bearer " + security.create_access_token({"sub": "user1"})}
+    api = "/api/v1"
+    checks = []
+
+    def check(label: str, condition: bool) -> None:
+        checks.append((label, condition))
+        print(f"[{'OK' if condition else 'BŁĄD'}] {label}")
+
+    # get_cocktails i endpointy wypisują logi DEBUG - pomijamy je
+    with contextlib.redirect_stdout(io.StringIO()):
+        cocktail_id = proxy.client.post(api + "/cocktails/", headers=auth, json={
+            "name": "Daiquiri", "instructions": "Wstrząsnąć.",
+            "ingredients": [{"ingredient_id": 1, "amount": 50, "unit": "ml"}], "tags": [{"tag_id": 1}],
+        }).json()["id"]
+        urls = [
+            api + "/cocktails/",
+            api + f"/cocktails/{cocktail_id}",
+            api + "/tags/",
+            api + "/ingredients/",
+            api + "/users/1/cocktails",
+            api + f"/ratings/cocktail/{cocktail_id}",
+        ]
+        first = [proxy.get(url) for url in urls]
+        misses = proxy.misses
+        [proxy.get(url) for url in urls]
+    check("odpowiedzi anonimowe mają Cache-Control public i Surrogate-Key",
+          all("public" in r.headers["cache-control"] and r.headers.get("surrogate-key") for r in first))
+    check("Vary zawiera Authorization", all("Authorization" in r.headers["vary"] for r in first))
+    check("drugi odczyt anonimowy obsłużony z proxy", proxy.misses == misses)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        private = proxy.client.get(api + "/cocktails/", headers=auth)
+        misses = proxy.misses
+        proxy.get(api + "/cocktails/", headers=auth)
+    check("odpowiedź zalogowanego jest prywatna i nie trafia do proxy",
+          private.headers["cache-control"].startswith("private") and "surrogate-key" not in private.headers
+          and proxy.misses == misses + 1)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        proxy.client.put(api + f"/cocktails/{cocktail_id}", headers=auth, json={"name": "Daiquiri Classic"})
+        detail = proxy.get(api + f"/cocktails/{cocktail_id}")
+        listing = proxy.get(api + "/cocktails/")
+    check("edycja koktajlu usuwa szczegóły i listę z proxy",
+          detail.json()["name"] == "Daiquiri Classic" and listing.json()["items"][0]["name"] == "Daiquiri Classic")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        proxy.client.post(api + "/ratings/", headers=rater, json={"cocktail_id": cocktail_id, "rating_value": 5})
+        ratings = proxy.get(api + f"/ratings/cocktail/{cocktail_id}")
+    check("nowa ocena usuwa listę ocen koktajlu z proxy", len(ratings.json()) == 1)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        proxy.client.post(api + "/tags/", json={"name": "nowość"})
+        tags = proxy.get(api + "/tags/")
+    check("nowy tag usuwa listę tagów z proxy", len(tags.json()) == 2)
+
+    unsubscribe()
+    print(f"Proxy: trafienia {proxy.hits}, chybienia {proxy.misses}")
+    if not all(condition for _, condition in checks):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
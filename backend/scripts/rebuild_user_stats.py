@@ -0,0 +1,37 @@
+# backend/scripts/rebuild_user_stats.py
+"""
+Przelicza od zera tabelę user_stats (statystyki profili, GET /users/{id}/profile)
+na podstawie tabel users, cocktails, ratings i favorites.
+
+Na co dzień liczniki utrzymują ścieżki zapisu CRUD - przebudowa potrzebna jest po
+ręcznych zmianach w bazie lub imporcie danych z pominięciem warstwy CRUD.
+Z --check tylko wypisuje użytkowników z nieaktualnymi statystykami (kod wyjścia 1, jeśli są).
+
+Uruchomienie (z katalogu backend):
+    python -m scripts.rebuild_user_stats
+    python -m scripts.rebuild_user_stats --check
+"""
+import argparse
+import sys
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", action="store_true", help="tylko porównaj liczniki, bez zapisu")
+    args = parser.parse_args()
+
+    from app.crud.crud_user_stats import user_stats as crud_user_stats
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stale = crud_user_stats.find_stale(db)
+        if args.check:
+            print(f"Nieaktualne statystyki: {len(stale)} użytkowników {stale[:20]}")
+            sys.exit(1 if stale else 0)
+        rows = crud_user_stats.rebuild(db)
+        print(f"Przebudowano statystyki {rows} użytkowników (wcześniej nieaktualne: {len(stale)})")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# backend/scripts/stress_sqlite_writes.py
+"""
+Wielowątkowy test obciążeniowy zapisów ocen i ulubionych na SQLite.
+
+Tworzy tymczasową bazę, a następnie W wątkach (każdy z własną sesją) wykonuje
+losowe oceny, przełączenia ulubionych i usunięcia ocen przez warstwę CRUD.
+Na końcu sprawdza, że żadna operacja nie skończyła się błędem "database is locked"
+i że zdenormalizowane liczniki koktajli oraz statystyki użytkowników (user_stats)
+zgadzają się z tabelami ratings/favorites.
+
+Krótki busy timeout wymusza kolizje blokad, więc widać ponawianie z
+app/db/transaction.py (liczniki db.write.* w metrykach). Z --max-attempts 1
+ponawianie jest wyłączone - dla porównania.
+
+Uruchomienie (z katalogu backend):
+    python -m scripts.stress_sqlite_writes --threads 16 --operations 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--operations", type=int, default=200, help="operacji na wątek")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--cocktails", type=int, default=20)
+    parser.add_argument("--busy-timeout", type=float, default=0.2)
+    parser.add_argument("--max-attempts", type=int, default=None)
+    args = parser.parse_args()
+
+    # Konfiguracja musi być ustawiona przed importem app.* (settings i silnik tworzone przy imporcie)
+    db_path = os.path.join(tempfile.mkdtemp(), "stress.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["SQLITE_BUSY_TIMEOUT_SECONDS"] = str(args.busy_timeout)
+    if args.max_attempts is not None:
+        os.environ["DB_WRITE_MAX_ATTEMPTS"] = str(args.max_attempts)
+
+    from sqlalchemy import func, select
+
+    from app import models
+    from app.core.metrics import metrics
+    from app.crud.crud_favorite import favorite as crud_favorite
+    from app.crud.crud_rating import rating as crud_rating
+    from app.crud.crud_user_stats import user_stats as crud_user_stats
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.schemas.rating import RatingCreate
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.add(models.User(username="author", email="author@example.com", hashed_password="x"))
+    db.flush()
+    db.add_all(
+        models.User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x")
+        for i in range(args.users)
+    )
+    db.add_all(
+        models.Cocktail(name=f"Koktajl {i}", search_key=f"koktajl {i}", instructions="x", user_id=1)
+        for i in range(args.cocktails)
+    )
+    db.commit()
+    # Koktajle dodane z pominięciem CRUD - statystyki autora z przebudowy
+    crud_user_stats.rebuild(db)
+    user_ids = [user_id for (user_id,) in db.execute(select(models.User.id).where(models.User.id > 1))]
+    cocktail_ids = [cocktail_id for (cocktail_id,) in db.execute(select(models.Cocktail.id))]
+    db.close()
+
+    errors = []
+    errors_lock = threading.Lock()
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        session = SessionLocal()
+        try:
+            for _ in range(args.operations):
+                user_id, cocktail_id = rng.choice(user_ids), rng.choice(cocktail_ids)
+                try:
+                    operation = rng.random()
+                    if operation < 0.45:
+                        crud_favorite.toggle_favorite(session, user_id=user_id, cocktail_id=cocktail_id)
+                    elif operation < 0.9:
+                        try:
+                            crud_rating.create_rating(
+                                session,
+                                RatingCreate(cocktail_id=cocktail_id, rating_value=rng.randint(1, 5)),
+                                user_id=user_id,
+                            )
+                        except ValueError:
+                            pass  # Użytkownik już ocenił ten koktajl
+                    else:
+                        existing = crud_rating.get_rating_by_user_and_cocktail(
+                            session, user_id=user_id, cocktail_id=cocktail_id
+                        )
+                        if existing:
+                            crud_rating.delete_rating(session, rating_id=existing.id)
+                except Exception as e:
+                    session.rollback()
+                    with errors_lock:
+                        errors.append(f"{type(e).__name__}: {e}")
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    ratings = dict(db.execute(
+        select(models.Rating.cocktail_id, func.count()).group_by(models.Rating.cocktail_id)
+    ).all())
+    ratings_sum = dict(db.execute(
+        select(models.Rating.cocktail_id, func.sum(models.Rating.rating_value)).group_by(models.Rating.cocktail_id)
+    ).all())
+    favorites = dict(db.execute(
+        select(models.Favorite.cocktail_id, func.count()).group_by(models.Favorite.cocktail_id)
+    ).all())
+    stars = {
+        (cocktail_id, rating_value): count
+        for cocktail_id, rating_value, count in db.execute(
+            select(models.Rating.cocktail_id, models.Rating.rating_value, func.count())
+            .group_by(models.Rating.cocktail_id, models.Rating.rating_value)
+        )
+    }
+    star_columns = [getattr(models.Cocktail, f"ratings_{value}") for value in range(1, 6)]
+    mismatches = [
+        row.id
+        for row in db.execute(select(
+            models.Cocktail.id, models.Cocktail.ratings_count, models.Cocktail.ratings_sum, models.Cocktail.favorites_count,
+            *star_columns
+        ))
+        if (row.ratings_count, row.ratings_sum, row.favorites_count, *row[4:])
+        != (ratings.get(row.id, 0), ratings_sum.get(row.id, 0), favorites.get(row.id, 0),
+            *(stars.get((row.id, value), 0) for value in range(1, 6)))
+    ]
+    stale_users = crud_user_stats.find_stale(db)
+    db.close()
+
+    total = args.threads * args.operations
+    print(f"Operacje: {total} w {elapsed:.2f} s ({total / elapsed:.0f} op/s), wątki: {args.threads}")
+    print(f"Błędy: {len(errors)}" + (f" (np. {errors[0]})" if errors else ""))
+    print(f"Koktajle z niespójnymi licznikami: {len(mismatches)}")
+    print(f"Użytkownicy z niespójnymi statystykami: {len(stale_users)}")
+    for name, value in metrics.snapshot().items():
+        if name.startswith("db.write.") and name.count(".") == 2:
+            print(f"  {name}: {value:.0f}")
+    sys.exit(1 if errors or mismatches or stale_users else 0)
+
+if __name__ == "__main__":
+    main()